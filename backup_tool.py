@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+from config import DB_BACKUP_DIR
+from utils.backup import take_snapshot, list_snapshots, prune, restore_snapshot
+
+# Online backups of the bot database (and shard files, if any).
+# `now` is safe while the bot runs, `restore` needs the bot and dashboard stopped.
+# Usage:
+#   python backup_tool.py now [--no-compress]
+#   python backup_tool.py list
+#   python backup_tool.py restore [SNAPSHOT] --yes
+#   python backup_tool.py prune --keep N
+
+def main():
+    parser = argparse.ArgumentParser(description="Database backups")
+    commands = parser.add_subparsers(dest="command", required=True)
+    now = commands.add_parser("now", help="take a snapshot")
+    now.add_argument("--no-compress", action="store_true")
+    commands.add_parser("list", help="list snapshots")
+    restore = commands.add_parser("restore", help="restore a snapshot (default: newest)")
+    restore.add_argument("snapshot", nargs="?")
+    restore.add_argument("--yes", action="store_true", help="skip the confirmation")
+    trim = commands.add_parser("prune", help="delete old snapshots")
+    trim.add_argument("--keep", type=int, required=True)
+    args = parser.parse_args()
+
+    if args.command == "now":
+        kwargs = {"compress": False} if args.no_compress else {}
+        result = take_snapshot(**kwargs)
+        print(f"💾 Snapshot {result['name']}: {', '.join(result['files'])}")
+        print(f"✅ {result['bytes'] / 1024:.0f} KiB in {result['seconds']:.1f}s")
+        for name in result["pruned"]:
+            print(f"🗑️ Removed old snapshot {name}")
+
+    elif args.command == "list":
+        names = list_snapshots()
+        if not names:
+            print(f"📭 No snapshots in {DB_BACKUP_DIR}")
+        for name in names:
+            folder = os.path.join(DB_BACKUP_DIR, name)
+            files = sorted(os.listdir(folder))
+            size = sum(os.path.getsize(os.path.join(folder, f)) for f in files)
+            print(f"💾 {name}  {size / 1024:.0f} KiB  {', '.join(files)}")
+
+    elif args.command == "restore":
+        target = args.snapshot or (list_snapshots() or ["(none)"])[-1]
+        if not args.yes:
+            answer = input(f"⚠️ Overwrite the live database with snapshot {target}? Stop the bot first. [y/N] ")
+            if answer.strip().lower() != "y":
+                print("❌ Cancelled")
+                return 1
+        result = restore_snapshot(args.snapshot)
+        for path in result["files"]:
+            print(f"♻️ Restored {path}")
+        print(f"✅ Snapshot {result['name']} restored")
+
+    elif args.command == "prune":
+        for name in prune(keep=args.keep):
+            print(f"🗑️ Removed old snapshot {name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,127 @@
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from utils.normalize import normalize, canonical
+from utils.text_match import WordMatcher
+from utils.filter_rules import RuleSet, compile_rule
+
+# Word filter cost per message: the old loop (`word in content.lower()` once
+# per filtered word) versus normalize() + WordMatcher (str.find for short
+# lists, one pass of the Aho-Corasick automaton from SMALL_SET words up).
+# One message in 20 carries a filtered word as written, one in 20 an
+# evasive spelling of it; the new filter has to catch both.
+# Then a pattern that makes backtracking regex engines blow up, run through
+# Python's re and through the filter's linear-time matcher.
+# Usage: python bench_filter.py [--words 20 100 1000 5000] [--messages 2000]
+
+LEET = str.maketrans("aeiost", "431057")
+CYRILLIC = str.maketrans("aeopcx", "аеорсх")
+
+EVASIONS = [
+    lambda word: " ".join(word),                                   # b a d
+    lambda word: ".".join(word).upper(),                           # B.A.D
+    lambda word: "".join(chr(ord(ch) + 0xFEE0) for ch in word),    # full width
+    lambda word: "\u200b".join(word),                              # zero width spaces
+    lambda word: word.translate(LEET),                             # 84d
+    lambda word: word.translate(CYRILLIC),                         # lookalikes
+]
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+def sample_messages(rng, words, count):
+    """(text, planted) pairs, planted is None, 'plain' or 'evasive'"""
+    vocabulary = [random_word(rng) for _ in range(2000)]
+    messages = []
+    for i in range(count):
+        text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(5, 40)))
+        planted = None
+        if i % 20 == 0:
+            text += " " + rng.choice(words)
+            planted = "plain"
+        elif i % 20 == 10:
+            text += " " + rng.choice(EVASIONS)(rng.choice(words))
+            planted = "evasive"
+        messages.append((text, planted))
+    return messages
+
+def naive(words, messages):
+    flags = []
+    for text, _ in messages:
+        content = text.lower()
+        flags.append(any(word in content for word in words))
+    return flags
+
+def normalized(matcher, messages):
+    return [bool(matcher.search(normalize(text).text)) for text, _ in messages]
+
+def caught(flags, messages, kind):
+    return sum(flag for flag, (_, planted) in zip(flags, messages) if planted == kind)
+
+def pathological(lengths):
+    """Seconds for re.search vs RuleSet.search of (a|aa)+b on 'aaa...a!'"""
+    pattern = "(a|aa)+b"
+    rules = RuleSet([compile_rule("re:" + pattern)])
+    results = []
+    for length in lengths:
+        text = "a" * length + "!"
+        started = time.perf_counter()
+        re.search(pattern, text)
+        backtracking = time.perf_counter() - started
+        started = time.perf_counter()
+        rules.search(normalize(text).text, text.lower())
+        results.append((length, backtracking, time.perf_counter() - started))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the word filter")
+    parser.add_argument("--words", type=int, nargs="+", default=[20, 100, 1000, 5000])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"🚫 Word filter: {args.messages} messages per run")
+    print("=" * 50)
+
+    failures = 0
+    for count in args.words:
+        rng = random.Random(args.seed)
+        words = sorted({random_word(rng) for _ in range(count)})
+        messages = sample_messages(rng, words, args.messages)
+        planted = {kind: sum(p == kind for _, p in messages) for kind in ("plain", "evasive")}
+
+        started = time.perf_counter()
+        matcher = WordMatcher(canonical(word) for word in words)
+        matcher.search("x")  # compile
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        old = naive(words, messages)
+        naive_took = time.perf_counter() - started
+
+        started = time.perf_counter()
+        new = normalized(matcher, messages)
+        matcher_took = time.perf_counter() - started
+
+        print(f"📊 {len(words):>5} words  loop {naive_took / args.messages * 1e6:8.1f} µs/msg  "
+              f"normalize+match {matcher_took / args.messages * 1e6:6.1f} µs/msg  "
+              f"({naive_took / matcher_took:.1f}x, built in {build * 1000:.0f}ms)")
+        print(f"   caught plain {caught(old, messages, 'plain')}/{planted['plain']} -> "
+              f"{caught(new, messages, 'plain')}/{planted['plain']}, "
+              f"evasive {caught(old, messages, 'evasive')}/{planted['evasive']} -> "
+              f"{caught(new, messages, 'evasive')}/{planted['evasive']}")
+        if caught(new, messages, "plain") + caught(new, messages, "evasive") != sum(planted.values()):
+            print(f"❌ {count} words: the new filter missed planted words")
+            failures += 1
+
+    print("🧨 re:(a|aa)+b against 'aaa...a!'")
+    for length, backtracking, linear in pathological([16, 20, 24, 28]):
+        print(f"   {length:>3} chars  re {backtracking * 1000:8.2f}ms  filter {linear * 1000:6.2f}ms")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
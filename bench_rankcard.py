@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+from PIL import Image
+from config import FONT_PATH, BACKGROUND_IMAGE, CARD_TEMPLATE_DIR
+from utils.images import ImageRenderer, init_worker, render_rank_card
+
+# Rank card throughput, rendered on the event loop (how the welcome image
+# used to be drawn) versus the render processes the bot uses. A ticker task
+# runs next to the renders: its worst gap is how long the gateway would
+# have been stalled.
+# Usage: python bench_rankcard.py [--cards 200] [--workers 1 2 4]
+
+def sample_avatar():
+    image = Image.new("RGB", (256, 256))
+    image.putdata([(x, y, (x + y) // 2) for y in range(256) for x in range(256)])
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+def sample_card(avatar, i):
+    return {
+        "guild_id": 1438861170642522112,
+        "name": f"Member {i}",
+        "avatar": avatar,
+        "level": 12 + i % 30,
+        "rank": 1 + i,
+        "total": 5000,
+        "xp": 11000 + i * 37,
+        "level_xp": (i * 37) % 1000,
+        "level_span": 1000,
+    }
+
+async def ticker(gaps, stop):
+    """Records the longest time the loop took to come back to this task"""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.005)
+        now = time.perf_counter()
+        gaps.append(now - last - 0.005)
+        last = now
+
+async def measure(render, cards):
+    gaps = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(gaps, stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    sizes = await render(cards)
+    took = time.perf_counter() - started
+    stop.set()
+    await tick
+    return took, max(gaps, default=0.0), sum(sizes) / len(sizes)
+
+async def inline(cards):
+    init_worker(FONT_PATH, BACKGROUND_IMAGE, CARD_TEMPLATE_DIR)
+    sizes = []
+    for card in cards:
+        sizes.append(len(render_rank_card(card)))
+        await asyncio.sleep(0)  # a command handler would yield between messages
+    return sizes
+
+def pooled(workers):
+    async def run(cards):
+        renderer = ImageRenderer(workers, FONT_PATH, BACKGROUND_IMAGE, CARD_TEMPLATE_DIR)
+        try:
+            # Warm up: spawn the workers and load their fonts before timing
+            await asyncio.gather(*(renderer.render(render_rank_card, cards[0]) for _ in range(workers * 2)))
+            return [len(png) for png in await asyncio.gather(
+                *(renderer.render(render_rank_card, card) for card in cards)
+            )]
+        finally:
+            renderer.close()
+    return run
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rank card rendering")
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 2])
+    args = parser.parse_args()
+
+    avatar = sample_avatar()
+    cards = [sample_card(avatar, i) for i in range(args.cards)]
+
+    print("=" * 50)
+    print(f"🖼️ Rank cards: {args.cards} renders, {os.cpu_count()} CPU(s)")
+    print("=" * 50)
+
+    runs = [("event loop", inline)] + [(f"{n} process(es)", pooled(n)) for n in sorted(set(args.workers))]
+    for label, render in runs:
+        took, stall, size = asyncio.run(measure(render, cards))
+        print(f"📊 {label:<14} {args.cards / took:7.1f} renders/sec  "
+              f"worst loop stall {stall * 1000:6.1f}ms  avg {size / 1024:.0f} KiB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
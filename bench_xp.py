@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from utils.connection import connect
+from utils.database import ConnectionPool
+from utils.migrations import migrate
+from utils.queries import AWARD_XP, FLUSH_XP
+
+# Per-message cost of the XP write paths, on a scratch database with the
+# bot's connection profile (WAL, synchronous from config.py). Measured twice:
+# straight on one connection (statement cost) and through the worker pool
+# the bot uses, where every round trip is also a thread hop.
+# Usage: python bench_xp.py [--messages 20000] [--users 500]
+
+GUILD_ID = 1438861170642522112
+
+def calculate_level(xp):
+    return max(1, xp // 1000 + 1)
+
+def legacy(conn, awards):
+    """Before: SELECT, INSERT for new users, then UPDATE (3 round trips, 2 commits)"""
+    for user_id, xp_gain in awards:
+        row = conn.execute(
+            "SELECT xp, level, messages FROM users WHERE user_id = ? AND guild_id = ?",
+            (user_id, GUILD_ID)
+        ).fetchone()
+        if row is None:
+            conn.execute(
+                "INSERT INTO users (user_id, guild_id, xp, level, messages) VALUES (?, ?, 0, 1, 0)",
+                (user_id, GUILD_ID)
+            )
+            row = (0, 1, 0)
+        new_xp = row[0] + xp_gain
+        conn.execute(
+            "UPDATE users SET xp = ?, level = ?, messages = messages + 1 WHERE user_id = ? AND guild_id = ?",
+            (new_xp, calculate_level(new_xp), user_id, GUILD_ID)
+        )
+
+def upsert(conn, awards):
+    """XP_WRITE_MODE=upsert: one INSERT ... ON CONFLICT ... RETURNING"""
+    leveled = 0
+    for user_id, xp_gain in awards:
+        cursor = conn.execute(AWARD_XP.sql, (GUILD_ID, user_id, xp_gain))
+        xp, level = cursor.fetchone()
+        cursor.close()
+        leveled += level > calculate_level(xp - xp_gain)
+    return leveled
+
+def buffered(conn, awards, flush_rows=500):
+    """XP_WRITE_MODE=buffer: deltas in memory, one executemany per flush"""
+    totals, pending = {}, {}
+
+    def flush():
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(FLUSH_XP.sql, [
+            (user_id, GUILD_ID, xp, level)
+            for user_id, (xp, level) in pending.items()
+        ])
+        conn.execute("COMMIT")
+        pending.clear()
+
+    for user_id, xp_gain in awards:
+        # The cog reads the total from its cache, a read on first sight only
+        total = totals.get(user_id)
+        if total is None:
+            row = conn.execute(
+                "SELECT xp FROM users WHERE user_id = ? AND guild_id = ?", (user_id, GUILD_ID)
+            ).fetchone()
+            total = row[0] if row else 0
+        total += xp_gain
+        totals[user_id] = total
+        entry = pending.setdefault(user_id, [0, 1])
+        entry[0] += xp_gain
+        entry[1] = calculate_level(total)
+        if len(pending) >= flush_rows:
+            flush()
+    if pending:
+        flush()
+
+async def legacy_pooled(pool, awards):
+    for user_id, xp_gain in awards:
+        row = await pool.run_async(lambda conn: conn.execute(
+            "SELECT xp, level, messages FROM users WHERE user_id = ? AND guild_id = ?",
+            (user_id, GUILD_ID)
+        ).fetchone())
+        if row is None:
+            await pool.run_async(lambda conn: conn.execute(
+                "INSERT INTO users (user_id, guild_id, xp, level, messages) VALUES (?, ?, 0, 1, 0)",
+                (user_id, GUILD_ID)
+            ))
+            row = (0, 1, 0)
+        new_xp = row[0] + xp_gain
+        await pool.run_async(lambda conn: conn.execute(
+            "UPDATE users SET xp = ?, level = ?, messages = messages + 1 WHERE user_id = ? AND guild_id = ?",
+            (new_xp, calculate_level(new_xp), user_id, GUILD_ID)
+        ))
+
+async def upsert_pooled(pool, awards):
+    for user_id, xp_gain in awards:
+        await pool.run_async(lambda conn: upsert(conn, [(user_id, xp_gain)]))
+
+async def buffered_pooled(pool, awards):
+    await pool.run_async(lambda conn: buffered(conn, awards))
+
+def run_pooled(name, fn, awards, workdir):
+    path = os.path.join(workdir, f"{name}-pooled.db")
+    conn = connect(path, isolation_level=None)
+    migrate(conn, verbose=False)
+    conn.close()
+
+    pool = ConnectionPool(path, 1)
+    try:
+        started = time.perf_counter()
+        asyncio.run(fn(pool, awards))
+        took = time.perf_counter() - started
+        totals = pool.run(lambda conn: conn.execute(
+            "SELECT COUNT(*), SUM(xp), SUM(level) FROM users"
+        ).fetchone())
+    finally:
+        pool.close()
+    return took, totals
+
+def run(name, fn, awards, workdir):
+    path = os.path.join(workdir, f"{name}.db")
+    conn = connect(path, isolation_level=None)
+    migrate(conn, verbose=False)
+    started = time.perf_counter()
+    fn(conn, awards)
+    took = time.perf_counter() - started
+    totals = conn.execute("SELECT COUNT(*), SUM(xp), SUM(level) FROM users").fetchone()
+    conn.close()
+    return took, totals
+
+def main():
+    parser = argparse.ArgumentParser(description="XP write path benchmark")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    user_ids = [rng.getrandbits(60) for _ in range(args.users)]
+    awards = [(rng.choice(user_ids), rng.randint(10, 20)) for _ in range(args.messages)]
+
+    print("=" * 50)
+    print(f"⚡ XP write paths: {args.messages} messages, {args.users} users")
+    print("=" * 50)
+
+    paths = {
+        "legacy": (legacy, legacy_pooled),
+        "upsert": (upsert, upsert_pooled),
+        "buffered": (buffered, buffered_pooled),
+    }
+    workdir = tempfile.mkdtemp(prefix="bench_xp_")
+    failures = 0
+    try:
+        for label, runner, pick in (("one connection", run, 0), ("worker pool", run_pooled, 1)):
+            print(f"🔧 {label}")
+            results = {}
+            for name, fns in paths.items():
+                took, totals = runner(name, fns[pick], awards, workdir)
+                results[name] = (took, totals)
+                per_message = took / args.messages * 1_000_000
+                print(f"📊 {name:<9} {per_message:8.1f} µs/message  {took:6.2f}s  rows={totals[0]} xp={totals[1]}")
+
+            # Every path has to end with the same data
+            if len({totals for _, totals in results.values()}) != 1:
+                print("❌ Paths disagree on the final totals")
+                failures += 1
+
+            base = results["legacy"][0]
+            for name in ("upsert", "buffered"):
+                print(f"✅ {name} is {base / results[name][0]:.1f}x faster than legacy")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
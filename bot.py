@@ -0,0 +1,119 @@
+import discord
+from discord.ext import commands
+import traceback
+from config import (
+    TOKEN, PREFIX, BOT_COLOR, FONT_PATH, BACKGROUND_IMAGE, CARD_TEMPLATE_DIR,
+    IMAGE_WORKERS, AVATAR_CACHE_DIR, AVATAR_CACHE_MB, CACHE_SYNC_INTERVAL
+)
+from utils.images import ImageRenderer
+from utils.avatars import AvatarCache
+from utils.db_metrics import origin as db_origin
+from utils.pipeline import MessagePipeline, MessageContext, COMMANDS
+from utils.change_feed import ChangeFeed
+from utils.shards import all_paths
+
+intents = discord.Intents.default()
+intents.message_content = True
+intents.members = True
+intents.guilds = True
+
+class StarFamilyBot(commands.Bot):
+    def __init__(self):
+        super().__init__(
+            command_prefix=PREFIX,
+            intents=intents,
+            help_command=None,
+            activity=discord.Activity(
+                type=discord.ActivityType.watching,
+                name="the stars 🌟"
+            )
+        )
+        self.color = BOT_COLOR
+        # Shared by the cogs that draw cards: render processes and the avatar cache
+        self.images = ImageRenderer(IMAGE_WORKERS, FONT_PATH, BACKGROUND_IMAGE, CARD_TEMPLATE_DIR)
+        self.avatars = AvatarCache(AVATAR_CACHE_DIR, AVATAR_CACHE_MB * 1024 * 1024)
+        # on_message stages (filter, anti-spam, XP, custom commands), the cogs register theirs
+        self.pipeline = MessagePipeline()
+        self.pipeline.register("commands", self.run_commands, COMMANDS, guild_only=False)
+        # Rows the dashboard or a script changed: cogs drop that guild's cache in on_cache_change
+        self.changes = ChangeFeed(all_paths(), CACHE_SYNC_INTERVAL, self.cache_changed)
+        self.before_invoke(self.tag_db_queries)
+    
+    async def setup_hook(self):
+        print("📦 Loading cogs...")
+        
+        cogs = [
+            'cogs.basic',
+            'cogs.moderation', 
+            'cogs.leveling',
+            'cogs.xp_admin',
+            'cogs.welcome',
+            'cogs.filtering',
+            'cogs.confession',      # 🔥 CLEAN VERSION
+            'cogs.custom_command',
+            'cogs.diagnostics',
+            'cogs.backup'
+        ]
+        
+        for cog in cogs:
+            try:
+                await self.load_extension(cog)
+                print(f"✅ Loaded: {cog}")
+            except Exception as e:
+                print(f"❌ Failed to load {cog}: {e}")
+        
+        # Add persistent views AFTER loading cogs
+        from cogs.confession import ConfessionStarterView, ConfessionMessageView, ThreadReplyView
+        self.add_view(ConfessionStarterView())
+        self.add_view(ConfessionMessageView())
+        self.add_view(ThreadReplyView())
+        print("✅ Persistent views registered")
+        
+        self.changes.start()
+    
+    async def on_message(self, message):
+        # Replaces the default listener: commands run as the last stage, after
+        # the filter had its chance to delete the message
+        if message.author.bot:
+            return
+        await self.pipeline.run(MessageContext(self, message))
+    
+    async def run_commands(self, ctx):
+        await self.process_commands(ctx.message)
+    
+    def cache_changed(self, table, guild_id):
+        self.dispatch("cache_change", table, guild_id)
+    
+    async def tag_db_queries(self, ctx):
+        """Runs before every command, db_metrics files its queries under Cog:command"""
+        cog = ctx.cog.qualified_name if ctx.cog else "bot"
+        db_origin.set(f"{cog}:{ctx.command.qualified_name}")
+    
+    async def close(self):
+        await self.changes.close()
+        await super().close()
+        self.images.close()
+        await self.avatars.close()
+        
+        # Stop database worker threads after cogs are unloaded
+        from utils.database import close_pool
+        close_pool()
+    
+    async def on_ready(self):
+        print(f"✅ Logged in as {self.user.name} ({self.user.id})")
+        print(f"🌟 Star Family Bot is ready!")
+        print(f"📊 Serving {len(self.guilds)} guilds")
+        
+        try:
+            synced = await self.tree.sync()
+            print(f"✅ Synced {len(synced)} slash commands")
+        except Exception as e:
+            print(f"❌ Error syncing commands: {e}")
+
+def main():
+    # Initialize database
+    from utils.database import init_db
+    init_db()
+    
+    print("🚀 Starting bot...")
+    StarFamilyBot().run(TOKEN)
\ No newline at end of file
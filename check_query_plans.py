@@ -0,0 +1,161 @@
+import ast
+import glob
+import os
+import re
+import sqlite3
+import sys
+from utils.migrations import migrate
+
+# Runs EXPLAIN QUERY PLAN for every SQL statement in the bot and dashboard
+# against a seeded copy of the schema. Fails when a statement falls back to
+# a full table scan, unless it is listed in ALLOWED_SCANS with a reason.
+# Usage: python check_query_plans.py
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCES = ["cogs/*.py", "web/run.py", "utils/*.py"]
+SQL_START = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|REPLACE)\s", re.IGNORECASE)
+TEMP_TABLE = re.compile(r"^\s*CREATE TEMP TABLE IF NOT EXISTS (\w+)", re.IGNORECASE)
+# "SCAN users" since SQLite 3.36, "SCAN TABLE users" before, either with a
+# USING ... tail; group 1 is the table, without a "temp." schema
+FULL_SCAN = re.compile(r"SCAN (?:TABLE )?(?:\w+\.)?(\w+)")
+
+# Statements that read a whole table on purpose (normalised whitespace)
+ALLOWED_SCANS = {
+    "SELECT COUNT(*) FROM users": "dashboard total, not per message",
+    "SELECT SUM(messages) FROM users": "dashboard total, not per message",
+    "SELECT COUNT(*) FROM custom_commands": "dashboard total, not per message",
+    "SELECT COUNT(*) FROM filtered_words": "dashboard total, not per message",
+    "SELECT cmd_name, response FROM custom_commands ORDER BY cmd_name": "dashboard lists every command",
+    "DELETE FROM custom_commands WHERE cmd_name = ?": "dashboard admin action across guilds",
+    "SELECT word FROM filtered_words ORDER BY word": "dashboard lists every word",
+    "DELETE FROM filtered_words WHERE word = ?": "dashboard admin action across guilds",
+    "SELECT word FROM filtered_words": "dashboard API lists every word",
+    "SELECT guild_id FROM users UNION SELECT guild_id FROM filtered_words UNION SELECT guild_id FROM custom_commands":
+        "dashboard server picker lists every guild",
+}
+
+def normalise(sql):
+    return " ".join(sql.split())
+
+def string_literals():
+    """[(file, line, text)] for every complete string literal in SOURCES"""
+    literals = []
+    for pattern in SOURCES:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, pattern))):
+            with open(path, encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=path)
+            # f-string pieces are not complete statements
+            fragments = {id(part) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr)
+                         for part in node.values}
+            # neither are docstrings ("Delete all but the newest ...")
+            fragments |= {id(node.body[0].value) for node in ast.walk(tree)
+                          if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef))
+                          and node.body and isinstance(node.body[0], ast.Expr)}
+            for node in ast.walk(tree):
+                if id(node) in fragments:
+                    continue
+                if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                    literals.append((os.path.relpath(path, ROOT_DIR), node.lineno, node.value))
+    return literals
+
+def collect_statements(literals):
+    """[(file, line, sql)] for every SQL statement among the literals"""
+    return [(path, line, sql) for path, line, sql in literals
+            if SQL_START.match(sql) and "sqlite_master" not in sql]
+
+def seed(conn, guilds=20, users_per_guild=500):
+    """Enough rows in every table for the planner to prefer real indexes"""
+    cur = conn.cursor()
+    for g in range(guilds):
+        guild_id = 1000 + g
+        cur.executemany(
+            "INSERT INTO users (user_id, guild_id, xp, level, messages) VALUES (?, ?, ?, ?, ?)",
+            [(u, guild_id, u * 37 % 50000, 1 + u % 50, u % 900) for u in range(users_per_guild)]
+        )
+        cur.executemany(
+            "INSERT INTO level_roles (guild_id, level, role_id) VALUES (?, ?, ?)",
+            [(guild_id, level, level) for level in range(1, 11)]
+        )
+        cur.executemany(
+            "INSERT INTO filtered_words (guild_id, word, added_by) VALUES (?, ?, 0)",
+            [(guild_id, f"word{w}") for w in range(50)]
+        )
+        cur.executemany(
+            "INSERT INTO custom_commands (guild_id, cmd_name, response) VALUES (?, ?, 'x')",
+            [(guild_id, f"cmd{c}") for c in range(20)]
+        )
+        cur.execute(
+            "INSERT INTO confession_setup (guild_id, confession_channel_id, current_number) VALUES (?, 1, 100)",
+            (guild_id,)
+        )
+        cur.executemany(
+            """INSERT INTO confession_messages (guild_id, user_id, message, confession_number, message_id, is_reply, created_at)
+               VALUES (?, 1, 'x', ?, 1, ?, datetime('now', ?))""",
+            [(guild_id, n, n % 3 == 0, f"-{n} hours") for n in range(100)]
+        )
+        cur.executemany(
+            """INSERT INTO scheduled_messages (schedule_id, guild_id, channel_id, hour, minute, message, enabled)
+               VALUES (?, ?, 1, ?, ?, 'x', ?)""",
+            [(f"{guild_id}_{s}", guild_id, s % 24, s % 60, s % 4 != 0) for s in range(10)]
+        )
+        cur.executemany(
+            "INSERT INTO channel_activity (guild_id, channel_id, minute, messages) VALUES (?, ?, ?, ?)",
+            [(guild_id, c % 5, 1_700_000_000 + c * 60, 1 + c % 7) for c in range(500)]
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+def create_temp_tables(conn, literals):
+    """Temp tables the bot creates at runtime, returns their names (full scans of them are the point)"""
+    names = set()
+    for _, _, sql in literals:
+        match = TEMP_TABLE.match(sql)
+        if match:
+            conn.execute(sql)
+            names.add(match.group(1))
+    return names
+
+def explain(conn, sql):
+    numbered = [int(n) for n in re.findall(r"\?(\d+)", sql)]
+    params = [None] * (max(numbered) if numbered else sql.count("?"))
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+def main():
+    conn = sqlite3.connect(":memory:")
+    migrate(conn, verbose=False)
+    seed(conn)
+    literals = string_literals()
+    temp_tables = create_temp_tables(conn, literals)
+
+    failures = 0
+    checked = 0
+    for path, line, sql in collect_statements(literals):
+        checked += 1
+        try:
+            plan = explain(conn, sql)
+        except sqlite3.Error as e:
+            print(f"❌ {path}:{line} does not prepare: {e}\n   {normalise(sql)}")
+            failures += 1
+            continue
+
+        scans = [match.group(1) for match in map(FULL_SCAN.match, plan)
+                 if match and match.group(1) not in temp_tables]
+        if not scans:
+            continue
+
+        reason = ALLOWED_SCANS.get(normalise(sql))
+        if reason:
+            print(f"⚪ {path}:{line} full scan allowed ({reason})")
+            continue
+
+        failures += 1
+        print(f"❌ {path}:{line} full table scan: {', '.join(scans)}\n   {normalise(sql)}")
+        for step in plan:
+            print(f"     {step}")
+
+    print("=" * 50)
+    print(f"📊 Checked {checked} statements, {failures} problem(s)")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
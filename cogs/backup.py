@@ -0,0 +1,84 @@
+import discord
+from discord.ext import commands, tasks
+import asyncio
+from datetime import datetime
+from utils.backup import take_snapshot, list_snapshots
+from config import DB_BACKUP_INTERVAL_MIN, DB_BACKUP_KEEP
+
+class Backup(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.lock = asyncio.Lock()  # one backup at a time, scheduled or manual
+        self.last = None
+    
+    async def cog_load(self):
+        if DB_BACKUP_INTERVAL_MIN > 0:
+            self.scheduled_backup.start()
+    
+    async def cog_unload(self):
+        self.scheduled_backup.cancel()
+    
+    async def run_backup(self):
+        """Copy runs in a worker thread, the bot keeps handling events meanwhile"""
+        async with self.lock:
+            self.last = await asyncio.to_thread(take_snapshot)
+            return self.last
+    
+    @tasks.loop(minutes=max(1, DB_BACKUP_INTERVAL_MIN))
+    async def scheduled_backup(self):
+        if self.scheduled_backup.current_loop == 0:
+            return  # first tick fires at startup, wait a full interval
+        try:
+            result = await self.run_backup()
+            print(f"💾 Backup {result['name']}: {result['bytes'] / 1024:.0f} KiB in {result['seconds']:.1f}s")
+        except Exception as e:
+            print(f"❌ Scheduled backup failed: {e}")
+    
+    @scheduled_backup.before_loop
+    async def before_scheduled_backup(self):
+        await self.bot.wait_until_ready()
+    
+    @commands.hybrid_command(name="backupnow", description="Take a database backup now (Owner only)")
+    @commands.is_owner()
+    async def backup_now(self, ctx):
+        await ctx.defer()
+        try:
+            result = await self.run_backup()
+        except Exception as e:
+            await ctx.send(f"❌ Backup failed: {e}")
+            return
+        
+        embed = discord.Embed(
+            title="💾 Backup Complete",
+            description=f"Snapshot `{result['name']}`",
+            color=discord.Color.green(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Files", value="\n".join(f"`{f}`" for f in result['files']) or "-", inline=True)
+        embed.add_field(name="Size", value=f"`{result['bytes'] / 1024:.0f} KiB`", inline=True)
+        embed.add_field(name="Took", value=f"`{result['seconds']:.1f}s`", inline=True)
+        if result['pruned']:
+            embed.set_footer(text=f"Removed {len(result['pruned'])} old snapshot(s), keeping {DB_BACKUP_KEEP}")
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="backups", description="List database backups (Owner only)")
+    @commands.is_owner()
+    async def backups(self, ctx):
+        names = list_snapshots()
+        if not names:
+            await ctx.send("📭 No backups yet!")
+            return
+        
+        embed = discord.Embed(
+            title="💾 Database Backups",
+            description="\n".join(f"`{name}`" for name in reversed(names)),
+            color=self.bot.color
+        )
+        if DB_BACKUP_INTERVAL_MIN > 0:
+            embed.set_footer(text=f"Every {DB_BACKUP_INTERVAL_MIN} min, keeping {DB_BACKUP_KEEP}")
+        else:
+            embed.set_footer(text="Scheduled backups are off")
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(Backup(bot))
\ No newline at end of file
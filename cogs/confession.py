@@ -2,8 +2,9 @@ import discord
 from discord.ext import commands
 from discord.ui import Button, View, Modal, TextInput
 import asyncio
-from datetime import datetime
-from utils.database import execute_query
+from datetime import datetime, timedelta
+from utils.database import fetch_one, fetch_value, execute
+from utils import queries
 
 # ========== VIEWS & MODALS ==========
 
@@ -109,60 +110,33 @@ class ConfessionSystem(commands.Cog):
     
     # ========== DATABASE HELPERS ==========
     
-    def get_setup(self, guild_id):
-        """Get confession setup"""
-        result = execute_query(
-            "SELECT confession_channel_id, current_number FROM confession_setup WHERE guild_id = ?",
-            (str(guild_id),),
-            fetch=True
-        )
-        return result
+    async def get_setup(self, guild_id):
+        """Get confession setup (GuildSetup or None)"""
+        return await fetch_one(queries.CONFESSION_SETUP, (guild_id,))
     
-    def save_setup(self, guild_id, channel_id, message_id=None):
+    async def save_setup(self, guild_id, channel_id, message_id=None):
         """Save confession setup"""
-        execute_query(
-            """INSERT OR REPLACE INTO confession_setup 
-               (guild_id, confession_channel_id, current_number, setup_message_id) 
-               VALUES (?, ?, 0, ?)""",
-            (str(guild_id), str(channel_id), str(message_id) if message_id else None)
+        await execute(
+            queries.SAVE_CONFESSION_SETUP,
+            (guild_id, channel_id, message_id)
         )
     
-    def get_next_number(self, guild_id):
-        """Get next confession number"""
-        result = execute_query(
-            "SELECT current_number FROM confession_setup WHERE guild_id = ?",
-            (str(guild_id),),
-            fetch=True
-        )
-        
-        if result:
-            next_num = result[0] + 1
-            execute_query(
-                "UPDATE confession_setup SET current_number = ? WHERE guild_id = ?",
-                (next_num, str(guild_id))
-            )
-            return next_num
-        
-        return 1
+    async def get_next_number(self, guild_id):
+        """Get next confession number (taken atomically, UPDATE ... RETURNING)"""
+        number = await fetch_one(queries.NEXT_CONFESSION_NUMBER, (guild_id,))
+        return number if number is not None else 1
     
-    def save_confession(self, guild_id, user_id, message, number, thread_id, message_id, is_reply=False, reply_to=None):
+    async def save_confession(self, guild_id, user_id, message, number, thread_id, message_id, is_reply=False, reply_to=None):
         """Save confession to database"""
-        execute_query(
-            """INSERT INTO confession_messages 
-               (guild_id, user_id, message, confession_number, thread_id, message_id, is_reply, reply_to) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (str(guild_id), str(user_id), message, number, str(thread_id), str(message_id), 
-             1 if is_reply else 0, str(reply_to) if reply_to else None)
+        await execute(
+            queries.SAVE_CONFESSION,
+            (guild_id, user_id, message, number, thread_id, message_id, 
+             1 if is_reply else 0, reply_to)
         )
     
-    def get_confession_info(self, guild_id, confession_number):
-        """Get confession info by number"""
-        result = execute_query(
-            "SELECT message_id, thread_id FROM confession_messages WHERE guild_id = ? AND confession_number = ?",
-            (str(guild_id), confession_number),
-            fetch=True
-        )
-        return result
+    async def get_confession_info(self, guild_id, confession_number):
+        """Get confession info by number (ConfessionLink or None)"""
+        return await fetch_one(queries.CONFESSION_LINK, (guild_id, confession_number))
     
     # ========== COMMANDS ==========
     
@@ -203,7 +177,7 @@ class ConfessionSystem(commands.Cog):
         starter_msg = await channel.send(embed=starter_embed, view=view)
         
         # Save setup
-        self.save_setup(ctx.guild.id, channel.id, starter_msg.id)
+        await self.save_setup(ctx.guild.id, channel.id, starter_msg.id)
         
         print(f"✅ Confession setup complete for guild {ctx.guild.id}")
         await ctx.send("✅ Confession system setup complete!", ephemeral=True)
@@ -212,10 +186,7 @@ class ConfessionSystem(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def log_confess(self, ctx, channel: discord.TextChannel):
         """Set log channel"""
-        execute_query(
-            "UPDATE confession_setup SET log_channel_id = ? WHERE guild_id = ?",
-            (str(channel.id), str(ctx.guild.id))
-        )
+        await execute(queries.SET_CONFESSION_LOG_CHANNEL, (channel.id, ctx.guild.id))
         
         await ctx.send(f"✅ Log channel set to {channel.mention}", ephemeral=True)
     
@@ -223,10 +194,7 @@ class ConfessionSystem(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def log_user_confess(self, ctx, channel: discord.TextChannel):
         """Set user log channel"""
-        execute_query(
-            "UPDATE confession_setup SET user_log_channel_id = ? WHERE guild_id = ?",
-            (str(channel.id), str(ctx.guild.id))
-        )
+        await execute(queries.SET_CONFESSION_USER_LOG_CHANNEL, (channel.id, ctx.guild.id))
         
         await ctx.send(f"✅ User log channel set to {channel.mention}", ephemeral=True)
     
@@ -234,26 +202,24 @@ class ConfessionSystem(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def confess_info(self, ctx, confession_number: int):
         """Get confession info"""
-        result = execute_query(
-            """SELECT user_id, message, created_at, is_reply, reply_to 
-               FROM confession_messages 
-               WHERE guild_id = ? AND confession_number = ?""",
-            (str(ctx.guild.id), confession_number),
-            fetch=True
-        )
+        confession = await fetch_one(queries.CONFESSION_INFO, (ctx.guild.id, confession_number))
         
-        if not result:
+        if not confession:
             await ctx.send(f"❌ Confession #{confession_number} not found!", ephemeral=True)
             return
         
-        user_id, message, created_at, is_reply, reply_to = result
+        user_id = confession.user_id
+        message = confession.message
+        created_at = confession.created_at
+        is_reply = confession.is_reply
+        reply_to = confession.reply_to
         
         embed = discord.Embed(
             title=f"🔍 Confession #{confession_number} Info",
             color=discord.Color.blue()
         )
         
-        member = ctx.guild.get_member(int(user_id))
+        member = ctx.guild.get_member(user_id)
         user_info = f"{member.mention} ({member})" if member else f"User ID: {user_id}"
         
         embed.add_field(name="Author", value=user_info, inline=False)
@@ -276,35 +242,22 @@ class ConfessionSystem(commands.Cog):
     @commands.hybrid_command(name="confessstats", description="Show confession stats")
     async def confess_stats(self, ctx):
         """Show statistics"""
-        setup = self.get_setup(ctx.guild.id)
+        setup = await self.get_setup(ctx.guild.id)
         if not setup:
             await ctx.send("❌ Confession system not setup!", ephemeral=True)
             return
         
         # Get counts
-        total_result = execute_query(
-            "SELECT COUNT(*) FROM confession_messages WHERE guild_id = ?",
-            (str(ctx.guild.id),),
-            fetch=True
-        )
-        
-        today = datetime.now().strftime("%Y-%m-%d")
-        today_result = execute_query(
-            """SELECT COUNT(*) FROM confession_messages 
-               WHERE guild_id = ? AND date(created_at) = ?""",
-            (str(ctx.guild.id), today),
-            fetch=True
-        )
-        
-        replies_result = execute_query(
-            "SELECT COUNT(*) FROM confession_messages WHERE guild_id = ? AND is_reply = 1",
-            (str(ctx.guild.id),),
-            fetch=True
+        guild_id = ctx.guild.id
+        today = datetime.now().date()
+        
+        total = await fetch_value(queries.COUNT_CONFESSIONS, (guild_id,), 0)
+        today_count = await fetch_value(
+            queries.COUNT_CONFESSIONS_BETWEEN,
+            (guild_id, today.isoformat(), (today + timedelta(days=1)).isoformat()),
+            0
         )
-        
-        total = total_result[0] if total_result else 0
-        today_count = today_result[0] if today_result else 0
-        replies = replies_result[0] if replies_result else 0
+        replies = await fetch_value(queries.COUNT_CONFESSION_REPLIES, (guild_id,), 0)
         
         embed = discord.Embed(
             title="📊 Confession Statistics",
@@ -339,8 +292,8 @@ class ConfessionSystem(commands.Cog):
             return
         
         # Get setup
-        setup = self.get_setup(interaction.guild.id)
-        if not setup or not setup[0]:
+        setup = await self.get_setup(interaction.guild.id)
+        if not setup or not setup.confession_channel_id:
             await interaction.followup.send(
                 "❌ Confession system not setup! Contact admin.", 
                 ephemeral=True
@@ -348,7 +301,7 @@ class ConfessionSystem(commands.Cog):
             return
         
         # Get confession channel
-        confession_channel = interaction.guild.get_channel(int(setup[0]))
+        confession_channel = interaction.guild.get_channel(setup.confession_channel_id)
         if not confession_channel:
             await interaction.followup.send(
                 "❌ Confession channel not found!", 
@@ -357,14 +310,14 @@ class ConfessionSystem(commands.Cog):
             return
         
         # Get next confession number
-        confession_number = self.get_next_number(interaction.guild.id)
+        confession_number = await self.get_next_number(interaction.guild.id)
         
         # ========== HANDLE REPLY ==========
         if is_reply and target_confession:
             target_number, target_message_id = target_confession
             
             # Get target confession info
-            target_info = self.get_confession_info(interaction.guild.id, target_number)
+            target_info = await self.get_confession_info(interaction.guild.id, target_number)
             if not target_info:
                 await interaction.followup.send(
                     f"❌ Confession #{target_number} not found!", 
@@ -372,11 +325,11 @@ class ConfessionSystem(commands.Cog):
                 )
                 return
             
-            target_msg_id, thread_id = target_info
+            target_msg_id, thread_id = target_info.message_id, target_info.thread_id
             
             # Get target message
             try:
-                target_msg = await confession_channel.fetch_message(int(target_msg_id))
+                target_msg = await confession_channel.fetch_message(target_msg_id)
             except:
                 await interaction.followup.send(
                     f"❌ Could not find confession #{target_number} message!", 
@@ -387,7 +340,7 @@ class ConfessionSystem(commands.Cog):
             # Get or create thread
             thread = None
             if thread_id:
-                thread = interaction.guild.get_thread(int(thread_id))
+                thread = interaction.guild.get_thread(thread_id)
             
             if not thread:
                 # Create thread if doesn't exist
@@ -398,9 +351,9 @@ class ConfessionSystem(commands.Cog):
                         reason="Confession thread created"
                     )
                     # Update database with thread ID
-                    execute_query(
-                        "UPDATE confession_messages SET thread_id = ? WHERE guild_id = ? AND confession_number = ?",
-                        (str(thread.id), str(interaction.guild.id), target_number)
+                    await execute(
+                        queries.SET_CONFESSION_THREAD,
+                        (thread.id, interaction.guild.id, target_number)
                     )
                 except Exception as e:
                     print(f"⚠️ Thread creation failed: {e}")
@@ -428,15 +381,13 @@ class ConfessionSystem(commands.Cog):
             await reply_msg.edit(view=reply_view)
             
             # Update reply count in original confession
-            execute_query(
-                """UPDATE confession_messages 
-                   SET replies_count = replies_count + 1 
-                   WHERE guild_id = ? AND confession_number = ?""",
-                (str(interaction.guild.id), target_number)
+            await execute(
+                queries.INCREMENT_CONFESSION_REPLIES,
+                (interaction.guild.id, target_number)
             )
             
             # Save to database
-            self.save_confession(
+            await self.save_confession(
                 interaction.guild.id,
                 interaction.user.id,
                 text,
@@ -489,7 +440,7 @@ class ConfessionSystem(commands.Cog):
         await confession_msg.edit(view=view)
         
         # Save to database
-        self.save_confession(
+        await self.save_confession(
             interaction.guild.id,
             interaction.user.id,
             text,
@@ -516,20 +467,16 @@ class ConfessionSystem(commands.Cog):
     async def send_logs(self, interaction, number, text, thread, is_reply=False, reply_to=None):
         """Send logs to configured channels - SILENT"""
         # Get log channels
-        result = execute_query(
-            "SELECT log_channel_id, user_log_channel_id FROM confession_setup WHERE guild_id = ?",
-            (str(interaction.guild.id),),
-            fetch=True
-        )
+        setup = await self.get_setup(interaction.guild.id)
         
-        if not result:
+        if not setup:
             return
         
-        log_id, user_log_id = result
+        log_id, user_log_id = setup.log_channel_id, setup.user_log_channel_id
         
         # Public log (if set)
         if log_id:
-            channel = interaction.guild.get_channel(int(log_id))
+            channel = interaction.guild.get_channel(log_id)
             if channel:
                 title = f"💬 Reply #{number}" if is_reply else f"📨 Confession #{number}"
                 
@@ -555,7 +502,7 @@ class ConfessionSystem(commands.Cog):
         
         # User log (admin only, if set)
         if user_log_id and interaction.user.guild_permissions.administrator:
-            channel = interaction.guild.get_channel(int(user_log_id))
+            channel = interaction.guild.get_channel(user_log_id)
             if channel:
                 title = f"👤 {'Reply' if is_reply else 'Confession'} #{number}"
                 
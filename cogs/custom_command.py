@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands, tasks
-from utils.database import execute_query
+from utils.database import fetch_all, execute
+from utils import queries
+from utils.pipeline import CUSTOM_COMMANDS
 import asyncio
 import json
 from datetime import datetime, time
@@ -12,68 +14,55 @@ class CustomCommand(commands.Cog):
         self.custom_commands_cache = {}
         self.scheduled_messages = []
         
-        # Create table if not exists
-        self.create_scheduled_table()
-        
         # Start scheduler
         self.scheduler.start()
     
-    def create_scheduled_table(self):
-        """Create scheduled messages table if not exists"""
-        execute_query('''
-        CREATE TABLE IF NOT EXISTS scheduled_messages (
-            schedule_id TEXT PRIMARY KEY,
-            guild_id TEXT,
-            channel_id TEXT,
-            hour INTEGER,
-            minute INTEGER,
-            message TEXT,
-            enabled INTEGER DEFAULT 1
-        )
-        ''')
+    async def cog_load(self):
+        self.bot.pipeline.register("custom_commands", self.run_custom_command, CUSTOM_COMMANDS)
+    
+    async def cog_unload(self):
+        self.bot.pipeline.unregister("custom_commands")
+    
+    @commands.Cog.listener()
+    async def on_cache_change(self, table, guild_id):
+        # Commands changed outside this cog (dashboard, scripts): reload on next use
+        if table == "custom_commands":
+            self.custom_commands_cache.pop(guild_id, None)
     
     async def load_custom_commands(self, guild_id):
         """Load custom commands from database"""
-        results = execute_query(
-            "SELECT cmd_name, response FROM custom_commands WHERE guild_id = ?",
-            (str(guild_id),),
-            fetchall=True
-        )
+        results = await fetch_all(queries.CUSTOM_COMMANDS, (guild_id,))
         
         if not results:
-            self.custom_commands_cache[str(guild_id)] = {}
+            self.custom_commands_cache[guild_id] = {}
             return {}
         
-        commands_dict = {name: response for name, response in results}
-        self.custom_commands_cache[str(guild_id)] = commands_dict
+        commands_dict = {row.cmd_name: row.response for row in results}
+        self.custom_commands_cache[guild_id] = commands_dict
         return commands_dict
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    async def run_custom_command(self, ctx):
         """Check for custom commands"""
-        if message.author.bot or not message.guild:
-            return
-        
-        # Check if message starts with bot prefix
-        if not message.content.startswith(self.bot.command_prefix):
+        # First word after the bot prefix, parsed once by the pipeline
+        cmd_name = ctx.command
+        if cmd_name is None:
             return
         
-        # Get command name
-        content = message.content[len(self.bot.command_prefix):].strip()
-        if not content:
+        # Built-ins win, also over a custom command saved under their name
+        # from outside !addcommand (dashboard, older rows)
+        if self.bot.get_command(cmd_name):
             return
         
-        # Get first word as command name
-        cmd_name = content.split()[0].lower()
-        
         # Load commands if not cached
-        guild_id = str(message.guild.id)
+        message = ctx.message
+        guild_id = message.guild.id
         if guild_id not in self.custom_commands_cache:
             await self.load_custom_commands(guild_id)
         
         # Check if command exists
         if cmd_name in self.custom_commands_cache.get(guild_id, {}):
             response = self.custom_commands_cache[guild_id][cmd_name]
+            ctx.stop("custom command")
             await message.channel.send(response)
     
     @commands.hybrid_command(name="addcommand", description="Add custom command (Admin only)")
@@ -98,18 +87,16 @@ class CustomCommand(commands.Cog):
             return
         
         # Save to database
-        execute_query(
-            """INSERT OR REPLACE INTO custom_commands 
-               (guild_id, cmd_name, response, created_by) 
-               VALUES (?, ?, ?, ?)""",
-            (str(ctx.guild.id), name, response, str(ctx.author.id))
+        await execute(
+            queries.SAVE_CUSTOM_COMMAND,
+            (ctx.guild.id, name, response, ctx.author.id)
         )
         
         # Update cache
-        if str(ctx.guild.id) not in self.custom_commands_cache:
-            self.custom_commands_cache[str(ctx.guild.id)] = {}
+        if ctx.guild.id not in self.custom_commands_cache:
+            self.custom_commands_cache[ctx.guild.id] = {}
         
-        self.custom_commands_cache[str(ctx.guild.id)][name] = response
+        self.custom_commands_cache[ctx.guild.id][name] = response
         
         embed = discord.Embed(
             title="✅ Custom Command Added",
@@ -126,16 +113,13 @@ class CustomCommand(commands.Cog):
         name = name.lower().strip()
         
         # Delete from database
-        deleted = execute_query(
-            "DELETE FROM custom_commands WHERE guild_id = ? AND cmd_name = ?",
-            (str(ctx.guild.id), name)
-        )
+        deleted = await execute(queries.DELETE_CUSTOM_COMMAND, (ctx.guild.id, name))
         
         if deleted > 0:
             # Remove from cache
-            if str(ctx.guild.id) in self.custom_commands_cache:
-                if name in self.custom_commands_cache[str(ctx.guild.id)]:
-                    del self.custom_commands_cache[str(ctx.guild.id)][name]
+            if ctx.guild.id in self.custom_commands_cache:
+                if name in self.custom_commands_cache[ctx.guild.id]:
+                    del self.custom_commands_cache[ctx.guild.id][name]
             
             await ctx.send(f"✅ Command `{self.bot.command_prefix}{name}` removed!")
         else:
@@ -190,24 +174,10 @@ class CustomCommand(commands.Cog):
             # Create scheduled message entry
             schedule_id = f"{ctx.guild.id}_{channel.id}_{hour:02d}{minute:02d}"
             
-            # Save to database (create table if not exists)
-            execute_query('''
-            CREATE TABLE IF NOT EXISTS scheduled_messages (
-                schedule_id TEXT PRIMARY KEY,
-                guild_id TEXT,
-                channel_id TEXT,
-                hour INTEGER,
-                minute INTEGER,
-                message TEXT,
-                enabled INTEGER DEFAULT 1
-            )
-            ''')
-            
-            execute_query(
-                """INSERT OR REPLACE INTO scheduled_messages 
-                   (schedule_id, guild_id, channel_id, hour, minute, message) 
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (schedule_id, str(ctx.guild.id), str(channel.id), hour, minute, message)
+            # Save to database
+            await execute(
+                queries.SAVE_SCHEDULED_MESSAGE,
+                (schedule_id, ctx.guild.id, channel.id, hour, minute, message)
             )
             
             embed = discord.Embed(
@@ -227,22 +197,24 @@ class CustomCommand(commands.Cog):
         now = datetime.now()
         
         # Get all scheduled messages
-        results = execute_query(
-            "SELECT guild_id, channel_id, hour, minute, message FROM scheduled_messages WHERE enabled = 1",
-            fetchall=True
-        )
+        try:
+            results = await fetch_all(queries.DUE_SCHEDULED_MESSAGES, (now.hour, now.minute))
+        except Exception as e:
+            print(f"❌ Scheduler query failed: {e}")
+            return
         
         if not results:
             return
         
-        for guild_id, channel_id, hour, minute, message in results:
-            if now.hour == hour and now.minute == minute:
+        for scheduled in results:
+            guild_id, channel_id, message = scheduled.guild_id, scheduled.channel_id, scheduled.message
+            if now.hour == scheduled.hour and now.minute == scheduled.minute:
                 try:
-                    guild = self.bot.get_guild(int(guild_id))
+                    guild = self.bot.get_guild(guild_id)
                     if not guild:
                         continue
                     
-                    channel = guild.get_channel(int(channel_id))
+                    channel = guild.get_channel(channel_id)
                     if not channel:
                         continue
                     
@@ -272,11 +244,7 @@ class CustomCommand(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def list_scheduled(self, ctx):
         """List all scheduled messages"""
-        results = execute_query(
-            "SELECT channel_id, hour, minute, message FROM scheduled_messages WHERE guild_id = ?",
-            (str(ctx.guild.id),),
-            fetchall=True
-        )
+        results = await fetch_all(queries.GUILD_SCHEDULED_MESSAGES, (ctx.guild.id,))
         
         if not results:
             await ctx.send("📭 No scheduled messages!")
@@ -287,13 +255,13 @@ class CustomCommand(commands.Cog):
             color=self.bot.color
         )
         
-        for channel_id, hour, minute, message in results:
-            channel = ctx.guild.get_channel(int(channel_id))
-            channel_name = channel.mention if channel else f"Channel {channel_id}"
+        for scheduled in results:
+            channel = ctx.guild.get_channel(scheduled.channel_id)
+            channel_name = channel.mention if channel else f"Channel {scheduled.channel_id}"
             
             embed.add_field(
-                name=f"⏰ {hour:02d}:{minute:02d} in {channel_name}",
-                value=message[:200] + ("..." if len(message) > 200 else ""),
+                name=f"⏰ {scheduled.hour:02d}:{scheduled.minute:02d} in {channel_name}",
+                value=scheduled.message[:200] + ("..." if len(scheduled.message) > 200 else ""),
                 inline=False
             )
         
@@ -303,10 +271,7 @@ class CustomCommand(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def clear_scheduled(self, ctx):
         """Clear all scheduled messages"""
-        deleted = execute_query(
-            "DELETE FROM scheduled_messages WHERE guild_id = ?",
-            (str(ctx.guild.id),)
-        )
+        deleted = await execute(queries.CLEAR_SCHEDULED_MESSAGES, (ctx.guild.id,))
         
         await ctx.send(f"✅ Removed {deleted} scheduled messages!")
 
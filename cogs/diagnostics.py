@@ -0,0 +1,106 @@
+import discord
+from discord.ext import commands, tasks
+import asyncio
+from datetime import datetime
+from utils.database import pool_stats
+from utils.cache import cache_stats
+from utils.db_metrics import metrics, write_snapshot
+from config import DB_STATS_FILE, DB_STATS_INTERVAL
+
+class Diagnostics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.snapshot_writer.start()
+
+    async def cog_unload(self):
+        self.snapshot_writer.cancel()
+        await self.save_snapshot()
+
+    def snapshot(self):
+        return {**metrics.snapshot(), "pools": pool_stats(), "caches": cache_stats(),
+                "pipeline": self.bot.pipeline.stats()}
+
+    async def save_snapshot(self):
+        """Write the stats file the dashboard's /dbstats page reads"""
+        try:
+            await asyncio.to_thread(write_snapshot, DB_STATS_FILE, self.snapshot())
+        except Exception as e:
+            print(f"⚠️ Could not write db stats snapshot: {e}")
+
+    @tasks.loop(seconds=max(5, DB_STATS_INTERVAL))
+    async def snapshot_writer(self):
+        await self.save_snapshot()
+
+    @commands.hybrid_command(name="dbstats", description="Database query stats (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def dbstats(self, ctx, top: int = 8, reset: bool = False):
+        """Slowest queries by total time, lock wait and recent slow queries"""
+        snapshot = self.snapshot()
+        top = max(1, min(top, 15))
+
+        embed = discord.Embed(
+            title="🗄️ Database Stats",
+            color=self.bot.color,
+            timestamp=datetime.now()
+        )
+
+        calls = sum(q["calls"] for q in snapshot["queries"].values())
+        errors = sum(q["errors"] for q in snapshot["queries"].values())
+        pools = ", ".join(
+            f"{name}: {pool['workers']}w/{pool['queued']}q" for name, pool in snapshot["pools"].items()
+        ) or "not started"
+        caches = ", ".join(
+            f"{name}: {c['hit_rate']}% hit ({c['size']}/{c['maxsize']}"
+            + (f", {c['kib']} KiB)" if "kib" in c else ")")
+            for name, c in snapshot["caches"].items()
+        ) or "none"
+        embed.description = (
+            f"Since <t:{int(snapshot['since'])}:R> · **{calls}** statements · **{errors}** errors\n"
+            f"🔒 Write lock wait: `{snapshot['lock_wait_ms']:.1f}ms` total\n"
+            f"🧵 Pools: {pools}\n"
+            f"🧠 Caches: {caches}"
+        )
+
+        for key, q in list(snapshot["queries"].items())[:top]:
+            embed.add_field(
+                name=key[:250],
+                value=(
+                    f"`{q['calls']}` calls · avg `{q['avg_ms']:.2f}ms` · p95 ≤`{q['p95_ms']}ms` · max `{q['max_ms']:.1f}ms`\n"
+                    f"rows `{q['rows']}` · errors `{q['errors']}` · queue wait `{q['avg_wait_ms']:.2f}ms`"
+                ),
+                inline=False
+            )
+
+        stages = snapshot["pipeline"]
+        if stages:
+            embed.add_field(
+                name=f"📨 Message pipeline ({self.bot.pipeline.messages} messages)",
+                value="\n".join(
+                    f"`{name}` {s['calls']} · avg `{s['avg_ms']:.2f}ms` · max `{s['max_ms']:.1f}ms`"
+                    f" · stopped {s['stops']} · errors {s['errors']}"
+                    for name, s in stages.items()
+                )[:1024],
+                inline=False
+            )
+
+        slow = snapshot["slow"][-5:]
+        if slow:
+            embed.add_field(
+                name=f"🐢 Recent slow queries (≥{snapshot['slow_ms']}ms)",
+                value="\n".join(
+                    f"`{s['ms']}ms` {s['query'][:60]} ← {s['origin']}" for s in reversed(slow)
+                )[:1024],
+                inline=False
+            )
+
+        if reset:
+            metrics.reset()
+            self.bot.pipeline.reset()
+            embed.set_footer(text="Counters have been reset")
+
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
\ No newline at end of file
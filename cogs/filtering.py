@@ -1,86 +1,125 @@
 import discord
 from discord.ext import commands
-from utils.database import execute_query
+from utils.database import fetch_all, execute
+from utils import queries
+from utils.cache import LRUCache
+from utils.filter_rules import RuleSet, compile_rule, PatternError
+from utils.pipeline import FILTER
+from config import FILTER_CACHE_GUILDS
+
+def rule_text(word):
+    """Filter rule as stored: lower case, except patterns where case means something (\\W, \\S)"""
+    word = word.strip()
+    return word if word.startswith("re:") else word.lower()
 
 class Filtering(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.filter_cache = {}
+        # {guild_id: RuleSet} a guild's filter rules, compiled to match in one pass
+        self.filter_cache = LRUCache("filters", FILTER_CACHE_GUILDS)
+    
+    async def cog_load(self):
+        # First stage: a deleted message goes no further (no XP, no spam count, no command)
+        self.bot.pipeline.register("filter", self.filter_message, FILTER)
+    
+    async def cog_unload(self):
+        self.bot.pipeline.unregister("filter")
         
+    @commands.Cog.listener()
+    async def on_cache_change(self, table, guild_id):
+        # Rules changed outside this cog (dashboard, scripts): recompile on the next message
+        if table == "filtered_words":
+            self.filter_cache.pop(guild_id)
+    
     async def load_filtered_words(self, guild_id):
-        results = execute_query(
-            "SELECT word FROM filtered_words WHERE guild_id = ?",
-            (str(guild_id),),
-            fetchall=True
-        )
+        results = await fetch_all(queries.FILTERED_WORDS, (guild_id,))
         
-        words = [row[0].lower() for row in results] if results else []
-        self.filter_cache[str(guild_id)] = words
+        words = [rule_text(word) for word in results]
+        rules = RuleSet()
+        for word in words:
+            try:
+                rules.add(compile_rule(word))
+            except PatternError as e:
+                print(f"⚠️ Skipping filter rule {word!r} in guild {guild_id}: {e}")
+        self.filter_cache.put(guild_id, rules)
         return words
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
+    async def get_matcher(self, guild_id):
+        matcher = self.filter_cache.get(guild_id)
+        if matcher is None:
+            await self.load_filtered_words(guild_id)
+            matcher = self.filter_cache.peek(guild_id)
+        return matcher
+    
+    async def filter_message(self, ctx):
+        message = ctx.message
         
         # 🔥 PERBAIKAN: Skip jika user punya permission manage_messages
         if message.author.guild_permissions.manage_messages:
             return
         
-        guild_id = str(message.guild.id)
-        
-        if guild_id not in self.filter_cache:
-            await self.load_filtered_words(guild_id)
-        
-        words = self.filter_cache.get(guild_id, [])
-        if not words:
+        matcher = await self.get_matcher(message.guild.id)
+        if not matcher:
             return
         
-        content = message.content.lower()
-        
-        for word in words:
-            if word in content:
-                try:
-                    await message.delete()
-                    
-                    # Log to console
-                    print(f"⚠️ Filtered message from {message.author}: {word}")
-                    
-                    # Try to DM user
-                    try:
-                        warning = discord.Embed(
-                            title="⚠️ Message Deleted",
-                            description="Your message was deleted because it contained a filtered word.",
-                            color=discord.Color.orange()
-                        )
-                        warning.add_field(name="Server", value=message.guild.name, inline=False)
-                        warning.add_field(name="Filtered Word", value=f"`{word}`", inline=False)
-                        await message.author.send(embed=warning)
-                    except:
-                        pass
-                    
-                except discord.Forbidden:
-                    print(f"❌ No permission to delete message in {message.guild.name}")
-                break
+        # Canonical form once (spacing, lookalikes, leetspeak undone) for words
+        # and wildcards, the lower-cased message for re: patterns
+        text = ctx.normalized
+        hits = matcher.search(text.text, ctx.lower)
+        if not hits:
+            return
+        found = list(dict.fromkeys(rule.source for _, _, rule in hits))
+        ctx.stop("filtered")
+        
+        try:
+            await message.delete()
+            
+            # Log to console, with the text as it was written
+            written = ", ".join(
+                f"{rule.source} ({ctx.lower[start:end] if rule.raw else text.excerpt(start, end)!r})"
+                for start, end, rule in hits[:10]
+            )
+            print(f"⚠️ Filtered message from {message.author}: {written}")
+            
+            # Try to DM user
+            try:
+                warning = discord.Embed(
+                    title="⚠️ Message Deleted",
+                    description="Your message was deleted because it contained a filtered word.",
+                    color=discord.Color.orange()
+                )
+                warning.add_field(name="Server", value=message.guild.name, inline=False)
+                warning.add_field(
+                    name="Filtered Word" if len(found) == 1 else "Filtered Words",
+                    value=", ".join(f"`{word}`" for word in found[:20]),
+                    inline=False
+                )
+                await message.author.send(embed=warning)
+            except:
+                pass
+            
+        except discord.Forbidden:
+            print(f"❌ No permission to delete message in {message.guild.name}")
     
-    @commands.hybrid_command(name="addfilter", description="Add word to filter (Admin only)")
+    @commands.hybrid_command(name="addfilter", description="Add word, =word, wild*card or re:pattern to filter (Admin only)")
     @commands.has_permissions(administrator=True)
     async def add_filter(self, ctx, *, word: str):
-        """Add word to filter list"""
-        word = word.lower().strip()
-        guild_id = str(ctx.guild.id)
+        """Add a filter rule: word (anywhere), =word (whole word), bad*, *bad, b?d or re:pattern"""
+        word = rule_text(word)
+        guild_id = ctx.guild.id
+        
+        try:
+            rule = compile_rule(word)
+        except PatternError as e:
+            await ctx.send(f"❌ Invalid filter rule `{word}`: {e}")
+            return
         
-        execute_query(
-            "INSERT OR IGNORE INTO filtered_words (guild_id, word, added_by) VALUES (?, ?, ?)",
-            (guild_id, word, str(ctx.author.id))
-        )
+        await execute(queries.ADD_FILTERED_WORD, (guild_id, word, ctx.author.id))
         
-        # Update cache
-        if guild_id in self.filter_cache:
-            if word not in self.filter_cache[guild_id]:
-                self.filter_cache[guild_id].append(word)
-        else:
-            self.filter_cache[guild_id] = [word]
+        # Update cache, the rule set recompiles on the next message
+        rules = self.filter_cache.peek(guild_id)
+        if rules is not None:
+            rules.add(rule)
         
         embed = discord.Embed(
             title="✅ Word Added to Filter",
@@ -92,16 +131,13 @@ class Filtering(commands.Cog):
     @commands.hybrid_command(name="removefilter", description="Remove word from filter (Admin only)")
     @commands.has_permissions(administrator=True)
     async def remove_filter(self, ctx, *, word: str):
-        word = word.lower().strip()
-        guild_id = str(ctx.guild.id)
+        word = rule_text(word)
+        guild_id = ctx.guild.id
         
-        execute_query(
-            "DELETE FROM filtered_words WHERE guild_id = ? AND word = ?",
-            (guild_id, word)
-        )
+        await execute(queries.REMOVE_FILTERED_WORD, (guild_id, word))
         
-        if guild_id in self.filter_cache and word in self.filter_cache[guild_id]:
-            self.filter_cache[guild_id].remove(word)
+        # Other rules may share this one's canonical form, reload on the next message
+        self.filter_cache.pop(guild_id)
         
         embed = discord.Embed(
             title="✅ Word Removed from Filter",
@@ -139,15 +175,11 @@ class Filtering(commands.Cog):
     @commands.hybrid_command(name="clearfilter", description="Clear all filtered words (Admin only)")
     @commands.has_permissions(administrator=True)
     async def clear_filter(self, ctx):
-        guild_id = str(ctx.guild.id)
+        guild_id = ctx.guild.id
         
-        execute_query(
-            "DELETE FROM filtered_words WHERE guild_id = ?",
-            (guild_id,)
-        )
+        await execute(queries.CLEAR_FILTERED_WORDS, (guild_id,))
         
-        if guild_id in self.filter_cache:
-            del self.filter_cache[guild_id]
+        self.filter_cache.put(guild_id, RuleSet())
         
         embed = discord.Embed(
             title="✅ Filter Cleared",
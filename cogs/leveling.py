@@ -1,74 +1,294 @@
 import discord
 from discord.ext import commands
+from discord.ui import Button, View
+import asyncio
+import io
 import random
-from datetime import datetime
-from utils.database import execute_query
+import time
+from bisect import bisect_right
+from utils.database import fetch_one, fetch_all, execute, transaction, shard_of
+from utils import queries
+from utils.queries import UserLevel, LeaderboardRow
+from utils.xp_buffer import XPBuffer
+from utils.activity import ActivityCounter
+from utils.cache import LRUCache, ExpiringCache
+from utils.ranking import Rankings
+from utils.images import render_rank_card
+from utils.xp_curves import XPCurve, DEFAULT_CURVE, KINDS as CURVE_KINDS
+from utils.pipeline import LEVELING
+from config import (
+    XP_FLUSH_INTERVAL_MS, XP_FLUSH_MAX_ROWS, LEVEL_CACHE_SIZE, XP_WRITE_MODE,
+    XP_COOLDOWN_SECONDS, COOLDOWN_MAX_KEYS, RANK_CACHE_GUILDS, RANK_REFRESH_SECONDS,
+    LEADERBOARD_PAGE_SIZE, LEADERBOARD_PAGE_TTL, LEADERBOARD_PAGE_CACHE,
+    LEVEL_ROLE_CACHE_GUILDS, LEVEL_ROLE_SYNC_CONCURRENCY, LEVEL_ROLE_SYNC_DELAY_MS,
+    XP_CURVE_CACHE_GUILDS, ACTIVITY_FLUSH_INTERVAL_MS, ACTIVITY_FLUSH_MAX_KEYS, ACTIVITY_RETENTION_DAYS
+)
+
+# ========== VIEWS ==========
+
+class LeaderboardView(View):
+    """First / previous / next / jump-to-me buttons under a !leaderboard message"""
+    def __init__(self, cog, guild, author, rows, total):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.guild = guild
+        self.author = author
+        self.rows = rows
+        self.start = 1  # rank of the first row shown
+        self.total = total
+        self.message = None
+        self.update_buttons()
+    
+    def embed(self):
+        return self.cog.leaderboard_embed(self.guild, self.rows, self.start, self.total)
+    
+    def update_buttons(self):
+        self.first_button.disabled = self.start <= 1
+        self.prev_button.disabled = self.start <= 1
+        self.next_button.disabled = self.start + len(self.rows) > self.total
+    
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message(
+                "❌ Run the leaderboard command yourself to browse it!", ephemeral=True
+            )
+            return False
+        return True
+    
+    async def show(self, interaction, rows, start):
+        if not rows:
+            await interaction.response.send_message("📭 No more members there!", ephemeral=True)
+            return
+        self.rows = rows
+        self.start = max(1, start)
+        ranking = await self.cog.get_ranking(self.guild.id)
+        self.total = len(ranking)
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+    
+    @discord.ui.button(label="First", style=discord.ButtonStyle.secondary, emoji="⏮️")
+    async def first_button(self, interaction: discord.Interaction, button: Button):
+        rows = await self.cog.leaderboard_page(self.guild.id)
+        await self.show(interaction, rows, 1)
+    
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def prev_button(self, interaction: discord.Interaction, button: Button):
+        first = self.rows[0]
+        rows = await self.cog.leaderboard_page(self.guild.id, "before", (first.xp, first.user_id))
+        await self.show(interaction, rows, self.start - len(rows))
+    
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_button(self, interaction: discord.Interaction, button: Button):
+        last = self.rows[-1]
+        rows = await self.cog.leaderboard_page(self.guild.id, "after", (last.xp, last.user_id))
+        await self.show(interaction, rows, self.start + len(self.rows))
+    
+    @discord.ui.button(label="Me", style=discord.ButtonStyle.primary, emoji="📍")
+    async def me_button(self, interaction: discord.Interaction, button: Button):
+        ranking = await self.cog.get_ranking(self.guild.id)
+        me = ranking.get(interaction.user.id)
+        if me is None:
+            await interaction.response.send_message("📭 You don't have any XP yet!", ephemeral=True)
+            return
+        rows = await self.cog.leaderboard_page(self.guild.id, "around", (me.xp, me.user_id))
+        above = next((i for i, row in enumerate(rows) if row.user_id == me.user_id), 0)
+        await self.show(interaction, rows, ranking.rank(me.user_id) - above)
+    
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
 
 class Leveling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.xp_cooldown = {}  # {(user_id, guild_id): last_message_time}
+        # (user_id, guild_id) that earned XP within the cooldown, expire on their own
+        self.xp_cooldown = ExpiringCache("xp_cooldown", XP_COOLDOWN_SECONDS, maxsize=COOLDOWN_MAX_KEYS)
         self.xp_range = (10, 20)
+        self.xp_buffer = XPBuffer(XP_FLUSH_INTERVAL_MS, XP_FLUSH_MAX_ROWS)
+        # Every message is counted here (users.messages, channel_activity), XP or not
+        self.activity = ActivityCounter(ACTIVITY_FLUSH_INTERVAL_MS, ACTIVITY_FLUSH_MAX_KEYS, ACTIVITY_RETENTION_DAYS)
+        # {(guild_id, user_id): UserLevel} current totals, buffered XP and messages included
+        self.user_cache = LRUCache("user_levels", LEVEL_CACHE_SIZE)
+        # Per-guild leaderboard order, updated on every XP award
+        self.rankings = Rankings(RANK_CACHE_GUILDS, RANK_REFRESH_SECONDS)
+        # {guild_id: XPCurve} loaded on first use, replaced by !setxpcurve
+        self.curves = LRUCache("xp_curves", XP_CURVE_CACHE_GUILDS)
+        # {guild_id: ([levels], [role ids])} reward roles sorted by level
+        self.level_roles = LRUCache("level_roles", LEVEL_ROLE_CACHE_GUILDS)
+        self.syncing_roles = set()  # guild ids with a !synclevelroles running
+        # {(guild_id, direction, key): rows} short-lived !leaderboard pages
+        self.leaderboard_pages = ExpiringCache(
+            "leaderboard_pages", LEADERBOARD_PAGE_TTL, maxsize=LEADERBOARD_PAGE_CACHE
+        )
+    
+    async def cog_load(self):
+        self.xp_buffer.start()
+        self.activity.start()
+        self.bot.pipeline.register("leveling", self.reward_message, LEVELING)
+    
+    async def cog_unload(self):
+        self.bot.pipeline.unregister("leveling")
+        # Flush buffered XP and message counts before the bot goes down
+        await self.xp_buffer.close()
+        await self.activity.close()
         
-    def calculate_level(self, xp):
-        return max(1, xp // 1000 + 1)
+    def calculate_level(self, xp, curve=DEFAULT_CURVE):
+        return curve.level_for(xp)
+    
+    def calculate_xp_for_level(self, level, curve=DEFAULT_CURVE):
+        return curve.xp_for_level(level)
     
-    def calculate_xp_for_level(self, level):
-        return (level - 1) * 1000
+    async def get_curve(self, guild_id):
+        """XP curve of a guild, DEFAULT_CURVE unless an admin set one"""
+        curve = self.curves.get(guild_id)
+        if curve is None:
+            row = await fetch_one(queries.XP_CURVE, (guild_id,))
+            curve = DEFAULT_CURVE
+            if row is not None:
+                try:
+                    curve = XPCurve.from_row(row.kind, row.params)
+                except (KeyError, TypeError, ValueError) as e:
+                    print(f"⚠️ Bad XP curve for guild {guild_id}, using the default: {e}")
+            self.curves.put(guild_id, curve)
+        return curve
     
     async def get_user_data(self, user_id, guild_id):
-        result = execute_query(
-            "SELECT xp, level, messages FROM users WHERE user_id = ? AND guild_id = ?",
-            (str(user_id), str(guild_id)),
-            fetch=True
-        )
+        """Current totals: from the cache, or the stored row plus buffered XP"""
+        key = (guild_id, user_id)
+        user = self.user_cache.get(key)
+        if user is not None:
+            return user
         
-        if result:
-            xp, level, messages = result
-            return {"xp": xp, "level": level, "messages": messages}
-        else:
-            # 🔥 PERBAIKAN: Insert dengan kedua primary key
-            execute_query(
-                "INSERT INTO users (user_id, guild_id, xp, level, messages) VALUES (?, ?, 0, 1, 0)",
-                (str(user_id), str(guild_id))
-            )
-            return {"xp": 0, "level": 1, "messages": 0}
+        async with self.xp_buffer.lock, self.activity.lock:
+            user = await fetch_one(queries.USER_LEVEL, (user_id, guild_id))
+            pending = self.xp_buffer.get(guild_id, user_id)
+            messages = self.activity.pending(guild_id, user_id)
+        
+        # New users get their row from the buffer flush (UPSERT)
+        if user is None:
+            user = UserLevel(0, 1, 0)
+        if pending:
+            user.xp += pending[0]
+            user.level = pending[1]
+        user.messages += messages
+        # Another message may have loaded the same user while we waited
+        return self.user_cache.setdefault(key, user)
+    
+    async def load_ranking(self, guild_id):
+        """Stored rows of a guild with buffered XP applied, for the ranking snapshot"""
+        async with self.xp_buffer.lock, self.activity.lock:
+            rows = await fetch_all(queries.GUILD_RANKING, (guild_id,))
+            by_user = {row.user_id: row for row in rows}
+            messages = self.activity.pending_guild(guild_id)
+            for user_id, (xp, level) in self.xp_buffer.pending_guild(guild_id).items():
+                row = by_user.get(user_id)
+                if row is None:
+                    row = by_user[user_id] = LeaderboardRow(user_id, 0, level, 0)
+                    rows.append(row)
+                row.xp += xp
+                row.level = level
+            for user_id, count in messages.items():
+                row = by_user.get(user_id)
+                if row is None:
+                    rows.append(LeaderboardRow(user_id, 0, 1, count))
+                else:
+                    row.messages += count
+        return rows
+    
+    async def get_ranking(self, guild_id):
+        return await self.rankings.get(guild_id, self.load_ranking)
+    
+    def forget_guild(self, guild_id):
+        """Drop a guild's cached totals and rankings after a bulk change in the database"""
+        for key in [key for key, _ in self.user_cache.items() if key[0] == guild_id]:
+            self.user_cache.pop(key)
+        self.rankings.invalidate(guild_id)
+        self.forget_pages(guild_id)
+    
+    def forget_pages(self, guild_id):
+        """Drop the guild's cached !leaderboard pages, other guilds keep theirs"""
+        for key in [key for key in self.leaderboard_pages.keys() if key[0] == guild_id]:
+            self.leaderboard_pages.pop(key)
+    
+    def update_ranking(self, guild_id, user_id, xp, level, messages=None):
+        """Move a member in the guild's ranking if that guild is loaded"""
+        ranking = self.rankings.loaded(guild_id)
+        if ranking is None:
+            return
+        if messages is None:
+            row = ranking.get(user_id)
+            messages = row.messages if row else self.activity.pending(guild_id, user_id)
+        ranking.set(user_id, xp, level, messages)
     
     async def add_xp(self, user_id, guild_id, xp_to_add):
+        if XP_WRITE_MODE == "upsert":
+            return await self.award_xp(user_id, guild_id, xp_to_add)
+        
         user_data = await self.get_user_data(user_id, guild_id)
-        new_xp = user_data["xp"] + xp_to_add
-        new_level = self.calculate_level(new_xp)
-        
-        # 🔥 PERBAIKAN: Update dengan kedua primary key
-        execute_query(
-            """UPDATE users 
-               SET xp = ?, level = ?, messages = messages + 1 
-               WHERE user_id = ? AND guild_id = ?""",
-            (new_xp, new_level, str(user_id), str(guild_id))
-        )
+        old_level = user_data.level
+        new_xp = user_data.xp + xp_to_add
+        new_level = self.calculate_level(new_xp, await self.get_curve(guild_id))
+        
+        # Cached totals change now, the row is written later in one batch (write-back)
+        user_data.xp = new_xp
+        user_data.level = new_level
+        self.xp_buffer.add(guild_id, user_id, xp_to_add, new_level)
+        self.update_ranking(guild_id, user_id, new_xp, new_level, user_data.messages)
         
-        if new_level > user_data["level"]:
+        if new_level > old_level:
             return True, new_level, new_xp
         return False, new_level, new_xp
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if (message.author.bot or not message.guild or 
-            message.content.startswith(tuple([self.bot.command_prefix, '/']))):
+    async def award_xp(self, user_id, guild_id, xp_to_add):
+        """Direct path: one UPSERT ... RETURNING, no read before the write"""
+        award = await fetch_one(queries.AWARD_XP, (guild_id, user_id, xp_to_add))
+        
+        cached = self.user_cache.peek((guild_id, user_id))
+        ranking = self.rankings.loaded(guild_id)
+        if cached is None and ranking is not None and ranking.get(user_id) is None:
+            # New to a loaded ranking: its row needs the exact message count, read it once
+            cached = await self.get_user_data(user_id, guild_id)
+        if cached is not None:
+            cached.xp = award.xp
+            cached.level = award.level
+        self.update_ranking(guild_id, user_id, award.xp, award.level,
+                            cached.messages if cached is not None else None)
+        
+        # The level is a function of XP, so the level before this award is known too
+        curve = await self.get_curve(guild_id)
+        leveled_up = award.level > self.calculate_level(award.xp - xp_to_add, curve)
+        return leveled_up, award.level, award.xp
+    
+    def count_message(self, guild_id, user_id, channel_id):
+        """Count one message: in-memory counter now, written by the next activity flush"""
+        self.activity.add(guild_id, user_id, channel_id)
+        cached = self.user_cache.peek((guild_id, user_id))
+        if cached is not None:
+            cached.messages += 1
+        ranking = self.rankings.loaded(guild_id)
+        row = ranking.get(user_id) if ranking is not None else None
+        if row is not None:
+            row.messages += 1
+    
+    async def reward_message(self, ctx):
+        # Filtered and spam messages never get here
+        if ctx.is_command:
             return
         
+        message = ctx.message
         user_id = message.author.id
         guild_id = message.guild.id
+        # Every message is counted, XP is only given once per cooldown
+        self.count_message(guild_id, user_id, message.channel.id)
         
         # Cooldown key dengan guild_id
-        cooldown_key = (user_id, guild_id)
-        current_time = datetime.now().timestamp()
-        
-        if cooldown_key in self.xp_cooldown:
-            if current_time - self.xp_cooldown[cooldown_key] < 60:
-                return
-        
-        self.xp_cooldown[cooldown_key] = current_time
+        if not self.xp_cooldown.try_add((user_id, guild_id)):
+            return
         
         xp_gain = random.randint(*self.xp_range)
         leveled_up, new_level, new_xp = await self.add_xp(user_id, guild_id, xp_gain)
@@ -76,34 +296,44 @@ class Leveling(commands.Cog):
         if leveled_up:
             await self.handle_level_up(message.author, guild_id, new_level, message.channel)
     
+    async def get_level_roles(self, guild_id):
+        """([levels], [role ids]) of a guild sorted by level, loaded once until !setlevelrole"""
+        table = self.level_roles.get(guild_id)
+        if table is None:
+            rows = await fetch_all(queries.LEVEL_ROLES, (guild_id,))
+            table = ([row.level for row in rows], [row.role_id for row in rows])
+            self.level_roles.put(guild_id, table)
+        return table
+    
+    async def reward_role_ids(self, guild_id, level):
+        """Every reward role at or below level, lowest first"""
+        levels, role_ids = await self.get_level_roles(guild_id)
+        return role_ids[:bisect_right(levels, level)]
+    
     async def handle_level_up(self, member, guild_id, new_level, channel):
-        result = execute_query(
-            "SELECT role_id FROM level_roles WHERE guild_id = ? AND level = ?",
-            (str(guild_id), new_level),
-            fetch=True
-        )
+        # All rewards up to this level: covers skipped levels and roles added later
+        role_ids = await self.reward_role_ids(guild_id, new_level)
+        roles = [member.guild.get_role(role_id) for role_id in role_ids]
+        missing = [role for role in roles if role and role not in member.roles]
         
-        if result:
-            role_id = int(result[0])
-            role = member.guild.get_role(role_id)
-            
-            if role and role not in member.roles:
-                try:
-                    await member.add_roles(role)
-                    
-                    embed = discord.Embed(
-                        title="🎉 Level Up!",
-                        description=f"{member.mention} has reached **Level {new_level}**!",
-                        color=self.bot.color
-                    )
-                    embed.add_field(name="🎁 Reward", value=f"Role {role.mention} has been given!", inline=False)
-                    
-                    if member.avatar:
-                        embed.set_thumbnail(url=member.avatar.url)
-                    
-                    await channel.send(embed=embed)
-                except discord.Forbidden:
-                    pass
+        if missing:
+            try:
+                await member.add_roles(*missing, reason=f"Level {new_level} reward")
+                
+                embed = discord.Embed(
+                    title="🎉 Level Up!",
+                    description=f"{member.mention} has reached **Level {new_level}**!",
+                    color=self.bot.color
+                )
+                given = ", ".join(role.mention for role in missing)
+                embed.add_field(name="🎁 Reward", value=f"Role {given} has been given!", inline=False)
+                
+                if member.avatar:
+                    embed.set_thumbnail(url=member.avatar.url)
+                
+                await channel.send(embed=embed)
+            except discord.Forbidden:
+                pass
         else:
             # Simple notification without role
             embed = discord.Embed(
@@ -113,18 +343,47 @@ class Leveling(commands.Cog):
             )
             await channel.send(embed=embed, delete_after=10)
     
+    async def rank_card(self, member, user_data):
+        """PNG rank card, rendered in the bot's image processes (None on failure)"""
+        try:
+            ranking = await self.get_ranking(member.guild.id)
+            curve = await self.get_curve(member.guild.id)
+            level_start = self.calculate_xp_for_level(user_data.level, curve)
+            avatar_url = member.display_avatar.replace(size=256, format="png").url
+            return await self.bot.images.render(render_rank_card, {
+                "guild_id": member.guild.id,
+                "name": member.display_name,
+                "avatar": await self.bot.avatars.get(avatar_url),
+                "level": user_data.level,
+                "rank": ranking.rank(member.id),
+                "total": len(ranking),
+                "xp": user_data.xp,
+                "level_xp": user_data.xp - level_start,
+                "level_span": self.calculate_xp_for_level(user_data.level + 1, curve) - level_start,
+            })
+        except Exception as e:
+            print(f"⚠️ Rank card failed: {e}")
+            return None
+    
     @commands.hybrid_command(name="level", description="Check your level or someone else's")
-    async def level(self, ctx, member: discord.Member = None):
+    async def level(self, ctx, member: discord.Member = None, card: bool = False):
         target = member or ctx.author
         user_data = await self.get_user_data(target.id, ctx.guild.id)
         
-        xp = user_data["xp"]
-        level = user_data["level"]
-        messages = user_data["messages"]
+        if card:
+            image = await self.rank_card(target, user_data)
+            if image:
+                await ctx.send(file=discord.File(io.BytesIO(image), filename="rank.png"))
+                return
+        
+        xp = user_data.xp
+        level = user_data.level
+        messages = user_data.messages
         
-        current_level_xp = self.calculate_xp_for_level(level)
-        next_level_xp = self.calculate_xp_for_level(level + 1)
-        xp_needed = next_level_xp - xp
+        curve = await self.get_curve(ctx.guild.id)
+        current_level_xp = self.calculate_xp_for_level(level, curve)
+        next_level_xp = self.calculate_xp_for_level(level + 1, curve)
+        xp_needed = max(0, next_level_xp - xp)
         progress = xp - current_level_xp
         total_needed = next_level_xp - current_level_xp
         
@@ -144,38 +403,65 @@ class Leveling(commands.Cog):
         embed.add_field(name="Progress", value=f"{progress_bar} **{progress}/{total_needed}** XP", inline=False)
         embed.add_field(name="XP Needed", value=f"**{xp_needed:,}** XP to next level", inline=False)
         
+        ranking = await self.get_ranking(ctx.guild.id)
+        rank = ranking.rank(target.id)
+        if rank is not None:
+            embed.insert_field_at(0, name="Rank", value=f"**#{rank:,}** of {len(ranking):,}", inline=True)
+            first, nearby = ranking.around(target.id, radius=2)
+            lines = []
+            for position, row in enumerate(nearby, first):
+                member = ctx.guild.get_member(row.user_id)
+                name = member.display_name if member else f"User ({row.user_id})"
+                marker = "▶ " if row.user_id == target.id else ""
+                lines.append(f"{marker}`#{position}` {name} · {row.xp:,} XP")
+            embed.add_field(name="Nearby", value="\n".join(lines), inline=False)
+        
         if target.avatar:
             embed.set_thumbnail(url=target.avatar.url)
         
         embed.set_footer(text=f"User ID: {target.id}")
         await ctx.send(embed=embed)
     
-    @commands.hybrid_command(name="leaderboard", description="Show server level leaderboard")
-    async def leaderboard(self, ctx):
-        results = execute_query(
-            """SELECT user_id, xp, level, messages 
-               FROM users 
-               WHERE guild_id = ? 
-               ORDER BY xp DESC 
-               LIMIT 10""",
-            (str(ctx.guild.id),),
-            fetchall=True
-        )
+    async def leaderboard_page(self, guild_id, direction="first", key=None):
+        """
+        One page of rows: "first", "after"/"before" an (xp, user_id) key, or
+        "around" it (jump to a member). Keyset queries, pages are cached for
+        LEADERBOARD_PAGE_TTL seconds so many people paging share the reads.
+        """
+        cache_key = (guild_id, direction, key)
+        rows = self.leaderboard_pages.get(cache_key)
+        if rows is not None:
+            return rows
         
-        if not results:
-            await ctx.send("📭 No level data available yet!")
-            return
+        # Rows come from the database, this guild's buffered XP and message
+        # counts have to be in it (other guilds' stay buffered)
+        await self.xp_buffer.flush(guild_id)
+        await self.activity.flush(guild_id)
+        size = LEADERBOARD_PAGE_SIZE
+        if direction == "first":
+            rows = await fetch_all(queries.LEADERBOARD_FIRST, (guild_id, size))
+        elif direction == "after":
+            rows = await fetch_all(queries.LEADERBOARD_AFTER, (guild_id, *key, size))
+        elif direction == "before":
+            rows = (await fetch_all(queries.LEADERBOARD_BEFORE, (guild_id, *key, size)))[::-1]
+        else:
+            above = (await fetch_all(queries.LEADERBOARD_BEFORE, (guild_id, *key, size // 2)))[::-1]
+            rows = above + await fetch_all(queries.LEADERBOARD_FROM, (guild_id, *key, size - len(above)))
         
+        self.leaderboard_pages.put(cache_key, rows)
+        return rows
+    
+    def leaderboard_embed(self, guild, rows, start, total):
         embed = discord.Embed(
             title="🏆 Level Leaderboard",
-            description=f"Top {len(results)} members in {ctx.guild.name}",
+            description=f"Top members in {guild.name}",
             color=self.bot.color
         )
         
         leaderboard_text = ""
-        for i, (user_id, xp, level, messages) in enumerate(results, 1):
-            member = ctx.guild.get_member(int(user_id))
-            name = member.mention if member else f"User ({user_id})"
+        for i, row in enumerate(rows, start):
+            member = guild.get_member(row.user_id)
+            name = member.mention if member else f"User ({row.user_id})"
             
             medal = ""
             if i == 1: medal = "🥇 "
@@ -183,14 +469,28 @@ class Leveling(commands.Cog):
             elif i == 3: medal = "🥉 "
             
             leaderboard_text += f"**{medal}{i}. {name}**\n"
-            leaderboard_text += f"   Level: `{level}` | XP: `{xp:,}` | Messages: `{messages}`\n\n"
+            leaderboard_text += f"   Level: `{row.level}` | XP: `{row.xp:,}` | Messages: `{row.messages}`\n\n"
         
         embed.description = leaderboard_text
+        pages = max(1, -(-total // LEADERBOARD_PAGE_SIZE))
+        page = min(pages, (start - 1) // LEADERBOARD_PAGE_SIZE + 1)
+        embed.set_footer(text=f"Page {page}/{pages} · {total:,} ranked members")
         
-        if ctx.guild.icon:
-            embed.set_thumbnail(url=ctx.guild.icon.url)
+        if guild.icon:
+            embed.set_thumbnail(url=guild.icon.url)
+        return embed
+    
+    @commands.hybrid_command(name="leaderboard", description="Show server level leaderboard")
+    async def leaderboard(self, ctx):
+        rows = await self.leaderboard_page(ctx.guild.id)
         
-        await ctx.send(embed=embed)
+        if not rows:
+            await ctx.send("📭 No level data available yet!")
+            return
+        
+        ranking = await self.get_ranking(ctx.guild.id)
+        view = LeaderboardView(self, ctx.guild, ctx.author, rows, len(ranking))
+        view.message = await ctx.send(embed=view.embed(), view=view)
     
     @commands.hybrid_command(name="setlevelrole", description="Set a role for specific level (Admin only)")
     @commands.has_permissions(administrator=True)
@@ -199,26 +499,20 @@ class Leveling(commands.Cog):
             await ctx.send("❌ Level must be at least 1!")
             return
         
-        execute_query(
-            """INSERT OR REPLACE INTO level_roles (guild_id, level, role_id) 
-               VALUES (?, ?, ?)""",
-            (str(ctx.guild.id), level, str(role.id))
-        )
+        await execute(queries.SET_LEVEL_ROLE, (ctx.guild.id, level, role.id))
+        self.level_roles.pop(ctx.guild.id)
         
         embed = discord.Embed(
             title="✅ Level Role Set",
             description=f"Role {role.mention} will be given at **Level {level}**",
             color=self.bot.color
         )
+        embed.set_footer(text=f"Use {ctx.prefix}synclevelroles to give it to members already past that level")
         await ctx.send(embed=embed)
     
     @commands.hybrid_command(name="levelroles", description="Show all configured level roles")
     async def show_level_roles(self, ctx):
-        results = execute_query(
-            "SELECT level, role_id FROM level_roles WHERE guild_id = ? ORDER BY level",
-            (str(ctx.guild.id),),
-            fetchall=True
-        )
+        results = await fetch_all(queries.LEVEL_ROLES, (ctx.guild.id,))
         
         if not results:
             await ctx.send("📭 No level roles configured yet!")
@@ -230,14 +524,154 @@ class Leveling(commands.Cog):
         )
         
         roles_list = ""
-        for level, role_id in results:
-            role = ctx.guild.get_role(int(role_id))
-            role_name = role.mention if role else f"Role not found ({role_id})"
-            roles_list += f"**Level {level}** → {role_name}\n"
+        for row in results:
+            role = ctx.guild.get_role(row.role_id)
+            role_name = role.mention if role else f"Role not found ({row.role_id})"
+            roles_list += f"**Level {row.level}** → {role_name}\n"
         
         embed.description = roles_list
         embed.set_footer(text=f"Use {ctx.prefix}setlevelrole <level> <role> to add more")
         await ctx.send(embed=embed)
+    
+    async def apply_curve(self, guild_id, curve):
+        """
+        Switch a guild to `curve` (None = default) and recompute every stored
+        level in one transaction: curve row, xp_levels table, one UPDATE.
+        Returns the number of members whose level changed.
+        """
+        # Anything buffered so far is flushed first and then fixed by the UPDATE
+        await self.xp_buffer.flush()
+        
+        async with transaction(shard_of(queries.SET_XP_CURVE, (guild_id,))) as tx:
+            await tx.execute(queries.DELETE_XP_LEVELS, (guild_id,))
+            if curve is None:
+                await tx.execute(queries.DELETE_XP_CURVE, (guild_id,))
+            else:
+                await tx.execute(queries.SET_XP_CURVE, (guild_id, curve.kind, curve.to_json()))
+                await tx.executemany(queries.INSERT_XP_LEVEL,
+                                     [(guild_id, level, xp) for level, xp in curve.rows()])
+            changed = await tx.execute(queries.RECALC_LEVELS, (guild_id,))
+        
+        # Committed: new awards use the new curve from here on, and in-memory
+        # copies follow the new levels. Awards buffered during the transaction
+        # carry levels from the old curve, the second UPDATE fixes those.
+        self.curves.put(guild_id, curve or DEFAULT_CURVE)
+        for (cached_guild, _), user in self.user_cache.items():
+            if cached_guild == guild_id:
+                user.level = (curve or DEFAULT_CURVE).level_for(user.xp)
+        if self.xp_buffer.pending:
+            await self.xp_buffer.flush()
+            await execute(queries.RECALC_LEVELS, (guild_id,))
+        self.rankings.invalidate(guild_id)
+        self.forget_pages(guild_id)
+        return changed
+    
+    @commands.hybrid_command(name="setxpcurve", description="Change how much XP each level needs (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def set_xp_curve(self, ctx, kind: str = None, *, values: str = ""):
+        """linear [step] | quadratic [base] | table 0,100,300,... | default"""
+        current = await self.get_curve(ctx.guild.id)
+        if kind is None:
+            embed = discord.Embed(
+                title="📈 XP Curve",
+                description=f"Current curve: **{current.describe()}**",
+                color=self.bot.color
+            )
+            embed.add_field(name="Levels", value="\n".join(
+                f"Level {level}: `{current.xp_for_level(level):,}` XP" for level in (2, 5, 10, 25, 50, 100)
+            ), inline=False)
+            embed.set_footer(text=f"Use {ctx.prefix}setxpcurve <{'|'.join(CURVE_KINDS)}|default> [values]")
+            await ctx.send(embed=embed)
+            return
+        
+        try:
+            curve = None if kind.lower() == "default" else XPCurve.parse(kind, values)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        try:
+            changed = await self.apply_curve(ctx.guild.id, curve)
+        except Exception as e:
+            await ctx.send(f"❌ Could not change the XP curve: {e}")
+            return
+        embed = discord.Embed(
+            title="✅ XP Curve Updated",
+            description=f"New curve: **{(curve or DEFAULT_CURVE).describe()}**\n"
+                        f"Levels recalculated, **{changed}** member(s) changed level.",
+            color=self.bot.color
+        )
+        embed.set_footer(text=f"Run {ctx.prefix}synclevelroles to update reward roles")
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="synclevelroles", description="Give every member the level roles they earned (Admin only)")
+    @commands.has_permissions(administrator=True)
+    @commands.bot_has_permissions(manage_roles=True)
+    async def sync_level_roles(self, ctx, strict: bool = False):
+        """Reconcile reward roles of all members, strict also removes rewards above a member's level"""
+        guild = ctx.guild
+        if guild.id in self.syncing_roles:
+            await ctx.send("⏳ A level role sync is already running for this server!")
+            return
+        
+        levels, role_ids = await self.get_level_roles(guild.id)
+        rewards = [(level, guild.get_role(role_id)) for level, role_id in zip(levels, role_ids)]
+        rewards = [(level, role) for level, role in rewards if role and role.is_assignable()]
+        if not rewards:
+            await ctx.send("📭 No level roles the bot can assign!")
+            return
+        
+        # Levels come from the ranking snapshot, buffered XP included
+        ranking = await self.get_ranking(guild.id)
+        edits = []
+        for member in guild.members:
+            if member.bot:
+                continue
+            row = ranking.get(member.id)
+            level = row.level if row else 0
+            current = set(member.roles)
+            wanted = {role for reward_level, role in rewards if reward_level <= level}
+            extra = {role for reward_level, role in rewards if reward_level > level} & current if strict else set()
+            if wanted - current or extra:
+                new_roles = [role for role in member.roles if role not in extra] + list(wanted - current)
+                edits.append((member, new_roles))
+        
+        if not edits:
+            await ctx.send("✅ Every member already has the right level roles!")
+            return
+        
+        self.syncing_roles.add(guild.id)
+        status = await ctx.send(f"🔄 Syncing level roles for **{len(edits)}** member(s)...")
+        done = failed = 0
+        last_report = time.monotonic()
+        # Concurrent edits, each slot waits between requests to stay under the rate limit
+        slots = asyncio.Semaphore(LEVEL_ROLE_SYNC_CONCURRENCY)
+        
+        async def edit(member, roles):
+            nonlocal done, failed, last_report
+            async with slots:
+                try:
+                    await member.edit(roles=roles, reason="Level role sync")
+                    done += 1
+                except discord.HTTPException:
+                    failed += 1
+                await asyncio.sleep(LEVEL_ROLE_SYNC_DELAY_MS / 1000)
+            if time.monotonic() - last_report >= 5:
+                last_report = time.monotonic()
+                try:
+                    await status.edit(content=f"🔄 Syncing level roles: {done + failed}/{len(edits)}...")
+                except discord.HTTPException:
+                    pass
+        
+        try:
+            await asyncio.gather(*(edit(member, roles) for member, roles in edits))
+        finally:
+            self.syncing_roles.discard(guild.id)
+        
+        summary = f"✅ Level roles synced: **{done}** member(s) updated"
+        if failed:
+            summary += f", ❌ **{failed}** failed"
+        await status.edit(content=summary)
 
 async def setup(bot):
     await bot.add_cog(Leveling(bot))
\ No newline at end of file
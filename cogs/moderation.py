@@ -1,13 +1,23 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
+from collections import deque
 from datetime import timedelta
+from utils.cache import ExpiringCache
+from utils.pipeline import ANTI_SPAM
+from config import COOLDOWN_MAX_KEYS
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.spam_cache = {}  # {user_id: [messages, timestamp]}
+        # {user_id: deque of (content, timestamp)}, a user drops out 10s after their last message
+        self.spam_cache = ExpiringCache("spam_tracker", 10, maxsize=COOLDOWN_MAX_KEYS)
+
+    async def cog_load(self):
+        self.bot.pipeline.register("anti_spam", self.check_spam, ANTI_SPAM)
+
+    async def cog_unload(self):
+        self.bot.pipeline.unregister("anti_spam")
 
     @commands.hybrid_command(name="kick", description="Kick a member")
     @commands.has_permissions(kick_members=True)
@@ -97,33 +107,31 @@ class Moderation(commands.Cog):
         await member.timeout(None)
         await ctx.send(f"✅ Timeout removed from {member.mention}")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        # Anti-spam system
-        if message.author.bot or not message.guild:
-            return
-        
+    async def check_spam(self, ctx):
+        # Anti-spam system, sees only messages the filter let through
+        message = ctx.message
         user_id = message.author.id
         current_time = message.created_at.timestamp()
         
-        if user_id not in self.spam_cache:
-            self.spam_cache[user_id] = []
+        history = self.spam_cache.get(user_id)
+        if history is None:
+            history = deque(maxlen=5)
         
         # Simpan pesan (max 5 pesan terakhir)
-        self.spam_cache[user_id].append((message.content, current_time))
-        if len(self.spam_cache[user_id]) > 5:
-            self.spam_cache[user_id].pop(0)
+        history.append((message.content, current_time))
+        self.spam_cache.put(user_id, history)
         
         # Cek spam: 5 pesan sama dalam 10 detik
-        if len(self.spam_cache[user_id]) >= 5:
-            messages = [msg[0] for msg in self.spam_cache[user_id]]
-            times = [msg[1] for msg in self.spam_cache[user_id]]
+        if len(history) >= 5:
+            messages = [msg[0] for msg in history]
+            times = [msg[1] for msg in history]
             
             # Cek jika semua pesan sama
             if all(msg == messages[0] for msg in messages):
                 time_diff = times[-1] - times[0]
                 if time_diff < 10:  # 5 pesan berulang dalam 10 detik
-                    # Timeout user
+                    # Timeout user, the message earns no XP
+                    ctx.stop("spam")
                     try:
                         duration = timedelta(minutes=5)
                         await message.author.timeout(duration, reason="Anti-spam: 5 repeated messages")
@@ -131,15 +139,14 @@ class Moderation(commands.Cog):
                         # Hapus pesan spam
                         await message.delete()
                         
-                        # Kirim warning
-                        warning = await message.channel.send(
-                            f"⚠️ {message.author.mention} has been timed out for 5 minutes due to spam!"
+                        # Kirim warning, deleted by discord.py after 5s without holding up the pipeline
+                        await message.channel.send(
+                            f"⚠️ {message.author.mention} has been timed out for 5 minutes due to spam!",
+                            delete_after=5
                         )
-                        await asyncio.sleep(5)
-                        await warning.delete()
                         
                         # Reset cache untuk user ini
-                        self.spam_cache[user_id] = []
+                        self.spam_cache.pop(user_id)
                     except:
                         pass
 
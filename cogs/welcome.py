@@ -1,10 +1,9 @@
 import discord
 from discord.ext import commands
-from PIL import Image, ImageDraw, ImageFont
 import io
-import os
-from config import BACKGROUND_IMAGE, FONT_PATH
-from utils.database import execute_query
+from utils.images import render_welcome_card
+from utils.database import fetch_one, execute
+from utils import queries
 
 class Welcome(commands.Cog):
     def __init__(self, bot):
@@ -13,13 +12,9 @@ class Welcome(commands.Cog):
     async def get_welcome_channel(self, guild_id):
         """Get welcome channel from database"""
         try:
-            result = execute_query(
-                "SELECT channel_id FROM welcome_config WHERE guild_id = ?",
-                (str(guild_id),),
-                fetch=True
-            )
-            if result and result[0]:
-                return int(result[0])
+            channel_id = await fetch_one(queries.WELCOME_CHANNEL, (guild_id,))
+            if channel_id:
+                return channel_id
             return None
         except Exception as e:
             print(f"⚠️ Welcome config error: {e}")
@@ -27,11 +22,7 @@ class Welcome(commands.Cog):
     
     async def set_welcome_channel(self, guild_id, channel_id):
         """Set welcome channel in database"""
-        execute_query(
-            """INSERT OR REPLACE INTO welcome_config (guild_id, channel_id) 
-               VALUES (?, ?)""",
-            (str(guild_id), str(channel_id))
-        )
+        await execute(queries.SET_WELCOME_CHANNEL, (guild_id, channel_id))
     
     @commands.Cog.listener()
     async def on_member_join(self, member):
@@ -79,37 +70,15 @@ class Welcome(commands.Cog):
             await channel.send(embed=embed)
     
     async def create_welcome_image(self, member):
-        """Create simple welcome image"""
+        """Create simple welcome image (drawn in the bot's render processes)"""
         try:
-            # Create basic image
-            img = Image.new('RGB', (800, 300), color=(26, 26, 46))
-            draw = ImageDraw.Draw(img)
-            
-            # Try to load font
-            try:
-                if os.path.exists(FONT_PATH):
-                    font_large = ImageFont.truetype(FONT_PATH, 40)
-                    font_small = ImageFont.truetype(FONT_PATH, 30)
-                else:
-                    font_large = ImageFont.load_default(size=40)
-                    font_small = ImageFont.load_default(size=30)
-            except:
-                font_large = ImageFont.load_default()
-                font_small = ImageFont.load_default()
-            
-            # Draw text
-            draw.text((400, 100), f"Welcome {member.name}!", 
-                     fill=(255, 255, 255), font=font_large, anchor="mm")
-            draw.text((400, 160), f"to {member.guild.name}", 
-                     fill=(200, 200, 255), font=font_small, anchor="mm")
-            draw.text((400, 220), f"Member #{member.guild.member_count}", 
-                     fill=(170, 170, 255), font=font_small, anchor="mm")
-            
-            # Convert to bytes
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            return img_bytes
+            png = await self.bot.images.render(render_welcome_card, {
+                "guild_id": member.guild.id,
+                "name": member.name,
+                "guild_name": member.guild.name,
+                "member_count": member.guild.member_count,
+            })
+            return io.BytesIO(png)
             
         except Exception as e:
             print(f"Image creation failed: {e}")
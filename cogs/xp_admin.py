@@ -0,0 +1,217 @@
+import discord
+from discord.ext import commands
+from discord.ui import Button, View
+import asyncio
+import csv
+import io
+import time
+from utils.database import execute, transaction, shard_of
+from utils import queries
+from config import XP_BULK_CHUNK, XP_IMPORT_MAX_MB
+
+# ========== VIEWS ==========
+
+class ConfirmView(View):
+    """Yes / cancel buttons for the destructive bulk commands, only the author can answer"""
+    def __init__(self, author):
+        super().__init__(timeout=60)
+        self.author = author
+        self.confirmed = None
+    
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.author.id:
+            await interaction.response.send_message("❌ Only the admin who ran the command can answer!", ephemeral=True)
+            return False
+        return True
+    
+    @discord.ui.button(label="Reset", style=discord.ButtonStyle.danger, emoji="🗑️")
+    async def confirm_button(self, interaction: discord.Interaction, button: Button):
+        self.confirmed = True
+        await interaction.response.edit_message(view=None)
+        self.stop()
+    
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel_button(self, interaction: discord.Interaction, button: Button):
+        self.confirmed = False
+        await interaction.response.edit_message(content="❎ Cancelled.", view=None)
+        self.stop()
+
+# ========== CSV IMPORT ==========
+
+def parse_xp_csv(data):
+    """
+    (rows, skipped) from CSV bytes: user_id,xp[,messages] per line. A header
+    line and lines that aren't numbers are skipped, a user listed twice keeps
+    the last line. messages is None on lines without it (stored count kept).
+    """
+    rows = {}
+    skipped = 0
+    for line in csv.reader(io.StringIO(data.decode("utf-8-sig"))):
+        try:
+            user_id = int(line[0])
+            xp = int(line[1])
+            messages = int(line[2]) if len(line) > 2 and line[2].strip() else None
+        except (IndexError, ValueError):
+            skipped += 1
+            continue
+        rows[user_id] = (user_id, xp, messages)
+    return list(rows.values()), skipped
+
+class XPAdmin(commands.Cog):
+    """
+    Bulk XP changes for a role, the whole server or a CSV file. Every command
+    is one transaction on the guild's database: the target rows are staged
+    into a temp table with chunked executemany, then one set-based statement
+    changes all users and RECALC_LEVELS fixes their levels.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.running = set()  # guild ids with a bulk change in progress
+    
+    @property
+    def leveling(self):
+        return self.bot.get_cog("Leveling")
+    
+    def targets(self, guild, role):
+        """Member ids a grant/removal/reset applies to, bots excluded"""
+        members = role.members if role else guild.members
+        return [member.id for member in members if not member.bot]
+    
+    async def run_bulk(self, ctx, label, rows, apply, *apply_params):
+        """
+        Stage rows, run `apply` (a BULK_XP_* query taking the guild id and
+        apply_params) and recalculate levels, all in one transaction.
+        Returns the number of users changed.
+        """
+        guild_id = ctx.guild.id
+        if guild_id in self.running:
+            await ctx.send("⏳ A bulk XP change is already running for this server!")
+            return None
+    
+        self.running.add(guild_id)
+        status = await ctx.send(f"🔄 {label}: updating **{len(rows):,}** member(s)...")
+        started = time.perf_counter()
+        leveling = self.leveling
+        try:
+            # Buffered awards land first, so the bulk statement sees current totals
+            if leveling:
+                await leveling.xp_buffer.flush()
+    
+            # Nothing but database work in here: the block holds the shard's
+            # write lock, XP flushes and other writers wait until it ends
+            async with transaction(shard_of(apply, (guild_id,))) as tx:
+                await tx.execute(queries.BULK_XP_TABLE)
+                await tx.execute(queries.BULK_XP_CLEAR)
+                for start in range(0, len(rows), XP_BULK_CHUNK):
+                    await tx.executemany(queries.BULK_XP_STAGE, rows[start:start + XP_BULK_CHUNK])
+                changed = await tx.execute(apply, (guild_id, *apply_params))
+                await tx.execute(queries.RECALC_LEVELS, (guild_id,))
+                await tx.execute(queries.BULK_XP_CLEAR)
+        except Exception as e:
+            self.running.discard(guild_id)
+            await status.edit(content=f"❌ {label} failed, nothing was changed: {e}")
+            return None
+    
+        try:
+            if leveling:
+                # Awards buffered during the transaction carry levels from the old totals
+                leveling.forget_guild(guild_id)
+                await leveling.xp_buffer.flush()
+                await execute(queries.RECALC_LEVELS, (guild_id,))
+        finally:
+            self.running.discard(guild_id)
+    
+        await status.edit(content=f"✅ {label}: **{changed:,}** member(s) updated "
+                                  f"in {time.perf_counter() - started:.1f}s")
+        return changed
+    
+    @commands.hybrid_command(name="xpgrant", description="Give XP to every member of a role or the server (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def xp_grant(self, ctx, amount: int, role: discord.Role = None):
+        if amount <= 0:
+            await ctx.send("❌ Amount must be positive!")
+            return
+        rows = [(user_id, amount, 0) for user_id in self.targets(ctx.guild, role)]
+        if not rows:
+            await ctx.send("📭 No members to give XP to!")
+            return
+        await self.run_bulk(ctx, f"Granting {amount:,} XP", rows, queries.BULK_XP_ADD)
+    
+    @commands.hybrid_command(name="xpremove", description="Take XP from every member of a role or the server (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def xp_remove(self, ctx, amount: int, role: discord.Role = None):
+        if amount <= 0:
+            await ctx.send("❌ Amount must be positive!")
+            return
+        rows = [(user_id, amount, None) for user_id in self.targets(ctx.guild, role)]
+        if not rows:
+            await ctx.send("📭 No members to take XP from!")
+            return
+        await self.run_bulk(ctx, f"Removing {amount:,} XP", rows, queries.BULK_XP_SUBTRACT)
+    
+    @commands.hybrid_command(name="xpreset", description="Reset XP of a role or the whole server (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def xp_reset(self, ctx, role: discord.Role = None):
+        target = f"everyone with {role.mention}" if role else "**every member of this server**"
+        view = ConfirmView(ctx.author)
+        prompt = await ctx.send(f"⚠️ Reset XP, levels and message counts of {target}? This can't be undone.", view=view)
+        await view.wait()
+        if not view.confirmed:
+            if view.confirmed is None:
+                await prompt.edit(content="⌛ Reset timed out.", view=None)
+            return
+    
+        if role is not None:
+            rows = [(user_id, 0, None) for user_id in self.targets(ctx.guild, role)]
+            await self.run_bulk(ctx, f"Resetting {role.name}", rows, queries.BULK_XP_RESET)
+            return
+    
+        # The whole guild needs no staging, members who left are reset too
+        guild_id = ctx.guild.id
+        if guild_id in self.running:
+            await ctx.send("⏳ A bulk XP change is already running for this server!")
+            return
+        self.running.add(guild_id)
+        leveling = self.leveling
+        try:
+            if leveling:
+                await leveling.xp_buffer.flush()
+            changed = await execute(queries.GUILD_XP_RESET, (guild_id,))
+            if leveling:
+                leveling.forget_guild(guild_id)
+        finally:
+            self.running.discard(guild_id)
+        await ctx.send(f"✅ XP reset for **{changed:,}** member(s)")
+    
+    @commands.hybrid_command(name="xpimport", description="Import XP from a CSV file: user_id,xp[,messages] (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def xp_import(self, ctx, file: discord.Attachment = None, mode: str = "set"):
+        """mode set replaces stored XP (moving from another bot), add adds to it"""
+        if file is None and ctx.message and ctx.message.attachments:
+            file = ctx.message.attachments[0]
+        if file is None:
+            await ctx.send("❌ Attach a CSV file with `user_id,xp[,messages]` lines!")
+            return
+        mode = mode.lower()
+        if mode not in ("set", "add"):
+            await ctx.send("❌ Mode must be `set` or `add`!")
+            return
+        if file.size > XP_IMPORT_MAX_MB * 1024 * 1024:
+            await ctx.send(f"❌ File is too big, the limit is {XP_IMPORT_MAX_MB} MB!")
+            return
+    
+        await ctx.defer()
+        rows, skipped = await asyncio.to_thread(parse_xp_csv, await file.read())
+        if not rows:
+            await ctx.send("📭 No `user_id,xp` lines found in that file!")
+            return
+        if skipped:
+            await ctx.send(f"⚠️ Skipped {skipped:,} line(s) that weren't `user_id,xp[,messages]`")
+    
+        if mode == "add":
+            await self.run_bulk(ctx, "Importing XP (add)", rows, queries.BULK_XP_ADD)
+        else:
+            await self.run_bulk(ctx, "Importing XP (set)", rows, queries.BULK_XP_SET)
+
+async def setup(bot):
+    await bot.add_cog(XPAdmin(bot))
\ No newline at end of file
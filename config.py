@@ -7,7 +7,90 @@ TOKEN = os.getenv("DISCORD_TOKEN")
 PREFIX = os.getenv("BOT_PREFIX", "!")
 BOT_COLOR = int(os.getenv("BOT_COLOR", "0x1a1a2e"), 16)
 
-DATABASE_PATH = os.getenv("DATABASE_PATH", "data/bot.db")
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def project_path(path):
+    """Relative paths are resolved from the project root so the bot and web/ share files"""
+    if path and not os.path.isabs(path):
+        return os.path.join(ROOT_DIR, path)
+    return path
+
+DATABASE_PATH = project_path(os.getenv("DATABASE_PATH", "data/bot.db"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))  # worker threads, one connection each
+
+# Optional per-guild sharding, 0 = every table lives in DATABASE_PATH.
+# Change it only together with `python shard_tool.py rebalance`.
+DB_SHARDS = int(os.getenv("DB_SHARDS", "0"))
+DB_SHARD_DIR = project_path(os.getenv("DB_SHARD_DIR", "data/shards"))
+DB_SHARD_POOL_SIZE = int(os.getenv("DB_SHARD_POOL_SIZE", "2"))  # workers per shard file
+
+# SQLite connection profile (bot + dashboard)
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+DB_TEMP_STORE = os.getenv("DB_TEMP_STORE", "MEMORY")
+DB_STATEMENT_CACHE = int(os.getenv("DB_STATEMENT_CACHE", "256"))
+DB_WAL_AUTOCHECKPOINT = int(os.getenv("DB_WAL_AUTOCHECKPOINT", "1000"))  # pages
+DB_CHECKPOINT_INTERVAL = int(os.getenv("DB_CHECKPOINT_INTERVAL", "300"))  # seconds, 0 = off
+
+# Online backups (utils/backup.py, backup_tool.py)
+DB_BACKUP_DIR = project_path(os.getenv("DB_BACKUP_DIR", "data/backups"))
+DB_BACKUP_INTERVAL_MIN = int(os.getenv("DB_BACKUP_INTERVAL_MIN", "360"))  # 0 = no scheduled backups
+DB_BACKUP_KEEP = int(os.getenv("DB_BACKUP_KEEP", "7"))  # newest snapshots kept
+DB_BACKUP_COMPRESS = os.getenv("DB_BACKUP_COMPRESS", "true").lower() == "true"
+DB_BACKUP_PAGES = int(os.getenv("DB_BACKUP_PAGES", "256"))  # pages copied per step
+DB_BACKUP_SLEEP_MS = int(os.getenv("DB_BACKUP_SLEEP_MS", "5"))  # pause between steps
+
+# Query metrics (!dbstats, dashboard /dbstats)
+DB_SLOW_QUERY_MS = int(os.getenv("DB_SLOW_QUERY_MS", "100"))
+DB_SLOW_QUERY_LOG = project_path(os.getenv("DB_SLOW_QUERY_LOG", "data/slow_queries.log"))  # empty = console only
+DB_STATS_FILE = project_path(os.getenv("DB_STATS_FILE", "data/dbstats.json"))  # snapshot read by the dashboard
+DB_STATS_INTERVAL = int(os.getenv("DB_STATS_INTERVAL", "60"))  # seconds between snapshots
+# How often the bot checks for filter/custom command rows written by another process (dashboard, scripts)
+CACHE_SYNC_INTERVAL = float(os.getenv("CACHE_SYNC_INTERVAL", "2"))  # seconds, 0 = off
+
+# XP writes: "buffer" = write-behind batches (fewest commits),
+# "upsert" = one INSERT ... ON CONFLICT ... RETURNING per message (durable at once)
+XP_WRITE_MODE = os.getenv("XP_WRITE_MODE", "buffer").lower()
+
+# XP write-behind buffer
+XP_FLUSH_INTERVAL_MS = int(os.getenv("XP_FLUSH_INTERVAL_MS", "5000"))
+XP_FLUSH_MAX_ROWS = int(os.getenv("XP_FLUSH_MAX_ROWS", "500"))
+LEVEL_CACHE_SIZE = int(os.getenv("LEVEL_CACHE_SIZE", "50000"))  # (guild, user) records kept in memory
+# Guild rankings for !level / !leaderboard: guilds kept in memory, rebuild age
+RANK_CACHE_GUILDS = int(os.getenv("RANK_CACHE_GUILDS", "100"))
+RANK_REFRESH_SECONDS = int(os.getenv("RANK_REFRESH_SECONDS", "600"))
+# !leaderboard pages: rows per page, seconds a page is served from memory, pages kept
+LEADERBOARD_PAGE_SIZE = int(os.getenv("LEADERBOARD_PAGE_SIZE", "10"))
+LEADERBOARD_PAGE_TTL = int(os.getenv("LEADERBOARD_PAGE_TTL", "30"))
+LEADERBOARD_PAGE_CACHE = int(os.getenv("LEADERBOARD_PAGE_CACHE", "2000"))
+# Level reward roles: guilds kept in memory, !synclevelroles parallel edits and pause per edit
+LEVEL_ROLE_CACHE_GUILDS = int(os.getenv("LEVEL_ROLE_CACHE_GUILDS", "1000"))
+LEVEL_ROLE_SYNC_CONCURRENCY = int(os.getenv("LEVEL_ROLE_SYNC_CONCURRENCY", "4"))
+LEVEL_ROLE_SYNC_DELAY_MS = int(os.getenv("LEVEL_ROLE_SYNC_DELAY_MS", "250"))
+# Bulk XP commands: rows staged per executemany (progress is reported between chunks), CSV import size cap
+XP_BULK_CHUNK = int(os.getenv("XP_BULK_CHUNK", "10000"))
+XP_IMPORT_MAX_MB = int(os.getenv("XP_IMPORT_MAX_MB", "16"))
+XP_CURVE_CACHE_GUILDS = int(os.getenv("XP_CURVE_CACHE_GUILDS", "1000"))  # per-guild XP curves kept in memory
+# Message counters (users.messages, channel_activity): flush interval, pending keys that force a flush, rollup retention
+ACTIVITY_FLUSH_INTERVAL_MS = int(os.getenv("ACTIVITY_FLUSH_INTERVAL_MS", "10000"))
+ACTIVITY_FLUSH_MAX_KEYS = int(os.getenv("ACTIVITY_FLUSH_MAX_KEYS", "5000"))
+ACTIVITY_RETENTION_DAYS = int(os.getenv("ACTIVITY_RETENTION_DAYS", "30"))
+XP_COOLDOWN_SECONDS = int(os.getenv("XP_COOLDOWN_SECONDS", "60"))
+# Hard cap for the cooldown/anti-spam trackers, normally they only hold users active in the window
+COOLDOWN_MAX_KEYS = int(os.getenv("COOLDOWN_MAX_KEYS", "500000"))
+
+# ========== FILTERING ==========
+FILTER_CACHE_GUILDS = int(os.getenv("FILTER_CACHE_GUILDS", "1000"))  # compiled word filters kept in memory
+
+# ========== IMAGE CARDS ==========
+FONT_PATH = project_path(os.getenv("FONT_PATH", "assets/font.ttf"))  # missing = Pillow's default font
+BACKGROUND_IMAGE = project_path(os.getenv("BACKGROUND_IMAGE", "assets/background.png"))  # missing = plain color
+CARD_TEMPLATE_DIR = project_path(os.getenv("CARD_TEMPLATE_DIR", "assets/cards"))  # <guild_id>.json per guild
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))  # render processes, 0 = render in a thread
+AVATAR_CACHE_DIR = project_path(os.getenv("AVATAR_CACHE_DIR", "data/avatars"))
+AVATAR_CACHE_MB = int(os.getenv("AVATAR_CACHE_MB", "64"))
 
 print("=" * 50)
 print("🌐 NEXUS COMMUNITY BOT CONFIGURATION")
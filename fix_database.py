@@ -1,5 +1,4 @@
 import os
-import sqlite3
 import sys
 
 def fix_database():
@@ -19,62 +18,17 @@ def fix_database():
         os.makedirs(data_dir)
         print(f"✅ Created directory: {data_dir}")
     
-    # Buat database baru
+    # Buat database baru (schema dari utils/migrations.py)
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        from utils.connection import connect
+        from utils.migrations import migrate
         
-        # Buat semua tables
-        tables = [
-            '''CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT,
-                guild_id TEXT,
-                xp INTEGER DEFAULT 0,
-                level INTEGER DEFAULT 1,
-                messages INTEGER DEFAULT 0,
-                last_message_time TIMESTAMP,
-                PRIMARY KEY (user_id, guild_id)
-            )''',
-            
-            '''CREATE TABLE IF NOT EXISTS level_roles (
-                level INTEGER,
-                role_id TEXT,
-                PRIMARY KEY (level)
-            )''',
-            
-            '''CREATE TABLE IF NOT EXISTS filtered_words (
-                word TEXT PRIMARY KEY,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )''',
-            
-            '''CREATE TABLE IF NOT EXISTS custom_commands (
-                cmd_name TEXT PRIMARY KEY,
-                response TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )''',
-            
-            '''CREATE TABLE IF NOT EXISTS confessions (
-                confession_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                message TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )''',
-            
-            '''CREATE TABLE IF NOT EXISTS welcome_config (
-                guild_id TEXT PRIMARY KEY,
-                channel_id TEXT
-            )'''
-        ]
-        
-        for table_sql in tables:
-            try:
-                cursor.execute(table_sql)
-                print(f"✅ Table created/checked")
-            except Exception as e:
-                print(f"⚠️ Warning: {e}")
-        
-        conn.commit()
-        conn.close()
+        conn = connect(db_path)
+        try:
+            version = migrate(conn)
+            print(f"✅ Schema at version {version}")
+        finally:
+            conn.close()
         
         print(f"\n✅ Database fixed successfully!")
         print(f"📊 Location: {db_path}")
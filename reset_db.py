@@ -1,14 +1,16 @@
 import os
-import shutil
 from config import DATABASE_PATH
 
 def reset_database():
     """Reset database completely"""
     if os.path.exists(DATABASE_PATH):
-        backup = DATABASE_PATH + ".backup"
-        shutil.copy2(DATABASE_PATH, backup)
-        print(f"📦 Backup created: {backup}")
-        os.remove(DATABASE_PATH)
+        # Online backup, consistent even if the bot is still writing
+        from utils.backup import take_snapshot
+        result = take_snapshot(keep=0)
+        print(f"📦 Backup created: {result['path']}")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(DATABASE_PATH + suffix):
+                os.remove(DATABASE_PATH + suffix)
         print("🗑️ Old database removed")
     
     # Recreate directory
@@ -0,0 +1,153 @@
+import argparse
+import os
+import sys
+from config import DATABASE_PATH, DB_SHARDS
+from utils.connection import connect
+from utils.migrations import migrate
+from utils.shards import (
+    SHARDED_TABLES, all_paths, guild_path, read_layout, write_layout
+)
+
+# Maintenance for the optional per-guild shards (DB_SHARDS in .env).
+# Stop the bot before rebalance, it moves rows between files.
+# Usage:
+#   python shard_tool.py status
+#   python shard_tool.py rebalance            (to DB_SHARDS from .env)
+#   python shard_tool.py export GUILD_ID OUT.db
+
+# Guild tables that always stay in the main database
+MAIN_GUILD_TABLES = ("welcome_config", "scheduled_messages")
+
+# AUTOINCREMENT ids, the target file hands out new ones
+SURROGATE_KEYS = {"confession_messages": "confession_id"}
+
+def copy_columns(conn, table):
+    """Columns to copy between files"""
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return [row[1] for row in info if row[1] != SURROGATE_KEYS.get(table)]
+
+def open_migrated(path):
+    conn = connect(path, isolation_level=None)
+    migrate(conn, verbose=False)
+    return conn
+
+def status():
+    layout = read_layout()
+    print(f"🧩 Layout on disk: {layout} shard(s), DB_SHARDS in config: {DB_SHARDS}")
+    for path in all_paths(max(layout, DB_SHARDS)):
+        if not os.path.exists(path):
+            print(f"❌ {path} (missing)")
+            continue
+        conn = connect(path)
+        try:
+            counts = ", ".join(
+                f"{table}={conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]}"
+                for table in SHARDED_TABLES
+            )
+            guilds = conn.execute("SELECT COUNT(DISTINCT guild_id) FROM users").fetchone()[0]
+        finally:
+            conn.close()
+        size = os.path.getsize(path) / 1024
+        print(f"✅ {os.path.basename(path)} {size:.0f} KiB, {guilds} guild(s): {counts}")
+
+def rebalance(target):
+    """Move every per-guild row to the file it belongs to with `target` shards"""
+    layout = read_layout()
+    sources = [path for path in all_paths(max(layout, target)) if os.path.exists(path)]
+    targets = {path: open_migrated(path) for path in all_paths(target)}
+    for conn in targets.values():
+        conn.close()
+
+    moved = 0
+    for source in sources:
+        conn = open_migrated(source)
+        try:
+            for table in SHARDED_TABLES:
+                columns = ", ".join(copy_columns(conn, table))
+                plan = {}  # {target path: [guild ids]}
+                for (guild_id,) in conn.execute(f"SELECT DISTINCT guild_id FROM {table}"):
+                    dest = guild_path(guild_id, target)
+                    if dest != source:
+                        plan.setdefault(dest, []).append(guild_id)
+
+                for dest, guild_ids in plan.items():
+                    conn.execute("ATTACH DATABASE ? AS dest", (dest,))
+                    try:
+                        conn.execute("BEGIN IMMEDIATE")
+                        try:
+                            for guild_id in guild_ids:
+                                conn.execute(
+                                    f"INSERT OR REPLACE INTO dest.{table} ({columns}) "
+                                    f"SELECT {columns} FROM main.{table} WHERE guild_id IS ?",
+                                    (guild_id,)
+                                )
+                                moved += conn.execute(
+                                    f"DELETE FROM main.{table} WHERE guild_id IS ?", (guild_id,)
+                                ).rowcount
+                            conn.execute("COMMIT")
+                        except BaseException:
+                            conn.execute("ROLLBACK")
+                            raise
+                    finally:
+                        conn.execute("DETACH DATABASE dest")
+                    print(f"📦 {table}: {len(guild_ids)} guild(s) "
+                          f"{os.path.basename(source)} -> {os.path.basename(dest)}")
+        finally:
+            conn.close()
+
+    write_layout(target)
+    print(f"✅ Rebalanced to {target} shard(s), {moved} row(s) moved")
+    leftovers = [path for path in sources if path not in targets]
+    for path in leftovers:
+        print(f"⚠️ {path} is no longer used and can be deleted")
+
+def export(guild_id, out_path):
+    """Copy one guild's rows into a standalone database file"""
+    layout = read_layout()
+    out = open_migrated(out_path)
+    try:
+        for source, tables in ((guild_path(guild_id, layout), SHARDED_TABLES),
+                               (DATABASE_PATH, MAIN_GUILD_TABLES)):
+            out.execute("ATTACH DATABASE ? AS src", (source,))
+            try:
+                out.execute("BEGIN IMMEDIATE")
+                try:
+                    for table in tables:
+                        columns = ", ".join(copy_columns(out, table))
+                        count = out.execute(
+                            f"INSERT OR REPLACE INTO main.{table} ({columns}) "
+                            f"SELECT {columns} FROM src.{table} WHERE guild_id = ?",
+                            (guild_id,)
+                        ).rowcount
+                        print(f"📦 {table}: {count} row(s)")
+                    out.execute("COMMIT")
+                except BaseException:
+                    out.execute("ROLLBACK")
+                    raise
+            finally:
+                out.execute("DETACH DATABASE src")
+    finally:
+        out.close()
+    print(f"✅ Guild {guild_id} exported to {out_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-guild shard maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="row counts per database file")
+    move = commands.add_parser("rebalance", help="move rows to a new shard count")
+    move.add_argument("--shards", type=int, default=DB_SHARDS, help="target shard count (default DB_SHARDS)")
+    dump = commands.add_parser("export", help="copy one guild into its own file")
+    dump.add_argument("guild_id", type=int)
+    dump.add_argument("out")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        status()
+    elif args.command == "rebalance":
+        rebalance(args.shards)
+    elif args.command == "export":
+        export(args.guild_id, args.out)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Tests import utils/ and config.py the way the bot does, from the project
+# root, against a throwaway database instead of data/bot.db
+_data = tempfile.mkdtemp(prefix="bot-tests-")
+os.environ["DATABASE_PATH"] = os.path.join(_data, "bot.db")
+os.environ["DB_SHARD_DIR"] = os.path.join(_data, "shards")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
\ No newline at end of file
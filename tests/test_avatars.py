@@ -0,0 +1,42 @@
+import asyncio
+import os
+import pytest
+
+pytest.importorskip("aiohttp")
+from utils.avatars import AvatarCache
+
+def test_concurrent_downloads_keep_index_and_folder_in_step(tmp_path):
+    cache = AvatarCache(str(tmp_path), max_bytes=10_000)
+
+    async def download(url):
+        await asyncio.sleep(0)
+        return url.encode() * 100  # ~1-2 KiB each
+
+    cache._download = download
+
+    async def run():
+        urls = [f"https://cdn.example/{i % 30}.png" for i in range(200)]
+        return await asyncio.gather(*(cache.get(url) for url in urls))
+
+    results = asyncio.run(run())
+    assert all(results)
+    on_disk = {name: os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)}
+    assert on_disk == dict(cache._files)
+    assert cache._bytes == sum(on_disk.values()) <= 10_000
+
+def test_hit_reads_from_disk(tmp_path):
+    cache = AvatarCache(str(tmp_path), max_bytes=10_000)
+    calls = []
+
+    async def download(url):
+        calls.append(url)
+        return b"png"
+
+    cache._download = download
+
+    async def run():
+        return await cache.get("https://cdn.example/a.png"), await cache.get("https://cdn.example/a.png")
+
+    assert asyncio.run(run()) == (b"png", b"png")
+    assert calls == ["https://cdn.example/a.png"]
+    assert cache.stats()["hits"] == 1
\ No newline at end of file
@@ -0,0 +1,64 @@
+from utils.cache import ExpiringCache, LRUCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache("test_lru", 2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is the oldest now
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+    assert (cache.hits, cache.misses) == (3, 1)
+
+def test_lru_peek_and_items_keep_the_order():
+    cache = LRUCache("test_lru_peek", 2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.peek("a") == 1
+    assert cache.items() == [("a", 1), ("b", 2)]
+    cache.put("c", 3)
+    assert "a" not in cache
+    assert cache.hits == 0 and cache.misses == 0
+
+def test_lru_setdefault_keeps_the_first_value():
+    cache = LRUCache("test_lru_setdefault", 4)
+    assert cache.setdefault("a", 1) == 1
+    assert cache.setdefault("a", 2) == 1
+
+def test_expiring_keys_drop_out_after_ttl():
+    cache = ExpiringCache("test_expiring", ttl=10)
+    cache.put("a", now=100)
+    assert cache.get("a", now=109.9) is True
+    assert cache.get("a", now=110) is None
+    # Still stored until a later write sweeps its bucket
+    assert cache.keys() == ["a"]
+    cache.put("b", now=112)
+    assert cache.keys() == ["b"]
+    assert cache.expired == 1
+
+def test_expiring_put_restarts_the_ttl():
+    cache = ExpiringCache("test_expiring_put", ttl=10)
+    cache.put("a", 1, now=100)
+    cache.put("a", 2, now=105)
+    assert cache.get("a", now=112) == 2
+    assert cache.get("a", now=115) is None
+    assert cache.sweep(now=120) == 1
+    assert len(cache) == 0
+
+def test_expiring_try_add_is_a_cooldown():
+    cache = ExpiringCache("test_expiring_cooldown", ttl=60)
+    assert cache.try_add(("user", 1), now=0)
+    assert not cache.try_add(("user", 1), now=59)
+    assert cache.try_add(("user", 1), now=60)
+
+def test_expiring_maxsize_evicts_soonest_deadline():
+    cache = ExpiringCache("test_expiring_max", ttl=10, maxsize=2)
+    cache.put("a", now=100)
+    cache.put("b", now=102)
+    cache.put("c", now=104)
+    assert sorted(cache.keys()) == ["b", "c"]
+    assert cache.evictions == 1
+    assert cache.pop("b") is True
+    assert cache.keys() == ["c"]
\ No newline at end of file
@@ -0,0 +1,71 @@
+import asyncio
+import types
+import pytest
+from config import DATABASE_PATH
+from utils.change_feed import ChangeFeed
+from utils.database import init_db, close_pool
+from utils.filter_rules import RuleSet
+
+flask = pytest.importorskip("flask")
+
+@pytest.fixture
+def dashboard():
+    init_db()
+    from web.run import app
+    app.config["TESTING"] = True
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user"] = "admin"
+    yield client
+    close_pool()
+
+@pytest.fixture
+def feed():
+    feed = ChangeFeed([DATABASE_PATH], 0, None)
+    feed.poll()  # first look only records where the log is
+    yield feed
+    asyncio.run(feed.close())
+
+def test_dashboard_filter_insert_invalidates_that_guild(dashboard, feed):
+    pytest.importorskip("discord")
+    from cogs.filtering import Filtering
+    cog = Filtering(types.SimpleNamespace())
+    cog.filter_cache.put(42, RuleSet())
+    cog.filter_cache.put(7, RuleSet())
+
+    res = dashboard.post("/api/filter", json={"word": "spamword", "guild_id": "42"})
+    assert res.status_code == 200
+
+    changes = feed.poll()
+    assert changes == [("filtered_words", 42)]
+    for table, guild_id in changes:
+        asyncio.run(cog.on_cache_change(table, guild_id))
+    assert cog.filter_cache.peek(42) is None
+    assert cog.filter_cache.peek(7) is not None
+
+    assert asyncio.run(cog.load_filtered_words(42)) == ["spamword"]
+
+def test_dashboard_command_insert_is_scoped_to_a_guild(dashboard, feed):
+    res = dashboard.post("/api/command", json={"name": "hello", "response": "hi!", "guild_id": "42"})
+    assert res.status_code == 200
+    assert feed.poll() == [("custom_commands", 42)]
+
+    res = dashboard.delete("/api/command/hello?guild_id=42")
+    assert res.status_code == 200
+    assert feed.poll() == [("custom_commands", 42)]
+
+def test_dashboard_needs_a_guild(dashboard):
+    assert dashboard.post("/api/filter", json={"word": "spamword"}).status_code == 400
+    assert dashboard.post("/api/command", json={"name": "x", "response": "y"}).status_code == 400
+@pytest.mark.parametrize("name, response, error", [
+    ("hello world", "hi", "letters, numbers, and underscores"),
+    ("level", "hi", "reserved"),
+    ("addcommand", "hi", "reserved"),
+    ("uptime", "hi", "reserved"),
+    ("hello", "x" * 2001, "too long"),
+])
+def test_dashboard_command_checks_match_addcommand(dashboard, feed, name, response, error):
+    res = dashboard.post("/api/command", json={"name": name, "response": response, "guild_id": "42"})
+    assert res.status_code == 400
+    assert error in res.get_json()["error"]
+    assert feed.poll() == []
\ No newline at end of file
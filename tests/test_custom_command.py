@@ -0,0 +1,39 @@
+import asyncio
+import types
+import pytest
+
+pytest.importorskip("discord")
+from cogs.custom_command import CustomCommand
+
+class Context:
+    def __init__(self, command, sent):
+        channel = types.SimpleNamespace(send=self.send)
+        self.message = types.SimpleNamespace(guild=types.SimpleNamespace(id=42), channel=channel)
+        self.command = command
+        self.stopped = None
+        self.sent = sent
+
+    async def send(self, text):
+        self.sent.append(text)
+
+    def stop(self, reason=None):
+        self.stopped = reason
+
+def run_command(name):
+    async def run():
+        bot = types.SimpleNamespace(get_command=lambda name: object() if name == "level" else None)
+        cog = CustomCommand(bot)
+        cog.scheduler.cancel()
+        cog.custom_commands_cache[42] = {"level": "shadow", "hello": "hi!"}
+        sent = []
+        ctx = Context(name, sent)
+        await cog.run_custom_command(ctx)
+        return ctx.stopped, sent
+
+    return asyncio.run(run())
+
+def test_custom_command_answers():
+    assert run_command("hello") == ("custom command", ["hi!"])
+
+def test_custom_command_never_shadows_a_builtin():
+    assert run_command("level") == (None, [])
\ No newline at end of file
@@ -0,0 +1,68 @@
+import asyncio
+import sqlite3
+import pytest
+from utils.database import ConnectionPool, Transaction, close_pool, execute, execute_query, fetch_one, get_pool, init_db, transaction
+
+@pytest.fixture
+def db():
+    init_db()
+    asyncio.run(execute("CREATE TABLE IF NOT EXISTS tx_test (x)"))
+    yield
+    close_pool()
+
+def test_cancelled_transaction_lets_go_of_the_lock(db):
+    async def run():
+        locked, release = asyncio.Event(), asyncio.Event()
+
+        async def holder():
+            async with transaction():
+                locked.set()
+                await release.wait()
+
+        held = asyncio.create_task(holder())
+        await locked.wait()
+        waiting = asyncio.create_task(Transaction(get_pool()).__aenter__())
+        await asyncio.sleep(0.2)  # its worker is in BEGIN IMMEDIATE now
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release.set()
+        await held
+
+        # Well within busy_timeout: nobody is left holding the write lock
+        async with transaction() as tx:
+            await asyncio.wait_for(tx.execute("INSERT INTO tx_test VALUES (1)"), 2)
+        return await fetch_one("SELECT COUNT(*) FROM tx_test")
+
+    assert asyncio.run(run()) == (1,)
+
+def test_pool_calls_inside_a_transaction_raise(db):
+    async def run():
+        async with transaction():
+            with pytest.raises(RuntimeError):
+                await fetch_one("SELECT 1")
+            with pytest.raises(RuntimeError):
+                async with transaction():
+                    pass
+        return await fetch_one("SELECT 1")
+
+    assert asyncio.run(run()) == (1,)
+
+def test_worker_without_a_connection_fails_jobs(tmp_path):
+    pool = ConnectionPool(str(tmp_path), 2)  # a directory can't be opened as a database
+    try:
+        with pytest.raises(Exception, match="unable to open"):
+            pool.run(lambda conn: 1)
+
+        async def begin():
+            await asyncio.wait_for(Transaction(pool).__aenter__(), 5)
+
+        with pytest.raises(Exception, match="unable to open"):
+            asyncio.run(begin())
+    finally:
+        pool.close()
+
+def test_execute_query_raises_instead_of_returning_none(db):
+    assert execute_query("SELECT x FROM tx_test WHERE x = -1", fetch=True) is None
+    with pytest.raises(sqlite3.OperationalError):
+        execute_query("SELECT nope FROM tx_test", fetch=True)
\ No newline at end of file
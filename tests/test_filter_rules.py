@@ -0,0 +1,74 @@
+import re
+import pytest
+from utils.filter_rules import RuleSet, compile_rule
+from utils.normalize import normalize
+from utils.safe_regex import PatternError
+
+def hits(sources, message):
+    """{rule source: matched text} for one message"""
+    rules = RuleSet([compile_rule(source) for source in sources])
+    text = normalize(message)
+    lower = message.lower()
+    return {
+        rule.source: lower[start:end] if rule.raw else text.excerpt(start, end)
+        for start, end, rule in rules.search(text.text, lower)
+    }
+
+@pytest.mark.parametrize("pattern, message, expected", [
+    (r"\d{4}", "call 1234 now", "1234"),
+    (r"[0-9]+", "room 42 please", "42"),
+    (r"https?://", "see http://example.com", "http://"),
+    (r"https?://\S+", "go to https://evil.example/x?y=1 now", "https://evil.example/x?y=1"),
+    (r"discord\.gg/\w+", "join discord.gg/abc123 today", "discord.gg/abc123"),
+    (r"\bfree\s+nitro\b", "get FREE  nitro here", "free  nitro"),
+])
+def test_patterns_see_digits_and_punctuation(pattern, message, expected):
+    assert hits(["re:" + pattern], message) == {"re:" + pattern: expected}
+
+@pytest.mark.parametrize("pattern, message", [
+    (r"\d{4}", "call me now"),
+    (r"discord\.gg/\w+", "discord gg abc"),
+    (r"https?://", "http:/ broken"),
+])
+def test_patterns_miss(pattern, message):
+    assert hits(["re:" + pattern], message) == {}
+
+@pytest.mark.parametrize("pattern, message", [
+    (r"(a|aa)+b", "xx aaab yy"),
+    (r"b\w*d\s+w", "a bad word here"),
+    (r"\d+\.\d+", "version 10.25 out"),
+    (r"^hi", "hi there"),
+    (r"end$", "the end"),
+])
+def test_pattern_spans_match_re(pattern, message):
+    expected = re.search(pattern, message).group()
+    assert hits(["re:" + pattern], message)["re:" + pattern] == expected
+
+def test_words_and_wildcards_still_use_canonical_form():
+    found = hits(["bad", "=cat", "dog*", "b?d"], "b.a.d DOGGY c@t")
+    assert found == {"bad": "b.a.d", "=cat": "c@t", "dog*": "DOGGY", "b?d": "b.a.d"}
+
+def test_wildcard_span_is_the_match():
+    assert hits(["*ing"], "well running fast") == {"*ing": "running"}
+
+@pytest.mark.parametrize("source", ["re:(a+)+", "re:(a*)*", "re:", "re:a{1,500}", "re:(?=a)", "*", "=!!!"])
+def test_bad_rules_are_rejected(source):
+    with pytest.raises(PatternError):
+        compile_rule(source)
+
+@pytest.mark.parametrize("pattern, message, expected", [
+    ("FREE", "get free nitro", "free"),
+    ("FREE\\s+NITRO", "Free  Nitro here", "free  nitro"),
+    ("[A-Z]{3}\\d", "code ABC1", "abc1"),
+    ("[Z-a]", "x ^ y", "^"),
+    ("DISCORD\\.GG/\\w+", "join Discord.gg/Abc", "discord.gg/abc"),
+])
+def test_patterns_ignore_case(pattern, message, expected):
+    assert hits(["re:" + pattern], message) == {"re:" + pattern: expected}
+
+@pytest.mark.parametrize("pattern, message", [
+    ("[^A-Z]+", "abc"),
+    ("[A-C]", "xyz"),
+])
+def test_patterns_ignore_case_miss(pattern, message):
+    assert hits(["re:" + pattern], message) == {}
\ No newline at end of file
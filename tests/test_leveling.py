@@ -0,0 +1,53 @@
+import asyncio
+import types
+import pytest
+
+pytest.importorskip("discord")
+from cogs.leveling import Leveling
+
+def test_forget_guild_keeps_other_guilds_pages():
+    cog = Leveling(types.SimpleNamespace())
+    cog.leaderboard_pages.put((42, "first", None), ["a"])
+    cog.leaderboard_pages.put((42, "after", (10, 1)), ["b"])
+    cog.leaderboard_pages.put((7, "first", None), ["c"])
+
+    cog.forget_guild(42)
+    assert cog.leaderboard_pages.get((42, "first", None)) is None
+    assert cog.leaderboard_pages.get((42, "after", (10, 1))) is None
+    assert cog.leaderboard_pages.get((7, "first", None)) == ["c"]
+
+def test_leaderboard_page_counts_buffered_messages():
+    from utils.database import init_db, close_pool
+    init_db()
+    cog = Leveling(types.SimpleNamespace())
+    try:
+        cog.activity.add(42, 1, 100)
+        cog.activity.add(42, 1, 100)
+        cog.activity.add(7, 1, 100)
+        cog.xp_buffer.add(7, 2, 15, 0)
+        rows = asyncio.run(cog.leaderboard_page(42))
+        assert [(row.user_id, row.messages) for row in rows] == [(1, 2)]
+        # Only the requested guild was flushed
+        assert cog.activity.pending(7, 1) == 1
+        assert cog.xp_buffer.get(7, 2) == [15, 0]
+    finally:
+        close_pool()
+
+def test_failed_curve_change_keeps_the_cached_curve(monkeypatch):
+    import cogs.leveling
+    from utils.xp_curves import XPCurve
+
+    class Failing:
+        async def __aenter__(self):
+            raise OverflowError("boom")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(cogs.leveling, "transaction", lambda shard=None: Failing())
+    cog = Leveling(types.SimpleNamespace())
+    old = XPCurve.parse("linear", "500")
+    cog.curves.put(42, old)
+    with pytest.raises(OverflowError):
+        asyncio.run(cog.apply_curve(42, XPCurve.parse("linear", "50")))
+    assert cog.curves.peek(42) is old
\ No newline at end of file
@@ -0,0 +1,38 @@
+import sqlite3
+import pytest
+from utils.migrations import MIGRATIONS, migrate
+
+def at_version_2(*rows_sql):
+    """In-memory database with the TEXT id schema of steps 1-2 and some rows"""
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    for version, _, fn, _ in MIGRATIONS:
+        if version <= 2:
+            fn(conn)
+    conn.execute("PRAGMA user_version = 2")
+    for sql in rows_sql:
+        conn.execute(sql)
+    return conn
+
+def test_snowflakes_keep_every_row():
+    conn = at_version_2(
+        "INSERT INTO users (user_id, guild_id, xp) VALUES ('1', '10', 5), ('2', NULL, 7), ('3', 'default', 9)",
+        "INSERT INTO filtered_words (guild_id, word) VALUES (NULL, 'dash'), ('10', 'w')",
+    )
+    migrate(conn, verbose=False)
+    assert conn.execute("SELECT guild_id, user_id, xp FROM users ORDER BY user_id").fetchall() == [
+        (10, 1, 5), (0, 2, 7), (0, 3, 9)
+    ]
+    assert sorted(conn.execute("SELECT guild_id, word FROM filtered_words").fetchall()) == [(0, "dash"), (10, "w")]
+
+@pytest.mark.parametrize("table, rows, message", [
+    ("users", "INSERT INTO users (user_id, guild_id) VALUES ('abc', '10')", "users.user_id"),
+    ("level_roles", "INSERT INTO level_roles VALUES ('10', 5, '<@&777>')", "level_roles.role_id"),
+    ("users", "INSERT INTO users (user_id, guild_id) VALUES ('1', '10'), ('01', '10')", "collide"),
+])
+def test_unconvertible_rows_stop_the_step(table, rows, message):
+    conn = at_version_2(rows)
+    before = conn.execute(f"SELECT * FROM {table}").fetchall()
+    with pytest.raises(RuntimeError, match=message):
+        migrate(conn, verbose=False)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+    assert conn.execute(f"SELECT * FROM {table}").fetchall() == before
\ No newline at end of file
@@ -0,0 +1,59 @@
+import pytest
+from utils.filter_rules import RuleSet, compile_rule
+from utils.normalize import normalize
+
+@pytest.mark.parametrize("message, expected", [
+    ("b a d", "bad"),
+    ("B.A.D", "bad"),
+    ("b-a-d", "bad"),
+    ("this is b4d", "this is bad"),
+    ("$hit", "shit"),
+    ("sp@m me", "spam me"),
+    ("1337 h4x0r", "1337 haxor"),
+])
+def test_evasions_fold(message, expected):
+    assert normalize(message).text == expected
+
+@pytest.mark.parametrize("message, expected", [
+    ("x = 5 + 3", "x 5 3"),
+    ("a+b=c", "a b c"),
+    ("x=y", "x y"),
+    ("Hello 2024 world", "hello 2024 world"),
+    ("room 101 at 5", "room 101 at 5"),
+    ("price $5 @ noon", "price 5 noon"),
+    ("o k", "o k"),
+    ("y n", "y n"),
+    ("so b 4 d", "so b 4 d"),
+    ("k", "k"),
+    ("a bad guy", "a bad guy"),
+])
+def test_plain_text_stays(message, expected):
+    assert normalize(message).text == expected
+
+@pytest.mark.parametrize("message", [
+    "x = 5 + 3", "Hello 2024 world", "b a d", "sp@m me", "a+b=c", "fi ﬁ b a d!",
+])
+def test_offsets_line_up(message):
+    text = normalize(message)
+    assert len(text.offsets) == len(text.text)
+
+@pytest.mark.parametrize("source, message", [
+    ("xse", "x = 5 + 3"),
+    ("zoza", "Hello 2024 world"),
+    ("ok", "o k"),
+    ("b4d*", "year 8400"),
+])
+def test_no_false_hits(source, message):
+    rules = RuleSet([compile_rule(source)])
+    text = normalize(message)
+    assert rules.search(text.text, message.lower()) == []
+
+@pytest.mark.parametrize("source, message", [
+    ("bad", "so b.a.d"),
+    ("b4d*", "b4dd3st"),
+    ("=spam", "no sp@m"),
+])
+def test_evasions_hit(source, message):
+    rules = RuleSet([compile_rule(source)])
+    text = normalize(message)
+    assert rules.search(text.text, message.lower())
\ No newline at end of file
@@ -0,0 +1,22 @@
+import pytest
+from check_query_plans import FULL_SCAN, main
+
+@pytest.mark.parametrize("step, table", [
+    ("SCAN users", "users"),
+    ("SCAN users USING COVERING INDEX idx_users_guild_xp", "users"),
+    ("SCAN TABLE users", "users"),
+    ("SCAN TABLE users USING INDEX idx_users_guild_xp", "users"),
+    ("SCAN temp.bulk_xp", "bulk_xp"),
+])
+def test_full_scan_in_old_and_new_plan_text(step, table):
+    assert FULL_SCAN.match(step).group(1) == table
+
+@pytest.mark.parametrize("step", [
+    "SEARCH users USING INDEX idx_users_guild_xp (guild_id=?)",
+    "SEARCH TABLE users USING PRIMARY KEY (guild_id=? AND user_id=?)",
+])
+def test_searches_are_not_scans(step):
+    assert FULL_SCAN.match(step) is None
+
+def test_every_statement_uses_an_index():
+    assert main() == 0
\ No newline at end of file
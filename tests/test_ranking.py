@@ -0,0 +1,63 @@
+import asyncio
+from utils.queries import LeaderboardRow
+from utils.ranking import GuildRanking, Rankings
+
+def ranking():
+    return GuildRanking([
+        LeaderboardRow(1, 300, 3, 30),
+        LeaderboardRow(2, 100, 1, 10),
+        LeaderboardRow(3, 300, 3, 20),  # same XP as 1, the lower id ranks first
+    ])
+
+def test_rank_orders_by_xp_then_user_id():
+    board = ranking()
+    assert [board.rank(user_id) for user_id in (1, 3, 2)] == [1, 2, 3]
+    assert board.rank(99) is None
+    assert [row.user_id for row in board.page()] == [1, 3, 2]
+
+def test_set_inserts_and_moves_members():
+    board = ranking()
+    board.set(4, 200, 2, 5)
+    assert board.rank(4) == 3 and board.rank(2) == 4
+    board.set(2, 500, 4, 11)
+    assert [row.user_id for row in board.page()] == [2, 1, 3, 4]
+    assert board.get(2).messages == 11
+    # Same XP, only the row changes
+    board.set(2, 500, 5, 12)
+    assert board.rank(2) == 1 and board.get(2).level == 5
+    assert len(board) == 4
+
+def test_remove_drops_the_member():
+    board = ranking()
+    board.remove(1)
+    board.remove(99)
+    assert board.rank(1) is None
+    assert [row.user_id for row in board.page()] == [3, 2]
+    assert len(board) == 2
+
+def test_around_centres_on_the_member():
+    board = GuildRanking([LeaderboardRow(i, 1000 - i, 1, 0) for i in range(1, 11)])
+    start, rows = board.around(5, radius=2)
+    assert start == 3
+    assert [row.user_id for row in rows] == [3, 4, 5, 6, 7]
+    start, rows = board.around(1, radius=2)
+    assert start == 1 and [row.user_id for row in rows] == [1, 2, 3, 4, 5]
+    assert board.around(99) == (None, [])
+
+def test_rankings_load_once_until_invalidated():
+    loads = []
+
+    async def loader(guild_id):
+        loads.append(guild_id)
+        return [LeaderboardRow(1, 10, 1, 1)]
+
+    async def run():
+        rankings = Rankings()
+        first = await rankings.get(42, loader)
+        assert await rankings.get(42, loader) is first
+        rankings.invalidate(42)
+        assert rankings.loaded(42) is None
+        await rankings.get(42, loader)
+
+    asyncio.run(run())
+    assert loads == [42, 42]
\ No newline at end of file
@@ -0,0 +1,27 @@
+from utils.text_match import SMALL_SET, WordMatcher
+
+def filler(count):
+    """Words that can't occur in the test texts"""
+    return [f"zq{i}x" for i in range(count)]
+
+def test_automaton_finds_overlapping_words():
+    matcher = WordMatcher(filler(SMALL_SET) + ["he", "she", "hers", "his"])
+    assert matcher.search("ushers") == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    assert matcher.builds == 1
+
+def test_automaton_agrees_with_the_small_set_scan():
+    words = ["bad", "badder", "add", "dd", "a", "der"]
+    text = "a badder bad add ladder"
+    small = WordMatcher(words)
+    large = WordMatcher(words + filler(SMALL_SET))
+    assert sorted(large.search(text)) == small.search(text)
+    assert large.builds == 1 and small.builds == 0
+
+def test_automaton_rebuilds_after_a_change():
+    matcher = WordMatcher(filler(SMALL_SET) + ["spam"])
+    assert matcher.terms("no spam here") == ["spam"]
+    matcher.remove("spam")
+    matcher.add("here")
+    assert matcher.terms("no spam here") == ["here"]
+    assert matcher.builds == 2
+    assert matcher.search("") == []
\ No newline at end of file
@@ -0,0 +1,33 @@
+import asyncio
+import pytest
+from utils import queries
+from utils.database import close_pool, execute, fetch_all, init_db, transaction
+
+pytest.importorskip("discord")
+from cogs.xp_admin import parse_xp_csv
+
+def test_parse_decides_messages_per_line():
+    rows, skipped = parse_xp_csv(b"user_id,xp,messages\n1,100,7\n2,50\n3,20,\nx,y\n")
+    assert rows == [(1, 100, 7), (2, 50, None), (3, 20, None)]
+    assert skipped == 2
+
+def test_set_import_keeps_counts_of_lines_without_messages():
+    init_db()
+    try:
+        async def run():
+            await execute(queries.GUILD_XP_RESET, (42,))
+            for user_id in (1, 2):
+                await execute("INSERT INTO users (guild_id, user_id, xp, level, messages) VALUES (42, ?, 10, 1, 5)",
+                              (user_id,))
+            rows, _ = parse_xp_csv(b"1,100,7\n2,50\n3,20\n")
+            async with transaction() as tx:
+                await tx.execute(queries.BULK_XP_TABLE)
+                await tx.execute(queries.BULK_XP_CLEAR)
+                await tx.executemany(queries.BULK_XP_STAGE, rows)
+                await tx.execute(queries.BULK_XP_SET, (42,))
+                await tx.execute(queries.BULK_XP_CLEAR)
+            return await fetch_all("SELECT user_id, xp, messages FROM users WHERE guild_id = 42 ORDER BY user_id")
+
+        assert [tuple(row) for row in asyncio.run(run())] == [(1, 100, 7), (2, 50, 5), (3, 20, 0)]
+    finally:
+        close_pool()
\ No newline at end of file
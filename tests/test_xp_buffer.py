@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from utils.xp_buffer import XPBuffer
+
+def test_failed_flush_puts_rows_back():
+    buffer = XPBuffer()
+    buffer.add(42, 1, 10, 1)
+    buffer.add(42, 1, 5, 2)
+    buffer.add(42, 2, 7, 1)
+
+    async def failing_write(shard, rows):
+        # An award that lands while the flush is running
+        buffer.add(42, 1, 3, 3)
+        raise RuntimeError("disk full")
+
+    buffer._write = failing_write
+    with pytest.raises(RuntimeError):
+        asyncio.run(buffer.flush())
+    # Failed deltas are merged with the newer one, the newer level wins
+    assert buffer.get(42, 1) == [18, 3]
+    assert buffer.get(42, 2) == [7, 1]
+
+def test_flush_of_one_guild_keeps_the_others():
+    buffer = XPBuffer()
+    buffer.add(42, 1, 10, 1)
+    buffer.add(7, 1, 20, 2)
+    written = []
+
+    async def write(shard, rows):
+        written.extend(rows)
+
+    buffer._write = write
+    assert asyncio.run(buffer.flush(42)) == 1
+    assert written == [(1, 42, 10, 1)]
+    assert buffer.get(42, 1) is None
+    assert buffer.pending_guild(7) == {1: [20, 2]}
\ No newline at end of file
@@ -0,0 +1,45 @@
+import pytest
+from utils.xp_curves import DEFAULT_CURVE, MAX_LEVEL, MAX_XP, XPCurve
+
+def test_linear_and_quadratic_thresholds():
+    linear = XPCurve.parse("linear", "500")
+    assert linear.thresholds[:4] == [0, 500, 1000, 1500]
+    assert [linear.level_for(xp) for xp in (0, 499, 500, 1499, 1500)] == [1, 1, 2, 3, 4]
+
+    quadratic = XPCurve.parse("quadratic", "100")
+    assert quadratic.thresholds[:4] == [0, 100, 400, 900]
+    assert quadratic.level_for(399) == 2 and quadratic.level_for(400) == 3
+
+def test_table_repeats_its_last_step():
+    table = XPCurve.parse("table", "0,100,300")
+    assert table.thresholds[:5] == [0, 100, 300, 500, 700]
+    assert table.xp_for_level(4) == 500
+    assert table.rows()[:3] == [(1, 0), (2, 100), (3, 300)]
+
+def test_capped_curve_stops_at_max_level():
+    curve = XPCurve.parse("linear", "10")
+    assert curve.level_for(10 ** 12) == MAX_LEVEL
+    assert curve.xp_for_level(MAX_LEVEL + 50) == curve.thresholds[-1]
+
+def test_default_curve_is_the_old_formula_past_the_table():
+    for xp in (0, 999, 1000, 5_000_000):
+        assert DEFAULT_CURVE.level_for(xp) == max(1, xp // 1000 + 1)
+
+@pytest.mark.parametrize("kind, values", [
+    ("quadratic", str(10 ** 13)),
+    ("linear", str(MAX_XP)),
+    ("table", f"0,{MAX_XP + 1}"),
+])
+def test_thresholds_have_to_fit_in_sqlite(kind, values):
+    with pytest.raises(ValueError, match="too steep"):
+        XPCurve.parse(kind, values)
+
+@pytest.mark.parametrize("kind, values", [
+    ("table", "0"),
+    ("table", "0,100,100"),
+    ("linear", "0"),
+    ("cubic", ""),
+])
+def test_bad_curves(kind, values):
+    with pytest.raises(ValueError):
+        XPCurve.parse(kind, values)
\ No newline at end of file
@@ -0,0 +1,181 @@
+import asyncio
+import time
+from utils.database import get_pool, group_by_shard, transaction
+from utils.queries import ADD_USER_MESSAGES, ADD_CHANNEL_ACTIVITY, PRUNE_CHANNEL_ACTIVITY
+
+class ActivityCounter:
+    """
+    Exact message counts without a write per message.
+    Every message bumps two in-memory counters, (guild, user) and
+    (guild, channel, minute). They are written every interval_ms or once
+    max_keys are pending, as executemany UPSERTs inside one transaction per
+    database file: users.messages and the channel_activity rollup.
+    Rollup rows older than retention_days are pruned by the flush, at most
+    once an hour per guild.
+    """
+    def __init__(self, interval_ms=10000, max_keys=5000, retention_days=30):
+        self.interval = interval_ms / 1000
+        self.max_keys = max_keys
+        self.retention = retention_days * 86400
+        self.users = {}     # {(guild_id, user_id): messages}
+        self.channels = {}  # {(guild_id, channel_id, minute): messages}
+        self.lock = asyncio.Lock()  # held while flushing, readers take it to see a consistent total
+        self.counted = 0
+        self._pruned = {}  # {guild_id: monotonic time of the last prune}
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def add(self, guild_id, user_id, channel_id, now=None):
+        minute = int((now or time.time()) // 60 * 60)  # unix time of the minute
+        key = (guild_id, user_id)
+        self.users[key] = self.users.get(key, 0) + 1
+        key = (guild_id, channel_id, minute)
+        self.channels[key] = self.channels.get(key, 0) + 1
+        self.counted += 1
+
+        if len(self.users) + len(self.channels) >= self.max_keys:
+            self._wake.set()
+
+    def pending(self, guild_id, user_id):
+        """Messages of a user not written yet"""
+        return self.users.get((guild_id, user_id), 0)
+
+    def pending_guild(self, guild_id):
+        """{user_id: messages} not written yet for one guild"""
+        return {user_id: count for (pending_guild, user_id), count in self.users.items()
+                if pending_guild == guild_id}
+
+    def _take(self, guild_id=None):
+        """Rows to write, removed from the counters; only one guild's when guild_id is given"""
+        if guild_id is None:
+            users, self.users = self.users, {}
+            channels, self.channels = self.channels, {}
+        else:
+            users = {key: count for key, count in self.users.items() if key[0] == guild_id}
+            channels = {key: count for key, count in self.channels.items() if key[0] == guild_id}
+            for key in users:
+                del self.users[key]
+            for key in channels:
+                del self.channels[key]
+        return ([(*key, count) for key, count in users.items()],
+                [(*key, count) for key, count in channels.items()])
+
+    def _restore(self, users, channels):
+        # Counts are plain sums, so failed rows merge with anything newer
+        for guild_id, user_id, count in users:
+            key = (guild_id, user_id)
+            self.users[key] = self.users.get(key, 0) + count
+        for guild_id, channel_id, minute, count in channels:
+            key = (guild_id, channel_id, minute)
+            self.channels[key] = self.channels.get(key, 0) + count
+
+    def _by_shard(self, users, channels):
+        """{shard: (user rows, channel rows)}"""
+        groups = {}
+        for shard, rows in group_by_shard(ADD_USER_MESSAGES, users).items():
+            groups.setdefault(shard, ([], []))[0].extend(rows)
+        for shard, rows in group_by_shard(ADD_CHANNEL_ACTIVITY, channels).items():
+            groups.setdefault(shard, ([], []))[1].extend(rows)
+        return groups
+
+    def _prunes(self, channels):
+        """PRUNE_CHANNEL_ACTIVITY params for the guilds in `channels` that are due"""
+        now = time.monotonic()
+        cutoff = int(time.time()) - self.retention
+        due = []
+        for guild_id in {row[0] for row in channels}:
+            if now - self._pruned.get(guild_id, float("-inf")) >= 3600:
+                self._pruned[guild_id] = now
+                due.append((guild_id, cutoff))
+        return due
+
+    async def flush(self, guild_id=None):
+        """Write pending counts, all of them or only guild_id's; returns the number of messages"""
+        async with self.lock:
+            users, channels = self._take(guild_id)
+            if not users and not channels:
+                return 0
+            groups = self._by_shard(users, channels)
+            try:
+                results = await asyncio.gather(
+                    *(self._write(shard, *rows) for shard, rows in groups.items()),
+                    return_exceptions=True
+                )
+            except BaseException:
+                self._restore(users, channels)
+                raise
+
+            # Only the shards that failed get their counts back
+            failed = [(rows, result) for rows, result in zip(groups.values(), results)
+                      if isinstance(result, BaseException)]
+            for (user_rows, channel_rows), _ in failed:
+                self._restore(user_rows, channel_rows)
+            if failed:
+                raise failed[0][1]
+            return sum(count for _, _, count in users)
+
+    async def _write(self, shard, users, channels):
+        prunes = self._prunes(channels)
+        async with transaction(shard) as tx:
+            if users:
+                await tx.executemany(ADD_USER_MESSAGES, users)
+            if channels:
+                await tx.executemany(ADD_CHANNEL_ACTIVITY, channels)
+            if prunes:
+                await tx.executemany(PRUNE_CHANNEL_ACTIVITY, prunes)
+
+    def flush_sync(self):
+        """Blocking flush for shutdown, works without a running loop"""
+        if not self.users and not self.channels:
+            return 0
+        users, channels = self._take()
+
+        def job(users, channels):
+            def run(conn):
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(ADD_USER_MESSAGES.sql, users)
+                    conn.executemany(ADD_CHANNEL_ACTIVITY.sql, channels)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            return run
+
+        error = None
+        for shard, (user_rows, channel_rows) in self._by_shard(users, channels).items():
+            try:
+                get_pool(shard).run(job(user_rows, channel_rows))
+            except Exception as e:
+                self._restore(user_rows, channel_rows)
+                error = error or e
+        if error:
+            raise error
+        return sum(count for _, _, count in users)
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Activity flush failed, will retry: {e}")
+
+    async def close(self):
+        """Stop the background loop, then flush whatever is left synchronously"""
+        self._closing = True
+        self._wake.set()
+        if self._task:
+            await self._task
+            self._task = None
+        self.flush_sync()
\ No newline at end of file
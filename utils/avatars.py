@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+import aiohttp
+
+# ========== AVATAR CACHE ==========
+# Avatars for image cards, fetched over one pooled aiohttp session and kept
+# on disk. Discord avatar URLs contain the avatar hash, so a new avatar is a
+# new URL and a cached file never goes stale. The folder is an LRU capped at
+# max_bytes: a hit bumps the file's mtime, the oldest files go first.
+# Threads only read, write and delete files; the LRU order and the byte
+# count are touched on the event loop alone.
+
+class AvatarCache:
+    def __init__(self, folder, max_bytes, connections=8, timeout=10):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.connections = connections
+        self.timeout = timeout
+        self._session = None
+        self._files = None  # OrderedDict {file name: size}, oldest first
+        self._bytes = 0
+        self._fetching = {}  # {url: Future} so one avatar is downloaded once
+        self.hits = 0
+        self.misses = 0
+
+    def _scan(self):
+        """The folder in LRU order (sorted by mtime), runs in a thread"""
+        os.makedirs(self.folder, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if name.endswith(".tmp"):
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        return OrderedDict((name, size) for _, name, size in sorted(entries))
+
+    async def _index(self):
+        """Load the folder into the LRU order once"""
+        if self._files is None:
+            files = await asyncio.to_thread(self._scan)
+            if self._files is None:  # another get may have finished its scan first
+                self._files = files
+                self._bytes = sum(files.values())
+        return self._files
+
+    def _session_for_loop(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    @staticmethod
+    def _name(url):
+        return hashlib.sha1(url.encode()).hexdigest() + ".img"
+
+    def _read(self, name):
+        path = os.path.join(self.folder, name)
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+        return data
+
+    def _write(self, name, data):
+        path = os.path.join(self.folder, name)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    def _remove(self, names):
+        for name in names:
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except FileNotFoundError:
+                pass
+
+    def _add(self, name, size):
+        """Record a written file as newest, returns the names evicted to stay under max_bytes"""
+        files = self._files
+        self._bytes += size - files.pop(name, 0)
+        files[name] = size
+        evicted = []
+        while self._bytes > self.max_bytes and len(files) > 1:
+            old, old_size = files.popitem(last=False)
+            self._bytes -= old_size
+            evicted.append(old)
+        return evicted
+
+    async def get(self, url):
+        """Image bytes for url, None if it can't be downloaded"""
+        if not url:
+            return None
+        name = self._name(url)
+        files = await self._index()
+        if name in files:
+            try:
+                data = await asyncio.to_thread(self._read, name)
+                if name in files:
+                    files.move_to_end(name)
+                self.hits += 1
+                return data
+            except FileNotFoundError:
+                if name in files:  # evicted meanwhile, already taken off _bytes
+                    self._bytes -= files.pop(name)
+
+        pending = self._fetching.get(url)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._fetching[url] = future
+        try:
+            data = await self._download(url)
+            if data:
+                await asyncio.to_thread(self._write, name, data)
+                evicted = self._add(name, len(data))
+                if evicted:
+                    await asyncio.to_thread(self._remove, evicted)
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_result(None)
+            if isinstance(e, Exception):
+                print(f"⚠️ Avatar download failed: {e}")
+                return None
+            raise
+        finally:
+            self._fetching.pop(url, None)
+
+    async def _download(self, url):
+        async with self._session_for_loop().get(url) as response:
+            if response.status != 200:
+                return None
+            return await response.read()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._files or ()),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
\ No newline at end of file
@@ -0,0 +1,161 @@
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import time
+from config import (
+    DB_BACKUP_DIR, DB_BACKUP_KEEP, DB_BACKUP_COMPRESS, DB_BACKUP_PAGES,
+    DB_BACKUP_SLEEP_MS, DB_BUSY_TIMEOUT_MS
+)
+from utils.shards import LAYOUT_FILE, all_paths, read_layout, write_layout
+
+# ========== ONLINE BACKUPS ==========
+# Snapshots go through sqlite3's backup API, DB_BACKUP_PAGES pages per step.
+# The source connection holds one read transaction for the whole copy: in
+# WAL mode that pins a consistent snapshot without blocking the bot's writers,
+# and the copy doesn't restart every time the bot writes between two steps.
+# One run = one folder: DB_BACKUP_DIR/<YYYYmmdd-HHMMSS>/<file>.db[.gz]
+
+SNAPSHOT_FORMAT = "%Y%m%d-%H%M%S"
+PARTIAL = ".partial"
+
+def copy_database(src_path, dest_path, pages=DB_BACKUP_PAGES, sleep_ms=DB_BACKUP_SLEEP_MS, progress=None):
+    """Page-stepped copy of a live database, progress(status, remaining, total)"""
+    src = sqlite3.connect(src_path, timeout=DB_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    dest = sqlite3.connect(dest_path)
+    try:
+        src.execute("BEGIN")
+        src.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone()  # opens the read snapshot
+        try:
+            src.backup(dest, pages=pages, progress=progress, sleep=sleep_ms / 1000)
+        finally:
+            src.execute("COMMIT")
+    finally:
+        dest.close()
+        src.close()
+
+def _compress(path):
+    with open(path, "rb") as f_in, gzip.open(path + ".gz", "wb", compresslevel=6) as f_out:
+        shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+    os.remove(path)
+    return path + ".gz"
+
+def _decompress(path, dest_path):
+    with gzip.open(path, "rb") as f_in, open(dest_path, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+    return dest_path
+
+def _folder_size(folder):
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+
+def take_snapshot(backup_dir=DB_BACKUP_DIR, compress=DB_BACKUP_COMPRESS, keep=DB_BACKUP_KEEP):
+    """
+    Back up the main database and every shard file into a new snapshot folder.
+    Blocking, the bot runs it with asyncio.to_thread. Returns a summary dict.
+    """
+    started = time.perf_counter()
+    name = time.strftime(SNAPSHOT_FORMAT)
+    while os.path.exists(os.path.join(backup_dir, name)):
+        name += "a"  # two runs within one second
+    folder = os.path.join(backup_dir, name + PARTIAL)
+    os.makedirs(folder)
+
+    try:
+        files = []
+        for path in all_paths(read_layout()):
+            if not os.path.exists(path):
+                continue
+            dest = os.path.join(folder, os.path.basename(path))
+            copy_database(path, dest)
+            if compress:
+                dest = _compress(dest)
+            files.append(os.path.basename(dest))
+        if os.path.exists(LAYOUT_FILE):
+            shutil.copy2(LAYOUT_FILE, os.path.join(folder, os.path.basename(LAYOUT_FILE)))
+    except BaseException:
+        shutil.rmtree(folder, ignore_errors=True)
+        raise
+
+    # Only complete snapshots lose the suffix, restore never sees half a run
+    final = os.path.join(backup_dir, name)
+    os.rename(folder, final)
+    removed = prune(backup_dir, keep)
+    return {
+        "name": name,
+        "path": final,
+        "files": files,
+        "bytes": _folder_size(final),
+        "seconds": time.perf_counter() - started,
+        "pruned": removed,
+    }
+
+def list_snapshots(backup_dir=DB_BACKUP_DIR):
+    """Complete snapshots, oldest first"""
+    if not os.path.isdir(backup_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(backup_dir)
+        if os.path.isdir(os.path.join(backup_dir, name)) and not name.endswith(PARTIAL)
+    )
+
+def prune(backup_dir=DB_BACKUP_DIR, keep=DB_BACKUP_KEEP):
+    """Delete all but the newest `keep` snapshots plus leftovers of crashed runs"""
+    removed = []
+    if not os.path.isdir(backup_dir):
+        return removed
+    names = list_snapshots(backup_dir)
+    for name in (names[:-keep] if keep > 0 else []):
+        shutil.rmtree(os.path.join(backup_dir, name), ignore_errors=True)
+        removed.append(name)
+    for name in os.listdir(backup_dir):
+        if name.endswith(PARTIAL) and name[:-len(PARTIAL)] < (names[-1] if names else ""):
+            shutil.rmtree(os.path.join(backup_dir, name), ignore_errors=True)
+    return removed
+
+def restore_snapshot(name=None, backup_dir=DB_BACKUP_DIR):
+    """
+    Write a snapshot (default: newest) back over the live database files.
+    Stop the bot and the dashboard first. Goes through the backup API as one
+    step, so stale -wal/-shm files of the live database are handled by sqlite.
+    """
+    names = list_snapshots(backup_dir)
+    if not names:
+        raise FileNotFoundError(f"No snapshots in {backup_dir}")
+    name = name or names[-1]
+    if name not in names:
+        raise FileNotFoundError(f"Snapshot {name} not found in {backup_dir}")
+    folder = os.path.join(backup_dir, name)
+
+    layout_path = os.path.join(folder, os.path.basename(LAYOUT_FILE))
+    shards = 0
+    if os.path.exists(layout_path):
+        with open(layout_path, encoding="utf-8") as f:
+            shards = int(json.load(f)["shards"])
+    targets = {os.path.basename(path): path for path in all_paths(shards)}
+
+    restored = []
+    for file_name in sorted(os.listdir(folder)):
+        if file_name == os.path.basename(LAYOUT_FILE):
+            continue
+        base = file_name[:-3] if file_name.endswith(".gz") else file_name
+        live = targets.get(base)
+        if live is None:
+            raise ValueError(f"Don't know where {file_name} belongs")
+
+        os.makedirs(os.path.dirname(live), exist_ok=True)
+        src = os.path.join(folder, file_name)
+        temp = None
+        if file_name.endswith(".gz"):
+            temp = _decompress(src, live + ".restore")
+            src = temp
+        try:
+            copy_database(src, live, pages=-1)
+        finally:
+            if temp:
+                os.remove(temp)
+        restored.append(live)
+
+    if shards or os.path.exists(LAYOUT_FILE):
+        write_layout(shards)
+    return {"name": name, "files": restored, "shards": shards}
\ No newline at end of file
@@ -0,0 +1,230 @@
+import sys
+import time
+from collections import OrderedDict
+
+# ========== IN-MEMORY CACHES ==========
+# Every cache registers itself by name so !dbstats and the dashboard can
+# show hit rates without knowing which cog owns it.
+
+CACHES = {}  # {name: LRUCache}
+
+class LRUCache:
+    """Size-bounded mapping, the least recently used entry is evicted first"""
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHES[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key, default=None):
+        """Lookup that doesn't count as a hit/miss or refresh the entry"""
+        return self._data.get(key, default)
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def setdefault(self, key, value):
+        """Existing value if another task filled the key first, else store value"""
+        current = self._data.get(key)
+        if current is not None:
+            self._data.move_to_end(key)
+            return current
+        self.put(key, value)
+        return value
+
+    def items(self):
+        """Snapshot of (key, value) pairs, doesn't touch the LRU order"""
+        return list(self._data.items())
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+class ExpiringCache:
+    """
+    Keys that drop out `ttl` seconds after their last put, for cooldowns and
+    short sliding windows. Deadlines are grouped into buckets `resolution`
+    seconds wide (a timing wheel): put and lookup are O(1), and whole buckets
+    are swept on later writes. Memory follows the keys alive within the
+    window, with `maxsize` as a hard cap (soonest-to-expire evicted first).
+    """
+    def __init__(self, name, ttl, resolution=1.0, maxsize=None):
+        self.name = name
+        self.ttl = ttl
+        self.resolution = max(0.001, resolution)
+        self.maxsize = maxsize
+        self._data = {}     # {key: (deadline, value)}
+        self._buckets = {}  # {bucket number: {keys whose deadline falls in it}}
+        self._swept = None  # buckets below this number are gone
+        self._peak = 0      # dicts never shrink on delete, rebuilt after a big drop
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        CACHES[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self._live(key, time.monotonic()) is not None
+
+    def _bucket(self, deadline):
+        return int(deadline // self.resolution)
+
+    def _live(self, key, now):
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= now:
+            return None  # an expired key waits for its bucket to be swept
+        return entry
+
+    def get(self, key, default=None, now=None):
+        entry = self._live(key, time.monotonic() if now is None else now)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value=True, now=None):
+        """Store value and (re)start the key's ttl"""
+        now = time.monotonic() if now is None else now
+        self.sweep(now)
+        old = self._data.get(key)
+        if old is not None:
+            self._unlink(key, old[0])
+        deadline = now + self.ttl
+        self._data[key] = (deadline, value)
+        self._buckets.setdefault(self._bucket(deadline), set()).add(key)
+        if self.maxsize and len(self._data) > self.maxsize:
+            self._evict()
+        if len(self._data) > self._peak:
+            self._peak = len(self._data)
+
+    def try_add(self, key, value=True, now=None):
+        """put() unless the key is still alive, True if it was added (cooldown check)"""
+        now = time.monotonic() if now is None else now
+        if self._live(key, now) is not None:
+            self.hits += 1
+            return False
+        self.misses += 1
+        self.put(key, value, now)
+        return True
+
+    def keys(self):
+        """Snapshot of the stored keys, expired ones waiting for a sweep included"""
+        return list(self._data)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self._unlink(key, entry[0])
+        return entry[1]
+
+    def clear(self):
+        self._data = {}
+        self._buckets.clear()
+        self._peak = 0
+
+    def _unlink(self, key, deadline):
+        number = self._bucket(deadline)
+        keys = self._buckets.get(number)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._buckets[number]
+
+    def _evict(self):
+        number = min(self._buckets)
+        keys = self._buckets[number]
+        key = keys.pop()
+        if not keys:
+            del self._buckets[number]
+        del self._data[key]
+        self.evictions += 1
+
+    def sweep(self, now=None):
+        """Drop every bucket whose deadlines all passed, returns the keys removed"""
+        now = time.monotonic() if now is None else now
+        limit = self._bucket(now)  # buckets below this one are fully expired
+        start = self._swept
+        if start is not None and limit <= start:
+            return 0
+        self._swept = limit
+        if start is None or limit - start > len(self._buckets):
+            # first sweep or a long quiet gap, cheaper to look at what exists
+            numbers = [number for number in self._buckets if number < limit]
+        else:
+            numbers = [number for number in range(start, limit) if number in self._buckets]
+        removed = 0
+        for number in numbers:
+            for key in self._buckets.pop(number):
+                del self._data[key]
+                removed += 1
+        self.expired += removed
+        if removed and len(self._data) < self._peak // 4:
+            self._data = dict(self._data)
+            self._peak = len(self._data)
+        return removed
+
+    def memory_bytes(self):
+        """Rough footprint of the containers (keys and values not included)"""
+        return (
+            sys.getsizeof(self._data) + sys.getsizeof(self._buckets)
+            + sum(sys.getsizeof(keys) for keys in self._buckets.values())
+            + len(self._data) * sys.getsizeof((0.0, None))
+        )
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize or "∞",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "buckets": len(self._buckets),
+            "kib": round(self.memory_bytes() / 1024, 1),
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in CACHES.items()}
\ No newline at end of file
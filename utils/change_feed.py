@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from utils.connection import connect
+
+# ========== CROSS-PROCESS CACHE INVALIDATION ==========
+# The dashboard and the maintenance scripts write to the same SQLite files
+# as the bot. Triggers (migration 6) note every (table, guild) they touch
+# in cache_changes; this feed tells the bot about them so only that
+# guild's cache entry is dropped.
+# Each poll is one PRAGMA data_version per database file, which SQLite
+# answers from memory and which only moves when another connection
+# committed. cache_changes is only read when it did.
+
+CHANGES_SINCE = "SELECT id, tbl, guild_id FROM cache_changes WHERE id > ? ORDER BY id"
+LAST_CHANGE = "SELECT COALESCE(MAX(id), 0) FROM cache_changes"
+
+class ChangeFeed:
+    """Calls callback(table, guild_id) for rows changed in any of `paths`"""
+    def __init__(self, paths, interval, callback):
+        self.paths = paths
+        self.interval = interval
+        self.callback = callback
+        self.changes = 0
+        self._conns = {}     # {path: connection only this feed uses}
+        self._versions = {}  # {path: data_version at the last read}
+        self._last_ids = {}  # {path: newest cache_changes id seen}
+        self._task = None
+        self._lock = threading.Lock()  # a cancelled poll may still be running in its thread
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    def _conn(self, path):
+        conn = self._conns.get(path)
+        if conn is None:
+            conn = self._conns[path] = connect(path, isolation_level=None, check_same_thread=False)
+        return conn
+
+    def poll(self):
+        """[(table, guild_id)] changed since the last poll, blocking"""
+        with self._lock:
+            return self._poll()
+
+    def _poll(self):
+        found = []
+        for path in self.paths:
+            conn = self._conn(path)
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._versions.get(path) == version:
+                continue
+            self._versions[path] = version
+
+            if path not in self._last_ids:
+                # First look: caches start empty, only later changes matter
+                self._last_ids[path] = conn.execute(LAST_CHANGE).fetchone()[0]
+                continue
+            for change_id, table, guild_id in conn.execute(CHANGES_SINCE, (self._last_ids[path],)):
+                self._last_ids[path] = change_id
+                found.append((table, guild_id))
+        return found
+
+    async def _run(self):
+        while True:
+            try:
+                changes = await asyncio.to_thread(self.poll)
+            except Exception as e:
+                print(f"⚠️ Cache change poll failed: {e}")
+                changes = []
+            for table, guild_id in changes:
+                self.changes += 1
+                self.callback(table, guild_id)
+            await asyncio.sleep(self.interval)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._lock:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
\ No newline at end of file
@@ -0,0 +1,38 @@
+import os
+import sqlite3
+from config import (
+    DATABASE_PATH, DB_BUSY_TIMEOUT_MS, DB_CACHE_SIZE_KB, DB_MMAP_SIZE,
+    DB_STATEMENT_CACHE, DB_SYNCHRONOUS, DB_TEMP_STORE, DB_WAL_AUTOCHECKPOINT
+)
+
+# Shared connection profile for the bot and the web dashboard.
+# WAL lets dashboard reads run while the bot writes (and the other way round).
+
+def apply_profile(conn):
+    """Apply journal/cache pragmas from config.py to an open connection"""
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.DatabaseError as e:
+        # e.g. network filesystems without shared memory support
+        print(f"⚠️ WAL not available, keeping default journal: {e}")
+
+    conn.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size={-int(DB_CACHE_SIZE_KB)}")  # negative = KiB
+    conn.execute(f"PRAGMA mmap_size={int(DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA temp_store={DB_TEMP_STORE}")
+    conn.execute(f"PRAGMA wal_autocheckpoint={int(DB_WAL_AUTOCHECKPOINT)}")
+    return conn
+
+def connect(path=None, **kwargs):
+    """Open a tuned connection, extra kwargs go to sqlite3.connect"""
+    path = path or DATABASE_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    kwargs.setdefault("timeout", DB_BUSY_TIMEOUT_MS / 1000)
+    kwargs.setdefault("cached_statements", DB_STATEMENT_CACHE)  # prepared statements kept per connection
+    conn = sqlite3.connect(path, **kwargs)
+    return apply_profile(conn)
+
+def checkpoint(conn, mode="PASSIVE"):
+    """Run a WAL checkpoint, returns (busy, log_frames, checkpointed_frames)"""
+    return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
\ No newline at end of file
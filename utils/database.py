@@ -1,233 +1,432 @@
-import sqlite3
+import asyncio
 import os
-from config import DATABASE_PATH
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from contextvars import ContextVar
+from config import (
+    DATABASE_PATH, DB_POOL_SIZE, DB_CHECKPOINT_INTERVAL, DB_SHARDS, DB_SHARD_POOL_SIZE
+)
+from utils.connection import connect, checkpoint
+from utils.db_metrics import LOCK_KEY, current_origin, key_for, metrics
+from utils.queries import Query, scalar
+from utils.shards import SHARDED_TABLES, shard_index, shard_path, read_layout, write_layout
 
 def get_db_path():
     os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
     return DATABASE_PATH
 
-def init_db():
-    conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
-    
-    # DROP OLD TABLES FIRST
-    cursor.execute("DROP TABLE IF EXISTS confession_config")
-    
-    # CREATE ALL TABLES
-    tables = [
-        # Users table (leveling)
-        ('''CREATE TABLE IF NOT EXISTS users (
-            user_id TEXT,
-            guild_id TEXT,
-            xp INTEGER DEFAULT 0,
-            level INTEGER DEFAULT 1,
-            messages INTEGER DEFAULT 0,
-            last_message_time TIMESTAMP,
-            PRIMARY KEY (user_id, guild_id)
-        )'''),
-        
-        # Level roles
-        ('''CREATE TABLE IF NOT EXISTS level_roles (
-            guild_id TEXT,
-            level INTEGER,
-            role_id TEXT,
-            PRIMARY KEY (guild_id, level)
-        )'''),
-        
-        # Filtered words
-        ('''CREATE TABLE IF NOT EXISTS filtered_words (
-            guild_id TEXT,
-            word TEXT,
-            added_by TEXT,
-            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY (guild_id, word)
-        )'''),
-        
-        # Custom commands
-        ('''CREATE TABLE IF NOT EXISTS custom_commands (
-            guild_id TEXT,
-            cmd_name TEXT,
-            response TEXT,
-            created_by TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY (guild_id, cmd_name)
-        )'''),
-        
-        # Confession setup (NEW)
-        ('''CREATE TABLE IF NOT EXISTS confession_setup (
-            guild_id TEXT PRIMARY KEY,
-            confession_channel_id TEXT,
-            log_channel_id TEXT,
-            user_log_channel_id TEXT,
-            current_number INTEGER DEFAULT 0,
-            setup_message_id TEXT
-        )'''),
-        
-        # Dalam fungsi init_db(), update tabel confession_messages:
-
-        # Confession messages (UPDATED)
-        ('''CREATE TABLE IF NOT EXISTS confession_messages (
-            confession_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id TEXT,
-            user_id TEXT,
-            message TEXT,
-            confession_number INTEGER,
-            thread_id TEXT,
-            message_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            replies_count INTEGER DEFAULT 0,
-            is_reply INTEGER DEFAULT 0,
-            reply_to INTEGER
-        )'''),
+# ========== CONNECTION POOL ==========
+
+_STOP = object()
+_COMMIT = object()
+_ROLLBACK = object()
+# Pool whose connection the current task holds in a transaction, if any
+_pinned = ContextVar("pinned_pool", default=None)
+
+class _Worker(threading.Thread):
+    """Thread that owns one long-lived connection and runs jobs on it"""
+    def __init__(self, path, jobs, name):
+        super().__init__(name=name, daemon=True)
+        self.path = path
+        self.jobs = jobs
+
+    def run(self):
+        # isolation_level=None = autocommit, transactions are explicit BEGIN/COMMIT
+        try:
+            conn = connect(self.path, isolation_level=None, check_same_thread=False)
+        except BaseException as e:
+            print(f"❌ {self.name} could not open {self.path}: {e}")
+            self._fail(e)
+            return
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is _STOP:
+                    break
+                fn, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(fn(conn))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            conn.close()
+
+    def _fail(self, error):
+        """No connection: answer the jobs this thread picks up with the error, so none waits forever"""
+        while True:
+            job = self.jobs.get()
+            if job is _STOP:
+                return
+            _, future = job
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+class ConnectionPool:
+    """Small pool of worker threads, each with its own sqlite3 connection"""
+    def __init__(self, path, size, checkpoint_interval=0, name="db"):
+        self.path = path
+        self._jobs = queue.Queue()
+        self._closed = False
+        self._stop_checkpoints = threading.Event()
+        self._workers = [
+            _Worker(path, self._jobs, f"{name}-worker-{i}") for i in range(max(1, size))
+        ]
+        for worker in self._workers:
+            worker.start()
         
-        # Welcome config
-        ('''CREATE TABLE IF NOT EXISTS welcome_config (
-            guild_id TEXT PRIMARY KEY,
-            channel_id TEXT,
-            welcome_message TEXT DEFAULT 'Welcome {member} to {server}!',
-            goodbye_message TEXT DEFAULT 'Goodbye {member}!'
-        )'''),
+        if checkpoint_interval > 0:
+            threading.Thread(
+                target=self._checkpoint_loop, args=(checkpoint_interval,),
+                name=f"{name}-checkpoint", daemon=True
+            ).start()
+
+    def _checkpoint_loop(self, interval):
+        """Keep the WAL file short even when readers never let autocheckpoint finish"""
+        while not self._stop_checkpoints.wait(interval):
+            try:
+                self.run(lambda conn: checkpoint(conn, "PASSIVE"))
+            except Exception as e:
+                print(f"⚠️ WAL checkpoint failed: {e}")
+
+    def submit(self, fn):
+        """Queue fn(conn) on the next free worker, returns a concurrent Future"""
+        if self._closed:
+            raise RuntimeError("Database pool is closed")
+        future = Future()
+        self._jobs.put((fn, future))
+        return future
+
+    def queued(self):
+        """Jobs waiting for a free worker"""
+        return self._jobs.qsize()
+
+    def run(self, fn):
+        """Blocking call, for sync code (scripts, Flask, execute_query)"""
+        return self.submit(fn).result()
+
+    async def run_async(self, fn):
+        """Awaitable call, the event loop keeps running while the worker works"""
+        if _pinned.get() is self:
+            raise RuntimeError("Inside a transaction use tx.fetch_one/execute/..., not the pool")
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._stop_checkpoints.set()
+        for _ in self._workers:
+            self._jobs.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+
+def _cursor(conn, query):
+    """Cursor plus SQL text, catalog queries build their record type per row"""
+    cursor = conn.cursor()
+    if isinstance(query, Query):
+        if query.row_factory:
+            cursor.row_factory = query.row_factory
+        return cursor, query.sql
+    return cursor, query
+
+def _timed(query, fn, count_rows):
+    """
+    Wrap a job so the worker records it in db_metrics. The caller (cog and
+    command) is captured here, on the event loop, before the job is queued.
+    """
+    key = key_for(query)
+    origin = current_origin()
+    queued = time.perf_counter()
+
+    def job(conn):
+        started = time.perf_counter()
+        wait_ms = (started - queued) * 1000
+        try:
+            result = fn(conn)
+        except Exception:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.record(key, elapsed_ms, wait_ms, error=True, origin=origin, sql=getattr(query, "sql", query))
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.record(key, elapsed_ms, wait_ms, count_rows(result), origin=origin, sql=getattr(query, "sql", query))
+        return result
+    return job
+
+def _fetch_one_job(query, params):
+    def job(conn):
+        cursor, sql = _cursor(conn, query)
+        row = cursor.execute(sql, params).fetchone()
+        cursor.close()  # resets the statement, an INSERT ... RETURNING commits here
+        return row
+    return _timed(query, job, lambda row: 0 if row is None else 1)
+
+def _fetch_all_job(query, params):
+    def job(conn):
+        cursor, sql = _cursor(conn, query)
+        return cursor.execute(sql, params).fetchall()
+    return _timed(query, job, len)
+
+def _execute_job(query, params):
+    def job(conn):
+        cursor, sql = _cursor(conn, query)
+        return cursor.execute(sql, params).rowcount
+    return _timed(query, job, lambda rowcount: max(rowcount, 0))
+
+def _executemany_job(query, seq_of_params):
+    def job(conn):
+        cursor, sql = _cursor(conn, query)
+        return cursor.executemany(sql, seq_of_params).rowcount
+    return _timed(query, job, lambda rowcount: max(rowcount, 0))
+
+class Transaction:
+    """
+    Pins one pooled connection between BEGIN and COMMIT.
+    Usage: async with transaction() as tx: await tx.execute(...)
+    The block holds the write lock and one of the pool's few workers until it
+    ends: run every statement through tx, and keep slow awaits (Discord
+    calls, other pools' flushes) outside it. Plain pool calls on the same
+    pool raise RuntimeError inside the block, with 2-4 workers they could
+    wait for the pinned one and deadlock.
+    """
+    def __init__(self, pool):
+        self._pool = pool
+        self._inbox = queue.Queue()
+        self._done = None
+        self._origin = None
+        self._queued = 0.0
+        self._token = None
+
+    async def __aenter__(self):
+        if _pinned.get() is self._pool:
+            raise RuntimeError("Transactions on the same database don't nest")
+        started = Future()
+        self._origin = current_origin()
+        self._queued = time.perf_counter()
+        self._done = self._pool.submit(lambda conn: self._serve(conn, started))
+        self._done.add_done_callback(lambda done: _never_started(started, done))
+        try:
+            await asyncio.wrap_future(started)
+        except asyncio.CancelledError:
+            # The worker may still get the lock after the caller gave up,
+            # it rolls back as soon as it reads this instead of holding it
+            self._inbox.put(_ROLLBACK)
+            raise
+        self._token = _pinned.set(self._pool)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _pinned.reset(self._token)
+        self._inbox.put(_ROLLBACK if exc_type else _COMMIT)
+        await asyncio.wrap_future(self._done)
+        return False
+
+    def _serve(self, conn, started):
+        if not started.set_running_or_notify_cancel():
+            return  # cancelled before it got a worker, never BEGIN
+        # Time to get the write lock shows up under LOCK_KEY
+        begin = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except BaseException as e:
+            metrics.record(LOCK_KEY, (time.perf_counter() - begin) * 1000,
+                           (begin - self._queued) * 1000, error=True, origin=self._origin)
+            started.set_exception(e)
+            raise
+        metrics.record(LOCK_KEY, (time.perf_counter() - begin) * 1000,
+                       (begin - self._queued) * 1000, origin=self._origin)
+        started.set_result(None)
         
-        # Scheduled messages (NEW)
-        ('''CREATE TABLE IF NOT EXISTS scheduled_messages (
-            schedule_id TEXT PRIMARY KEY,
-            guild_id TEXT,
-            channel_id TEXT,
-            hour INTEGER,
-            minute INTEGER,
-            message TEXT,
-            enabled INTEGER DEFAULT 1
-        )''')
-    ]
-    
-    for table_sql in tables:
-        cursor.execute(table_sql)
-    
-    conn.commit()
-    conn.close()
-    print("✅ Database initialized successfully")
+        while True:
+            item = self._inbox.get()
+            if item is _COMMIT:
+                try:
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                return
+            if item is _ROLLBACK:
+                conn.execute("ROLLBACK")
+                return
+            fn, future = item
+            try:
+                future.set_result(fn(conn))
+            except BaseException as e:
+                future.set_exception(e)
+
+    async def _call(self, fn):
+        future = Future()
+        self._inbox.put((fn, future))
+        return await asyncio.wrap_future(future)
+
+    async def fetch_one(self, query, params=()):
+        return await self._call(_fetch_one_job(query, params))
+
+    async def fetch_all(self, query, params=()):
+        return await self._call(_fetch_all_job(query, params))
+
+    async def execute(self, query, params=()):
+        return await self._call(_execute_job(query, params))
+
+    async def executemany(self, query, seq_of_params):
+        return await self._call(_executemany_job(query, seq_of_params))
+
+def _never_started(started, done):
+    """The transaction job ended without reaching BEGIN (worker without a connection)"""
+    if started.done() or done.cancelled():
+        return
+    try:
+        started.set_exception(done.exception() or RuntimeError("Transaction ended before BEGIN"))
+    except InvalidStateError:
+        pass
+
+_pools = {}  # {shard index, None = main database: ConnectionPool}
+_pool_lock = threading.Lock()
+
+def get_pool(shard=None):
+    """Shared pool of the main database or of one shard, created on first use"""
+    pool = _pools.get(shard)
+    if pool is None:
+        with _pool_lock:
+            pool = _pools.get(shard)
+            if pool is None:
+                if shard is None:
+                    pool = ConnectionPool(get_db_path(), DB_POOL_SIZE, DB_CHECKPOINT_INTERVAL)
+                else:
+                    # One writer per shard file, so guilds on different shards don't queue
+                    pool = ConnectionPool(
+                        shard_path(shard), DB_SHARD_POOL_SIZE, DB_CHECKPOINT_INTERVAL,
+                        name=f"shard{shard:02d}"
+                    )
+                _pools[shard] = pool
+    return pool
+
+def pool_stats():
+    """{pool name: {"path", "workers", "queued"}} for !dbstats and the snapshot"""
+    with _pool_lock:
+        pools = list(_pools.items())
+    return {
+        "main" if shard is None else f"shard{shard:02d}": {
+            "path": pool.path, "workers": len(pool._workers), "queued": pool.queued()
+        }
+        for shard, pool in pools
+    }
+
+def close_pool():
+    with _pool_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+# ========== SHARD ROUTING ==========
+
+def shard_of(query, params):
+    """Shard a statement runs on, None = main database"""
+    if DB_SHARDS and isinstance(query, Query) and query.guild_param is not None:
+        return shard_index(params[query.guild_param])
+    return None
+
+def group_by_shard(query, seq_of_params):
+    """{shard: [params]}, so a batch can be written by every shard's writer at once"""
+    groups = {}
+    for params in seq_of_params:
+        groups.setdefault(shard_of(query, params), []).append(params)
+    return groups
+
+# ========== ASYNC API ==========
+
+async def fetch_one(query, params=()):
+    return await get_pool(shard_of(query, params)).run_async(_fetch_one_job(query, params))
+
+async def fetch_all(query, params=()):
+    return await get_pool(shard_of(query, params)).run_async(_fetch_all_job(query, params))
+
+async def fetch_value(query, params=(), default=None):
+    """First column of the first row, for COUNT(*) style queries"""
+    row = await fetch_one(query, params)
+    if row is None:
+        return default
+    return row if isinstance(query, Query) and query.record is scalar else row[0]
+
+async def execute(query, params=()):
+    """Run one statement (autocommit), returns rowcount"""
+    return await get_pool(shard_of(query, params)).run_async(_execute_job(query, params))
+
+async def executemany(query, seq_of_params):
+    """Runs per shard in parallel when the batch spans several, returns total rowcount"""
+    groups = group_by_shard(query, seq_of_params)
+    counts = await asyncio.gather(*(
+        get_pool(shard).run_async(_executemany_job(query, rows))
+        for shard, rows in groups.items()
+    ))
+    return sum(counts)
+
+def transaction(shard=None):
+    """Transaction on the main database or on one shard (see shard_of)"""
+    return Transaction(get_pool(shard))
+
+def _check_layout():
+    layout = read_layout()
+    if layout == DB_SHARDS:
+        return
+    if layout == 0:
+        # First start with sharding on: fine as long as nothing has to move
+        conn = connect(get_db_path())
+        try:
+            has_rows = any(
+                conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()
+                for table in SHARDED_TABLES
+            )
+        finally:
+            conn.close()
+        if not has_rows:
+            write_layout(DB_SHARDS)
+            return
+    raise RuntimeError(
+        f"Data is laid out for {layout} shard(s) but DB_SHARDS={DB_SHARDS}, "
+        f"run `python shard_tool.py rebalance` first"
+    )
+
+def init_db():
+    """Create or upgrade the schema of every database file, a no-op when current"""
+    from utils.migrations import migrate
+    paths = [get_db_path()] + [shard_path(i) for i in range(DB_SHARDS)]
+    for path in paths:
+        conn = connect(path)
+        try:
+            version = migrate(conn)
+        finally:
+            conn.close()
+    _check_layout()
+    if DB_SHARDS:
+        print(f"✅ Database ready (schema v{version}, {DB_SHARDS} shards)")
+    else:
+        print(f"✅ Database ready (schema v{version})")
 
 def execute_query(query, params=(), fetch=False, fetchall=False, commit=True):
-    conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
+    """
+    Blocking shim over the pool for code that is not async yet (commit is
+    always on). Errors are printed and raised again, None only ever means
+    "no row".
+    """
+    if fetch:
+        job = _fetch_one_job(query, params)
+    elif fetchall:
+        job = _fetch_all_job(query, params)
+    else:
+        job = _execute_job(query, params)
     
     try:
-        cursor.execute(query, params)
-        
-        if fetch:
-            result = cursor.fetchone()
-        elif fetchall:
-            result = cursor.fetchall()
-        else:
-            result = cursor.rowcount
-        
-        if commit:
-            conn.commit()
-        return result
+        return get_pool(shard_of(query, params)).run(job)
     except Exception as e:
         print(f"❌ Database error: {e}")
-        conn.rollback()
-        return None
-    finally:
-        conn.close()
-
-# 🔥 Fungsi baru untuk migrasi
-def migrate_db():
-    """Migrate old database if needed"""
-    conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
-    
-    try:
-        # Cek apakah tabel users punya primary key lama
-        cursor.execute("PRAGMA table_info(users)")
-        columns = cursor.fetchall()
-        has_primary = any(col[5] == 1 for col in columns)  # col[5] is pk
-        
-        if not has_primary:
-            print("🔄 Migrating users table...")
-            # Backup data
-            cursor.execute("SELECT * FROM users")
-            old_data = cursor.fetchall()
-            
-            # Drop and recreate with new schema
-            cursor.execute("DROP TABLE users")
-            cursor.execute('''
-            CREATE TABLE users (
-                user_id TEXT,
-                guild_id TEXT,
-                xp INTEGER DEFAULT 0,
-                level INTEGER DEFAULT 1,
-                messages INTEGER DEFAULT 0,
-                last_message_time TIMESTAMP,
-                PRIMARY KEY (user_id, guild_id)
-            )
-            ''')
-
-            # Tabel confession config
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS confession_config (
-                guild_id TEXT PRIMARY KEY,
-                confession_channel TEXT,
-                confession_counter INTEGER DEFAULT 0
-            )
-            ''')
-
-            # Tabel scheduled messages
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scheduled_messages (
-                schedule_id TEXT PRIMARY KEY,
-                guild_id TEXT,
-                channel_id TEXT,
-                hour INTEGER,
-                minute INTEGER,
-                message TEXT,
-                enabled INTEGER DEFAULT 1
-            )
-            ''')
-
-            # Tabel confession setup
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS confession_setup (
-                guild_id TEXT PRIMARY KEY,
-                confession_channel_id TEXT,
-                log_channel_id TEXT,
-                user_log_channel_id TEXT,
-                current_number INTEGER DEFAULT 0,
-                setup_message_id TEXT
-            )
-            ''')
-
-            # Tabel confession messages
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS confession_messages (
-                confession_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id TEXT,
-                user_id TEXT,
-                message TEXT,
-                confession_number INTEGER,
-                thread_id TEXT,
-                message_id TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                replies_count INTEGER DEFAULT 0
-            )
-            ''')
-
-            # Insert old data dengan guild_id default
-            for row in old_data:
-                if len(row) >= 2:
-                    cursor.execute(
-                        "INSERT INTO users (user_id, guild_id, xp, level, messages) VALUES (?, 'default', ?, ?, ?)",
-                        row[:4]
-                    )
-            
-            conn.commit()
-            print("✅ Migration complete")
-    except Exception as e:
-        print(f"⚠️ Migration skipped: {e}")
-    finally:
-        conn.close()
+        raise
 
 if __name__ == "__main__":
     init_db()
-    migrate_db()
     print("✅ Database setup complete")
\ No newline at end of file
@@ -0,0 +1,179 @@
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from config import DB_SLOW_QUERY_MS, DB_SLOW_QUERY_LOG
+
+# ========== QUERY METRICS ==========
+# Every pooled statement is timed on its worker thread. Stats are keyed by
+# catalog query name, ad-hoc SQL strings by their normalised text.
+# wait = time queued for a free worker, time = time spent inside sqlite
+# (busy waits on the write lock included). Parameters are never logged,
+# they can hold confession text.
+
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)  # + overflow
+LOCK_KEY = "BEGIN IMMEDIATE"  # transaction start, i.e. waiting for the write lock
+
+# "Cog:command" while a command runs, set from the bot's before_invoke hook
+origin = contextvars.ContextVar("db_origin", default=None)
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+@functools.lru_cache(maxsize=512)
+def normalise_sql(sql):
+    """Literals become ?, whitespace collapses, so one statement shape is one key"""
+    return " ".join(_LITERAL.sub("?", sql).split())
+
+def key_for(query):
+    name = getattr(query, "name", None)
+    return name or normalise_sql(query)
+
+def current_origin():
+    """Command that runs right now, else the asyncio task or thread name"""
+    value = origin.get()
+    if value:
+        return value
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task.get_name() if task else threading.current_thread().name
+
+class QueryStats:
+    __slots__ = ("calls", "errors", "rows", "total_ms", "max_ms", "wait_ms", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.wait_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms, wait_ms, rows, error):
+        self.calls += 1
+        self.errors += error
+        self.rows += rows
+        self.total_ms += elapsed_ms
+        self.wait_ms += wait_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        for i, bound in enumerate(BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (max for the overflow)"""
+        if not self.calls:
+            return 0.0
+        target = self.calls * p / 100
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+            "avg_wait_ms": round(self.wait_ms / self.calls, 3) if self.calls else 0,
+            "buckets": list(self.buckets),
+        }
+
+class Metrics:
+    """Thread-safe store the pool workers report into"""
+    def __init__(self, slow_ms=100, slow_log_path=None, keep_slow=50):
+        self.slow_ms = slow_ms
+        self.slow_log_path = slow_log_path
+        self._lock = threading.Lock()
+        self._stats = {}  # {key: QueryStats}
+        self._slow = deque(maxlen=keep_slow)
+        self.since = time.time()
+
+    def record(self, key, elapsed_ms, wait_ms=0.0, rows=0, error=False, origin=None, sql=None):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats()
+            stats.add(elapsed_ms, wait_ms, rows, error)
+
+        if elapsed_ms >= self.slow_ms:
+            self._log_slow(key, elapsed_ms, wait_ms, rows, error, origin, sql)
+
+    def _log_slow(self, key, elapsed_ms, wait_ms, rows, error, origin, sql):
+        entry = {
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "query": key,
+            "ms": round(elapsed_ms, 1),
+            "wait_ms": round(wait_ms, 1),
+            "rows": rows,
+            "error": error,
+            "origin": origin,
+            "sql": normalise_sql(sql) if sql else key,
+        }
+        print(f"🐢 Slow query {entry['ms']}ms [{origin}] {key}")
+        with self._lock:
+            self._slow.append(entry)
+            if self.slow_log_path:
+                try:
+                    os.makedirs(os.path.dirname(self.slow_log_path), exist_ok=True)
+                    with open(self.slow_log_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    print(f"⚠️ Could not write slow query log: {e}")
+
+    def snapshot(self):
+        with self._lock:
+            queries = {key: stats.to_dict() for key, stats in self._stats.items()}
+            slow = list(self._slow)
+        lock = queries.get(LOCK_KEY, {})
+        return {
+            "since": self.since,
+            "taken": time.time(),
+            "slow_ms": self.slow_ms,
+            "buckets_ms": list(BUCKETS_MS),
+            "lock_wait_ms": lock.get("total_ms", 0),
+            "queries": dict(sorted(queries.items(), key=lambda item: -item[1]["total_ms"])),
+            "slow": slow,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self.since = time.time()
+
+def write_snapshot(path, snapshot):
+    """Atomic write, the dashboard may read the file at any time"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+    os.replace(temp_path, path)
+
+def read_snapshot(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+metrics = Metrics(DB_SLOW_QUERY_MS, DB_SLOW_QUERY_LOG)
\ No newline at end of file
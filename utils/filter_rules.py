@@ -0,0 +1,132 @@
+from utils.normalize import canonical, fold_word
+from utils.safe_regex import PatternError, PatternMatcher, parse, is_word, CharSet, reverse, match_span
+from utils.text_match import WordMatcher
+
+# ========== FILTER RULES ==========
+# What !addfilter accepts. Words and wildcards are matched against the
+# canonical form of a message (utils/normalize.py), patterns against the
+# message as written, lower-cased: the canonical form has no punctuation
+# left and reads leetspeak digits as letters, so \d or https?:// could
+# never hit there.
+#   word        anywhere, also inside other words (the original behaviour)
+#   =word       whole words only
+#   bad*  *bad  words starting / ending with "bad"; * is any run of letters
+#   b?d  b*d    and ? one letter, inside one word
+#   re:pattern  the linear-time dialect of utils/safe_regex.py, ignoring case
+# Literal rules (plain and =word) share one Aho-Corasick automaton,
+# wildcards share one PatternMatcher and patterns another, so a guild's
+# whole rule list is at most three passes over the message whatever its size.
+
+WORD = CharSet(classes=("w",))
+
+class Rule:
+    __slots__ = ("source", "kind", "literal", "node", "_span")
+
+    def __init__(self, source, kind, literal=None, node=None):
+        self.source = source  # as stored and listed
+        self.kind = kind      # "word", "whole", "wildcard" or "regex"
+        self.literal = literal
+        self.node = node
+        self._span = None  # (forward, reversed) PatternMatchers of this rule alone, built on the first hit
+
+    @property
+    def raw(self):
+        """Matched against the lower-cased message rather than the canonical form"""
+        return self.kind == "regex"
+
+    def span(self, text, end):
+        """(start, end) of the match of this pattern rule the search found ending at end"""
+        if self._span is None:
+            self._span = (PatternMatcher([(self, self.node)]), PatternMatcher([(self, reverse(self.node))]))
+        return match_span(*self._span, text, end)
+
+    def __repr__(self):
+        return f"<Rule {self.kind} {self.source!r}>"
+
+def _wildcard(source):
+    """bad* / *bad / b?d as a pattern node, anchored at the word edges without a *"""
+    if not source.replace("*", "").replace("?", ""):
+        raise PatternError("A wildcard needs at least one letter")
+    items = [] if source.startswith("*") else [("assert", "b")]
+    for ch in fold_word(source):
+        if ch == "*":
+            items.append(("rep", ("set", WORD), 0, None))
+        elif ch == "?":
+            items.append(("set", WORD))
+        elif ch == " ":
+            raise PatternError("Wildcards work inside one word, no spaces or punctuation")
+        else:
+            items.append(("set", CharSet(ch)))
+    if not source.endswith("*"):
+        items.append(("assert", "b"))
+    return ("cat", items)
+
+def compile_rule(source):
+    """Rule from !addfilter text, PatternError if it can't be used"""
+    source = source.strip()
+    if source.startswith("re:"):
+        # Run on the lower-cased message, so the pattern ignores case too
+        return Rule(source, "regex", node=parse(source[3:], ignore_case=True))
+    if source.startswith("="):
+        literal = canonical(source[1:])
+        kind = "whole"
+    elif ("*" in source or "?" in source) and source.strip("*?"):
+        return Rule(source, "wildcard", node=_wildcard(source))
+    else:
+        literal = canonical(source)
+        kind = "word"
+    if not literal:
+        raise PatternError("Nothing left to match once spacing and symbols are removed")
+    return Rule(source, kind, literal=literal)
+
+class RuleSet:
+    """All filter rules of a guild, compiled on first search after a change"""
+    def __init__(self, rules=()):
+        self.rules = {}  # {source: Rule}
+        self._literals = {}  # {canonical literal: [Rule]}
+        self._words = WordMatcher()
+        self._patterns = None  # {"canonical" / "raw": PatternMatcher}, None = stale
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add(self, rule):
+        if rule.source in self.rules:
+            return
+        self.rules[rule.source] = rule
+        if rule.literal is not None:
+            self._literals.setdefault(rule.literal, []).append(rule)
+            self._words.add(rule.literal)
+        else:
+            self._patterns = None
+
+    def _compile(self):
+        patterns = {"canonical": [], "raw": []}
+        for rule in self.rules.values():
+            if rule.node is not None:
+                patterns["raw" if rule.raw else "canonical"].append((rule, rule.node))
+        self._patterns = {name: PatternMatcher(nodes) for name, nodes in patterns.items()}
+
+    def search(self, text, raw):
+        """
+        [(start, end, Rule)] for every rule that hits. text is the canonical
+        form, raw the lower-cased message; positions are in raw for rules
+        with rule.raw, in text for the others.
+        """
+        hits = []
+        for start, end, literal in self._words.search(text):
+            for rule in self._literals[literal]:
+                if rule.kind == "whole" and (
+                    (start > 0 and is_word(text[start - 1])) or (end < len(text) and is_word(text[end]))
+                ):
+                    continue
+                hits.append((start, end, rule))
+
+        if self._patterns is None:
+            self._compile()
+        for name, subject in (("canonical", text), ("raw", raw)):
+            for rule, end in self._patterns[name].search(subject).items():
+                hits.append((*rule.span(subject, end), rule))
+        return hits
\ No newline at end of file
@@ -0,0 +1,215 @@
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+
+# ========== IMAGE RENDERING ==========
+# Rank and welcome cards are drawn with Pillow in worker processes, so a
+# render never holds the event loop (or the GIL) the gateway needs. Fonts,
+# backgrounds and guild templates are loaded once per worker and reused.
+# Workers are spawned, not forked: the bot has database threads running.
+# A spawned worker imports this module and re-imports the main script
+# (main.py, which only starts bot.py under __main__), so this module stays
+# free of config and bot imports and gets its paths via init_worker.
+
+CARD_SIZE = (934, 282)
+WELCOME_SIZE = (800, 300)
+AVATAR_SIZE = 200
+
+DEFAULT_TEMPLATE = {
+    "background": None,      # image file inside the template dir, None = plain color
+    "color": "#1a1a2e",
+    "accent": "#7f5af0",
+    "text": "#ffffff",
+    "muted": "#a7a9be",
+    "bar": "#2e2e48",
+}
+
+_fonts = {}
+_backgrounds = {}  # {(path, size): Image}
+_templates = {}    # {guild_id: (mtime, template)}
+_settings = {"font_path": None, "background": None, "template_dir": None}
+_mask = None
+
+def init_worker(font_path, background, template_dir):
+    """ProcessPoolExecutor initializer: remember the paths, preload what every card uses"""
+    _settings.update(font_path=font_path, background=background, template_dir=template_dir)
+    for size in (24, 30, 36, 40, 48):
+        _font(size)
+    _avatar_mask()
+
+def _font(size):
+    font = _fonts.get(size)
+    if font is None:
+        path = _settings["font_path"]
+        try:
+            if path and os.path.exists(path):
+                font = ImageFont.truetype(path, size)
+            else:
+                font = ImageFont.load_default(size=size)
+        except (OSError, TypeError):
+            font = ImageFont.load_default()
+        _fonts[size] = font
+    return font
+
+def _avatar_mask():
+    global _mask
+    if _mask is None:
+        _mask = Image.new("L", (AVATAR_SIZE, AVATAR_SIZE), 0)
+        ImageDraw.Draw(_mask).ellipse((0, 0, AVATAR_SIZE - 1, AVATAR_SIZE - 1), fill=255)
+    return _mask
+
+def _background(path, size):
+    key = (path, size)
+    image = _backgrounds.get(key)
+    if image is None:
+        image = Image.open(path).convert("RGB").resize(size)
+        _backgrounds[key] = image
+    return image
+
+def _template(guild_id):
+    """Guild template from <template_dir>/<guild_id>.json, reread only when the file changes"""
+    folder = _settings["template_dir"]
+    path = os.path.join(folder, f"{guild_id}.json") if folder and guild_id else None
+    try:
+        mtime = os.path.getmtime(path) if path else None
+    except OSError:
+        mtime = None
+    if mtime is None:
+        return DEFAULT_TEMPLATE
+
+    cached = _templates.get(guild_id)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path, encoding="utf-8") as f:
+            template = {**DEFAULT_TEMPLATE, **json.load(f)}
+    except (OSError, ValueError):
+        template = DEFAULT_TEMPLATE
+    _templates[guild_id] = (mtime, template)
+    return template
+
+def _canvas(template, size):
+    background = template["background"]
+    if background:
+        path = os.path.join(_settings["template_dir"] or "", background)
+        if os.path.exists(path):
+            return _background(path, size).copy()
+    elif _settings["background"] and os.path.exists(_settings["background"]):
+        return _background(_settings["background"], size).copy()
+    return Image.new("RGB", size, color=template["color"])
+
+def _png(image):
+    out = io.BytesIO()
+    image.save(out, format="PNG", compress_level=1)  # a few KB bigger, several times faster
+    return out.getvalue()
+
+def _fit(draw, text, size, width):
+    """Largest font size <= size that fits text into width pixels"""
+    while size > 16 and draw.textlength(text, font=_font(size)) > width:
+        size -= 4
+    return _font(size)
+
+def render_rank_card(card):
+    """
+    PNG bytes of a rank card. `card` is a plain dict (it crosses the process
+    boundary): guild_id, name, avatar (bytes or None), level, rank, total,
+    xp, level_xp (xp into the level) and level_span (xp the level takes).
+    """
+    template = _template(card.get("guild_id"))
+    image = _canvas(template, CARD_SIZE)
+    draw = ImageDraw.Draw(image)
+
+    # Avatar, round
+    top = (CARD_SIZE[1] - AVATAR_SIZE) // 2
+    if card.get("avatar"):
+        try:
+            avatar = Image.open(io.BytesIO(card["avatar"])).convert("RGB")
+            avatar = avatar.resize((AVATAR_SIZE, AVATAR_SIZE))
+            image.paste(avatar, (40, top), _avatar_mask())
+        except OSError:
+            draw.ellipse((40, top, 40 + AVATAR_SIZE, top + AVATAR_SIZE), fill=template["bar"])
+    else:
+        draw.ellipse((40, top, 40 + AVATAR_SIZE, top + AVATAR_SIZE), fill=template["bar"])
+
+    left = 40 + AVATAR_SIZE + 40
+    right = CARD_SIZE[0] - 40
+
+    # Name, rank and level
+    draw.text((left, 70), card["name"], fill=template["text"],
+              font=_fit(draw, card["name"], 40, right - left - 260), anchor="ls")
+    level_text = f"LEVEL {card['level']}"
+    draw.text((right, 70), level_text, fill=template["accent"], font=_font(36), anchor="rs")
+    if card.get("rank"):
+        rank_text = f"RANK #{card['rank']:,}"
+        offset = draw.textlength(level_text, font=_font(36)) + 30
+        draw.text((right - offset, 70), rank_text, fill=template["text"], font=_font(36), anchor="rs")
+
+    # Progress bar
+    span = max(1, card["level_span"])
+    done = max(0, min(card["level_xp"], span))
+    bar_top, bar_bottom = 150, 190
+    draw.rounded_rectangle((left, bar_top, right, bar_bottom), radius=20, fill=template["bar"])
+    filled = left + int((right - left) * done / span)
+    if filled - left >= 40:
+        draw.rounded_rectangle((left, bar_top, filled, bar_bottom), radius=20, fill=template["accent"])
+
+    draw.text((left, 235), f"{card['level_xp']:,} / {span:,} XP", fill=template["muted"],
+              font=_font(30), anchor="ls")
+    if card.get("total"):
+        draw.text((right, 235), f"{card['xp']:,} XP total · {card['total']:,} members",
+                  fill=template["muted"], font=_font(24), anchor="rs")
+    return _png(image)
+
+def render_welcome_card(card):
+    """PNG bytes of the join image: name, guild_name, member_count, guild_id"""
+    template = _template(card.get("guild_id"))
+    image = _canvas(template, WELCOME_SIZE)
+    draw = ImageDraw.Draw(image)
+    center = WELCOME_SIZE[0] // 2
+
+    draw.text((center, 100), f"Welcome {card['name']}!",
+              fill=(255, 255, 255), font=_font(40), anchor="mm")
+    draw.text((center, 160), f"to {card['guild_name']}",
+              fill=(200, 200, 255), font=_font(30), anchor="mm")
+    draw.text((center, 220), f"Member #{card['member_count']}",
+              fill=(170, 170, 255), font=_font(30), anchor="mm")
+    return _png(image)
+
+class ImageRenderer:
+    """
+    Runs the render_* functions in a process pool (workers=0 renders in a
+    thread instead, for small hosts). The pool starts on the first render.
+    """
+    def __init__(self, workers, font_path, background, template_dir):
+        self.workers = workers
+        self.init_args = (font_path, background, template_dir)
+        self._pool = None
+        self.renders = 0
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=self.init_args,
+            )
+        return self._pool
+
+    async def render(self, fn, card):
+        self.renders += 1
+        if self.workers <= 0:
+            if _settings["font_path"] is None:
+                init_worker(*self.init_args)
+            return await asyncio.to_thread(fn, card)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), fn, card)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
\ No newline at end of file
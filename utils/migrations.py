@@ -0,0 +1,476 @@
+import sqlite3
+import time
+
+# ========== SCHEMA MIGRATIONS ==========
+# The database schema lives here and nowhere else.
+# PRAGMA user_version holds the last applied step, so a current database
+# costs one pragma read at startup. Add new steps at the end, never edit old ones.
+
+MIGRATIONS = []  # [(version, description, fn(conn), vacuum)]
+
+def migration(version, description, vacuum=False):
+    """vacuum=True runs VACUUM after the run, for steps that free many pages"""
+    def decorator(fn):
+        MIGRATIONS.append((version, description, fn, vacuum))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return decorator
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+# ========== HELPERS ==========
+
+def table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+def _table_shape(conn, name):
+    """[(column, declared type)] and primary key columns in key order"""
+    info = conn.execute(f"PRAGMA table_info({name})").fetchall()
+    columns = [(row[1], row[2].upper()) for row in info]
+    pk = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5]]
+    return columns, pk
+
+def _expected_shape(create_sql, not_null=False):
+    scratch = sqlite3.connect(":memory:")
+    try:
+        scratch.execute(create_sql.format(name="expected"))
+        if not_null:
+            return {row[1] for row in scratch.execute("PRAGMA table_info(expected)") if row[3] or row[5]}
+        return _table_shape(scratch, "expected")
+    finally:
+        scratch.close()
+
+def _check_conversions(conn, name, create_sql, exprs, old_names):
+    """
+    Raise before copying if an exprs cast would lose data: a value that is
+    there but doesn't convert, or nothing at all for a NOT NULL column.
+    """
+    required = _expected_shape(create_sql, not_null=True)
+    problems = []
+    for column, expr in exprs.items():
+        if column not in old_names:
+            continue
+        lost = f"({expr}) IS NULL"
+        if column not in required:
+            lost += f" AND {column} IS NOT NULL AND {column} <> ''"
+        count = conn.execute(f"SELECT COUNT(*) FROM {name} WHERE {lost}").fetchone()[0]
+        if count:
+            samples = [repr(row[0]) for row in conn.execute(
+                f"SELECT DISTINCT {column} FROM {name} WHERE {lost} LIMIT 5"
+            )]
+            problems.append(f"{name}.{column}: {count} row(s), e.g. {', '.join(samples)}")
+    if problems:
+        raise RuntimeError(
+            "Can't convert these values, nothing was changed. Fix or delete the rows "
+            "(sqlite3 <database file>) and start again:\n  " + "\n  ".join(problems)
+        )
+
+def rebuild_table(conn, name, create_sql, exprs=None, defaults=None, check_types=False, keep_first=False):
+    """
+    Make table `name` match create_sql (written with a {name} placeholder).
+    Missing tables are created. Tables with other columns or keys are rebuilt
+    with one INSERT ... SELECT of the shared columns. exprs overrides the
+    SELECT expression of a column (casts), defaults fills columns the old
+    table doesn't have (e.g. a new key column).
+    Casts that would lose a value raise before anything is copied, and so
+    does a key collision, unless keep_first=True: then the first of the
+    rows sharing a key is kept and the number dropped is printed.
+    """
+    exprs = exprs or {}
+    defaults = defaults or {}
+    if not table_exists(conn, name):
+        conn.execute(create_sql.format(name=name))
+        return False
+
+    old_columns, old_pk = _table_shape(conn, name)
+    new_columns, new_pk = _expected_shape(create_sql)
+    if check_types:
+        same = old_columns == new_columns
+    else:
+        same = [c for c, _ in old_columns] == [c for c, _ in new_columns]
+    if same and old_pk == new_pk:
+        return False
+
+    old_names = {c for c, _ in old_columns}
+    _check_conversions(conn, name, create_sql, exprs, old_names)
+    targets, sources = [], []
+    for column, _ in new_columns:
+        if column in exprs:
+            targets.append(column)
+            sources.append(exprs[column])
+        elif column in old_names:
+            targets.append(column)
+            sources.append(column)
+        elif column in defaults:
+            targets.append(column)
+            sources.append(defaults[column])
+
+    temp_name = f"{name}__new"
+    conn.execute(f"DROP TABLE IF EXISTS {temp_name}")
+    conn.execute(create_sql.format(name=temp_name))
+    try:
+        copied = conn.execute(
+            f"INSERT {'OR IGNORE ' if keep_first else ''}INTO {temp_name} ({', '.join(targets)}) "
+            f"SELECT {', '.join(sources)} FROM {name}"
+        ).rowcount
+    except sqlite3.IntegrityError as e:
+        raise RuntimeError(f"Rows of {name} collide once converted, nothing was changed: {e}") from e
+    total = conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+    if copied < total:
+        print(f"⚠️ {name}: {total - copied} duplicate row(s) dropped, the first of each key was kept")
+    conn.execute(f"DROP TABLE {name}")
+    conn.execute(f"ALTER TABLE {temp_name} RENAME TO {name}")
+    return True
+
+# ========== STEPS ==========
+
+@migration(1, "baseline schema")
+def _baseline(conn):
+    # Older init scripts created these tables without guild_id, rows from
+    # those copies are kept under the 'default' guild like the old migrate_db did
+    legacy_guild = {"guild_id": "'default'"}
+    tables = {
+        "users": ('''CREATE TABLE {name} (
+            user_id TEXT,
+            guild_id TEXT,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            messages INTEGER DEFAULT 0,
+            last_message_time TIMESTAMP,
+            PRIMARY KEY (user_id, guild_id)
+        )''', None),
+
+        "level_roles": ('''CREATE TABLE {name} (
+            guild_id TEXT,
+            level INTEGER,
+            role_id TEXT,
+            PRIMARY KEY (guild_id, level)
+        )''', legacy_guild),
+
+        "filtered_words": ('''CREATE TABLE {name} (
+            guild_id TEXT,
+            word TEXT,
+            added_by TEXT,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (guild_id, word)
+        )''', legacy_guild),
+
+        "custom_commands": ('''CREATE TABLE {name} (
+            guild_id TEXT,
+            cmd_name TEXT,
+            response TEXT,
+            created_by TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (guild_id, cmd_name)
+        )''', legacy_guild),
+
+        "confession_setup": ('''CREATE TABLE {name} (
+            guild_id TEXT PRIMARY KEY,
+            confession_channel_id TEXT,
+            log_channel_id TEXT,
+            user_log_channel_id TEXT,
+            current_number INTEGER DEFAULT 0,
+            setup_message_id TEXT
+        )''', None),
+
+        "confession_messages": ('''CREATE TABLE {name} (
+            confession_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id TEXT,
+            user_id TEXT,
+            message TEXT,
+            confession_number INTEGER,
+            thread_id TEXT,
+            message_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            replies_count INTEGER DEFAULT 0,
+            is_reply INTEGER DEFAULT 0,
+            reply_to INTEGER
+        )''', None),
+
+        "welcome_config": ('''CREATE TABLE {name} (
+            guild_id TEXT PRIMARY KEY,
+            channel_id TEXT,
+            welcome_message TEXT DEFAULT 'Welcome {{member}} to {{server}}!',
+            goodbye_message TEXT DEFAULT 'Goodbye {{member}}!'
+        )''', None),
+
+        "scheduled_messages": ('''CREATE TABLE {name} (
+            schedule_id TEXT PRIMARY KEY,
+            guild_id TEXT,
+            channel_id TEXT,
+            hour INTEGER,
+            minute INTEGER,
+            message TEXT,
+            enabled INTEGER DEFAULT 1
+        )''', None),
+    }
+
+    # Tables from the oldest scripts had no key, so repeated rows are merged
+    for name, (create_sql, defaults) in tables.items():
+        rebuild_table(conn, name, create_sql, defaults=defaults, keep_first=True)
+
+    # Replaced by confession_setup, init_db used to drop it on every start
+    conn.execute("DROP TABLE IF EXISTS confession_config")
+
+@migration(2, "indexes for hot queries")
+def _hot_query_indexes(conn):
+    indexes = [
+        # !leaderboard: WHERE guild_id = ? ORDER BY xp DESC, covering
+        """CREATE INDEX IF NOT EXISTS idx_users_guild_xp
+           ON users (guild_id, xp DESC, user_id, level, messages)""",
+        # !confessstats today count: guild_id + created_at range
+        """CREATE INDEX IF NOT EXISTS idx_confessions_guild_created
+           ON confession_messages (guild_id, created_at)""",
+        # get_confession_info / reply counters: (guild_id, confession_number)
+        """CREATE INDEX IF NOT EXISTS idx_confessions_guild_number
+           ON confession_messages (guild_id, confession_number, message_id, thread_id)""",
+        # !confessstats replies count
+        """CREATE INDEX IF NOT EXISTS idx_confessions_guild_reply
+           ON confession_messages (guild_id, is_reply)""",
+        # scheduler: only enabled rows due this minute
+        """CREATE INDEX IF NOT EXISTS idx_scheduled_due
+           ON scheduled_messages (hour, minute) WHERE enabled = 1""",
+        # !listscheduled / !clearscheduled
+        """CREATE INDEX IF NOT EXISTS idx_scheduled_guild
+           ON scheduled_messages (guild_id)""",
+    ]
+    for sql in indexes:
+        conn.execute(sql)
+    conn.execute("ANALYZE")
+
+def _snowflake(column, legacy=None):
+    """
+    Expression that turns a TEXT id into INTEGER. 'default', and a missing
+    id for a NOT NULL key, become the legacy value when there is one;
+    anything else that isn't a number is NULL, which rebuild_table refuses.
+    """
+    legacy_case = ""
+    if legacy is not None:
+        legacy_case = f"WHEN {column} = 'default' OR {column} IS NULL OR {column} = '' THEN {legacy} "
+    return (f"CASE WHEN typeof({column}) = 'integer' THEN {column} "
+            f"WHEN {column} <> '' AND {column} NOT GLOB '*[^0-9]*' THEN CAST({column} AS INTEGER) "
+            f"{legacy_case}END")
+
+@migration(3, "snowflake ids as INTEGER", vacuum=True)
+def _integer_snowflakes(conn):
+    # Discord ids fit in 64 bits: 8 bytes per key instead of up to 20 of text,
+    # and integer compares on the users primary key. Rows kept under the
+    # legacy 'default' guild, or with no guild at all, move to guild 0. Ids
+    # that aren't numbers stop the step with a list of the rows to fix, so no
+    # row is dropped or emptied on the way.
+    # This rewrites every table and then VACUUMs, blocking, on the first
+    # start after the upgrade: back up first and expect it to take a while
+    # on big databases (python migrate.py runs it without starting the bot).
+    guild = {"guild_id": _snowflake("guild_id", legacy=0)}
+    tables = {
+        # WITHOUT ROWID: the table is the (guild_id, user_id) b-tree itself
+        "users": ('''CREATE TABLE {name} (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            messages INTEGER DEFAULT 0,
+            last_message_time TIMESTAMP,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID''', {**guild, "user_id": _snowflake("user_id")}),
+
+        "level_roles": ('''CREATE TABLE {name} (
+            guild_id INTEGER,
+            level INTEGER,
+            role_id INTEGER,
+            PRIMARY KEY (guild_id, level)
+        )''', {**guild, "role_id": _snowflake("role_id")}),
+
+        "filtered_words": ('''CREATE TABLE {name} (
+            guild_id INTEGER,
+            word TEXT,
+            added_by INTEGER,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (guild_id, word)
+        )''', {**guild, "added_by": _snowflake("added_by")}),
+
+        "custom_commands": ('''CREATE TABLE {name} (
+            guild_id INTEGER,
+            cmd_name TEXT,
+            response TEXT,
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (guild_id, cmd_name)
+        )''', {**guild, "created_by": _snowflake("created_by")}),
+
+        "confession_setup": ('''CREATE TABLE {name} (
+            guild_id INTEGER PRIMARY KEY,
+            confession_channel_id INTEGER,
+            log_channel_id INTEGER,
+            user_log_channel_id INTEGER,
+            current_number INTEGER DEFAULT 0,
+            setup_message_id INTEGER
+        )''', {
+            **guild,
+            "confession_channel_id": _snowflake("confession_channel_id"),
+            "log_channel_id": _snowflake("log_channel_id"),
+            "user_log_channel_id": _snowflake("user_log_channel_id"),
+            "setup_message_id": _snowflake("setup_message_id"),
+        }),
+
+        "confession_messages": ('''CREATE TABLE {name} (
+            confession_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            message TEXT,
+            confession_number INTEGER,
+            thread_id INTEGER,
+            message_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            replies_count INTEGER DEFAULT 0,
+            is_reply INTEGER DEFAULT 0,
+            reply_to INTEGER
+        )''', {
+            **guild,
+            "user_id": _snowflake("user_id"),
+            "thread_id": _snowflake("thread_id"),
+            "message_id": _snowflake("message_id"),
+        }),
+
+        "welcome_config": ('''CREATE TABLE {name} (
+            guild_id INTEGER PRIMARY KEY,
+            channel_id INTEGER,
+            welcome_message TEXT DEFAULT 'Welcome {{member}} to {{server}}!',
+            goodbye_message TEXT DEFAULT 'Goodbye {{member}}!'
+        )''', {**guild, "channel_id": _snowflake("channel_id")}),
+
+        # schedule_id stays TEXT, it's "<guild>_<channel>_<hhmm>" not a snowflake
+        "scheduled_messages": ('''CREATE TABLE {name} (
+            schedule_id TEXT PRIMARY KEY,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            hour INTEGER,
+            minute INTEGER,
+            message TEXT,
+            enabled INTEGER DEFAULT 1
+        )''', {**guild, "channel_id": _snowflake("channel_id")}),
+    }
+
+    for name, (create_sql, exprs) in tables.items():
+        rebuild_table(conn, name, create_sql, exprs=exprs, check_types=True)
+
+    # DROP TABLE took the step 2 indexes with it
+    _hot_query_indexes(conn)
+
+@migration(4, "per-guild XP curves")
+def _xp_curves(conn):
+    # Curve settings plus the precomputed level table of every guild that has
+    # one (utils/xp_curves.py). Guilds without a row keep the default formula.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS xp_curves (
+            guild_id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS xp_levels (
+            guild_id INTEGER NOT NULL,
+            level INTEGER NOT NULL,
+            xp INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, level)
+        ) WITHOUT ROWID
+    """)
+    # XP -> level: last row of the guild with xp <= ?, one index seek
+    conn.execute("""CREATE INDEX IF NOT EXISTS idx_xp_levels_guild_xp
+                    ON xp_levels (guild_id, xp, level)""")
+
+@migration(5, "message activity rollup")
+def _channel_activity(conn):
+    # Messages per channel per minute (minute = unix time of its first
+    # second), flushed in batches by utils/activity.py. The minute index
+    # serves "last 24 hours" totals across guilds (dashboard).
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS channel_activity (
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            minute INTEGER NOT NULL,
+            messages INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, channel_id, minute)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""CREATE INDEX IF NOT EXISTS idx_channel_activity_minute
+                    ON channel_activity (minute)""")
+
+@migration(6, "cache change log")
+def _cache_changes(conn):
+    # One row per (table, guild) whose rows changed, re-numbered on every
+    # change. AUTOINCREMENT keeps ids growing even when the newest row is
+    # the one replaced, so "id > last seen" never misses a change. Filled by
+    # triggers, so the dashboard and scripts are covered without knowing
+    # about it; utils/change_feed.py reads it when PRAGMA data_version moves.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            guild_id INTEGER NOT NULL,
+            UNIQUE (tbl, guild_id)
+        )
+    """)
+    for table in ("filtered_words", "custom_commands"):
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_change
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT OR REPLACE INTO cache_changes (tbl, guild_id)
+                    VALUES ('{table}', COALESCE({row}.guild_id, 0));
+                END
+            """)
+
+# ========== RUNNER ==========
+
+def migrate(conn, verbose=True):
+    """Bring the database to latest_version(), returns the version it ended on"""
+    version = get_version(conn)
+    latest = latest_version()
+    if version >= latest:
+        return version  # fast path, nothing to do
+
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # explicit BEGIN/COMMIT per step
+    try:
+        needs_vacuum = False
+        for step_version, description, fn, vacuum in MIGRATIONS:
+            if step_version <= version:
+                continue
+
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                fn(conn)
+                conn.execute(f"PRAGMA user_version = {int(step_version)}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            version = step_version
+            needs_vacuum = needs_vacuum or vacuum
+            if verbose:
+                took = (time.perf_counter() - started) * 1000
+                print(f"📦 Migration {step_version}: {description} ({took:.1f}ms)")
+
+        if needs_vacuum:
+            # Rebuilt tables leave their old pages on the freelist, give them back
+            started = time.perf_counter()
+            conn.execute("VACUUM")
+            if verbose:
+                took = (time.perf_counter() - started) * 1000
+                print(f"📦 VACUUM ({took:.1f}ms)")
+    finally:
+        conn.isolation_level = isolation_level
+
+    return version
\ No newline at end of file
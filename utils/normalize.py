@@ -0,0 +1,162 @@
+import re
+import unicodedata
+
+# ========== TEXT NORMALISATION ==========
+# Filter evasion tricks map back onto one canonical form: zero-width and
+# format characters are dropped, accents stripped, full-width and styled
+# letters (NFKD) folded to plain ones, lookalike Cyrillic/Greek letters
+# turned into Latin ones, case folded, and everything that isn't a letter or
+# digit becomes a space. Leetspeak digits and @/$ only count as letters inside
+# a word that has letters ("b4d", "$hit"); a plain number like "2024" stays a
+# number. Spaced-out words ("b a d", "b.a.d") are joined back together when
+# at least three single letters in a row are spelled out, never across a
+# digit or a maths operator, so "x = 5 + 3" or "o k" stay as they are.
+#
+# The per-character rules live in one translation table that fills itself
+# on first sight of a character, so a message is folded by str.translate in
+# a single C-speed pass plus a few regex passes. The map from canonical
+# positions back to the original text is only built when someone asks for
+# it (a filter hit), never for the clean messages that make up most traffic.
+
+# Letters that look like Latin ones, after case folding
+CONFUSABLES = {
+    # Cyrillic
+    "а": "a", "в": "b", "е": "e", "ё": "e", "з": "3", "и": "u", "і": "i", "ї": "i",
+    "й": "u", "к": "k", "м": "m", "н": "h", "о": "o", "п": "n", "р": "p", "с": "c",
+    "т": "t", "у": "y", "х": "x", "ѕ": "s", "ј": "j", "ԁ": "d", "ԛ": "q", "ԝ": "w",
+    "ь": "b", "ү": "y", "һ": "h",
+    # Greek
+    "α": "a", "β": "b", "γ": "y", "δ": "d", "ε": "e", "η": "n", "ι": "i", "κ": "k",
+    "ν": "v", "ο": "o", "ρ": "p", "σ": "o", "ς": "c", "τ": "t", "υ": "u", "χ": "x",
+    "ω": "w",
+    # Latin extras NFKD leaves alone
+    "ı": "i", "ł": "l", "ø": "o", "đ": "d", "ħ": "h", "ŧ": "t", "ɡ": "g", "ɑ": "a",
+    "ʀ": "r", "ʏ": "y", "ᴀ": "a", "ʙ": "b", "ᴄ": "c", "ᴅ": "d", "ᴇ": "e", "ɢ": "g",
+    "ʜ": "h", "ɪ": "i", "ᴊ": "j", "ᴋ": "k", "ʟ": "l", "ᴍ": "m", "ɴ": "n", "ᴏ": "o",
+    "ᴘ": "p", "ᴛ": "t", "ᴜ": "u", "ᴠ": "v", "ᴡ": "w", "ᴢ": "z",
+}
+
+LEETSPEAK = {
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "9": "g",
+    "@": "a", "$": "s",
+}
+
+# Maths operators, which keep single letters around them apart ("x = y")
+OPERATORS = set("=+*/<>^%×÷")
+# What an operator folds to until spaced-out letters are joined, then a space
+_BREAK = "\0"
+
+# Invisible characters that don't show up as format (Cf) characters
+INVISIBLE = {"͏", "ᅟ", "ᅠ", "឴", "឵", "ㅤ", "ﾠ"}
+
+def _fold(ch):
+    """Canonical replacement of one character: letters/digits, @/$, spaces or nothing"""
+    if ch in INVISIBLE or unicodedata.category(ch) in ("Cf", "Mn", "Me"):
+        return ""
+    if ch in OPERATORS:
+        return _BREAK
+    folded = []
+    for part in unicodedata.normalize("NFKD", ch).casefold():
+        if unicodedata.combining(part):
+            continue
+        part = CONFUSABLES.get(part, part)
+        folded.append(part if part.isalnum() or part in LEETSPEAK else " ")
+    return "".join(folded)
+
+class _FoldTable(dict):
+    """str.translate table, {code point: replacement} computed on first use"""
+    def __missing__(self, code):
+        value = self[code] = _fold(chr(code))
+        return value
+
+# ASCII up front, everything else on first sight
+_TABLE = _FoldTable((code, _fold(chr(code))) for code in range(128))
+
+_LEET_LETTERS = str.maketrans(LEETSPEAK)
+_LEET_NUMBER = str.maketrans({"@": " ", "$": " "})
+# A word with at least one leetspeak character in it
+_LEET_WORD = re.compile(r"(?<![\w@$])[\w@$]*[0-9@$][\w@$]*")
+
+def _leet(match):
+    word = match.group()
+    if any(ch.isalpha() for ch in word):
+        return word.translate(_LEET_LETTERS)
+    return word.translate(_LEET_NUMBER)
+
+_SPACE_RUN = re.compile(r" {2,}")
+# Three or more single letters separated by single spaces: "b a d", not "a bad" or "o k"
+_SPACED = re.compile(r"(?<![^ ])[^\W\d](?: [^\W\d](?![^ ])){2,}")
+
+def _join_spaced(match):
+    return match.group().replace(" ", "")
+
+def _collapse(text, keep):
+    """Drop the spaces of text that follow a kept space, in keep"""
+    previous = None
+    for i, ch in enumerate(text):
+        if not keep[i]:
+            continue
+        if ch == " " and previous == " ":
+            keep[i] = False
+        else:
+            previous = ch
+
+class NormalizedText:
+    """Canonical form of a message plus the way back to the original characters"""
+    __slots__ = ("original", "text", "_offsets")
+
+    def __init__(self, original):
+        self.original = original
+        folded = _LEET_WORD.sub(_leet, original.translate(_TABLE))
+        folded = _SPACED.sub(_join_spaced, _SPACE_RUN.sub(" ", folded))
+        self.text = _SPACE_RUN.sub(" ", folded.replace(_BREAK, " "))
+        self._offsets = None
+
+    @property
+    def offsets(self):
+        """offsets[i] = index in original of the character text[i] came from"""
+        if self._offsets is None:
+            self._offsets = self._build_offsets()
+        return self._offsets
+
+    def _build_offsets(self):
+        # Same steps as __init__, one character at a time, remembering where
+        # every output character came from
+        chars, offsets = [], []
+        for i, ch in enumerate(self.original):
+            for part in _TABLE[ord(ch)]:
+                chars.append(part)
+                offsets.append(i)
+        # Leetspeak swaps characters one for one
+        folded = _LEET_WORD.sub(_leet, "".join(chars))
+        keep = [True] * len(folded)
+        _collapse(folded, keep)
+        kept = [i for i in range(len(folded)) if keep[i]]
+        for match in _SPACED.finditer("".join(folded[i] for i in kept)):
+            for j in range(match.start(), match.end()):
+                if folded[kept[j]] == " ":
+                    keep[kept[j]] = False
+        folded = folded.replace(_BREAK, " ")
+        _collapse(folded, keep)
+        return [offset for offset, kept in zip(offsets, keep) if kept]
+
+    def span(self, start, end):
+        """(start, end) in the original text of text[start:end]"""
+        offsets = self.offsets
+        return offsets[start], offsets[end - 1] + 1
+
+    def excerpt(self, start, end):
+        start, end = self.span(start, end)
+        return self.original[start:end]
+
+def normalize(text):
+    return NormalizedText(text)
+
+def fold_word(word):
+    """Canonical form of one wildcard word, * and ? kept; it is a word, so leetspeak always applies"""
+    folded = "".join(ch if ch in "*?" else _TABLE[ord(ch)] for ch in word)
+    return folded.translate(_LEET_LETTERS).replace(_BREAK, " ")
+
+def canonical(text):
+    """Canonical form of a filter word (same rules as messages, trimmed)"""
+    return NormalizedText(text).text.strip()
\ No newline at end of file
@@ -0,0 +1,140 @@
+import time
+from functools import cached_property
+from utils.db_metrics import origin as db_origin
+from utils.normalize import normalize
+
+# ========== MESSAGE PIPELINE ==========
+# The bot's on_message builds one MessageContext and runs the registered
+# stages on it in order. A stage that deletes or otherwise consumes the
+# message calls ctx.stop(reason) and the later stages never see it, so a
+# filtered message earns no XP and doesn't count as spam. Everything the
+# stages used to work out on their own (lower case, prefix parsing, the
+# canonical form for the word filter) is computed once, on first use.
+
+# Stage order, lower runs first
+FILTER = 10
+ANTI_SPAM = 20
+LEVELING = 30
+CUSTOM_COMMANDS = 40
+COMMANDS = 50
+
+class MessageContext:
+    """One incoming message as the pipeline stages see it"""
+    def __init__(self, bot, message):
+        self.bot = bot
+        self.message = message
+        self.author = message.author
+        self.guild = message.guild
+        self.content = message.content
+        self.stopped = None  # name of the stage that consumed the message
+        self.reason = None
+
+    @cached_property
+    def lower(self):
+        return self.content.lower()
+
+    @cached_property
+    def normalized(self):
+        """NormalizedText of the content (utils/normalize.py)"""
+        return normalize(self.content)
+
+    @cached_property
+    def prefix(self):
+        """The command prefix the message starts with, None for chat"""
+        prefixes = self.bot.command_prefix
+        if isinstance(prefixes, str):
+            prefixes = (prefixes,)
+        return next((p for p in prefixes if self.content.startswith(p)), None)
+
+    @cached_property
+    def command(self):
+        """Lower-cased first word after the prefix, None if there is none"""
+        if self.prefix is None:
+            return None
+        words = self.content[len(self.prefix):].split(maxsplit=1)
+        return words[0].lower() if words else None
+
+    @property
+    def is_command(self):
+        """Prefix or slash command text, which earns no XP"""
+        return self.prefix is not None or self.content.startswith("/")
+
+    def stop(self, reason=None):
+        """Skip the remaining stages"""
+        self.stopped = True
+        self.reason = reason
+
+class Stage:
+    __slots__ = ("name", "order", "func", "guild_only", "calls", "total", "max", "stops", "errors")
+
+    def __init__(self, name, order, func, guild_only):
+        self.name = name
+        self.order = order
+        self.func = func
+        self.guild_only = guild_only
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.stops = 0
+        self.errors = 0
+
+class MessagePipeline:
+    """Ordered on_message stages with per-stage timing"""
+    def __init__(self):
+        self.stages = []
+        self.messages = 0
+
+    def register(self, name, func, order, guild_only=True):
+        """func(ctx) is awaited for every message, guild_only stages skip DMs"""
+        self.unregister(name)
+        self.stages.append(Stage(name, order, func, guild_only))
+        self.stages.sort(key=lambda stage: stage.order)
+
+    def unregister(self, name):
+        self.stages = [stage for stage in self.stages if stage.name != name]
+
+    async def run(self, ctx):
+        self.messages += 1
+        for stage in self.stages:
+            if stage.guild_only and ctx.guild is None:
+                continue
+            token = db_origin.set(f"pipeline:{stage.name}")
+            started = time.perf_counter()
+            try:
+                await stage.func(ctx)
+            except Exception as e:
+                stage.errors += 1
+                print(f"❌ Message stage {stage.name} failed: {e}")
+            finally:
+                elapsed = time.perf_counter() - started
+                db_origin.reset(token)
+            stage.calls += 1
+            stage.total += elapsed
+            stage.max = max(stage.max, elapsed)
+            if ctx.stopped:
+                ctx.stopped = stage.name
+                stage.stops += 1
+                break
+        return ctx
+
+    def stats(self):
+        """{stage: counters} in run order, times in ms"""
+        return {
+            stage.name: {
+                "calls": stage.calls,
+                "avg_ms": round(stage.total / stage.calls * 1000, 3) if stage.calls else 0.0,
+                "max_ms": round(stage.max * 1000, 2),
+                "total_ms": round(stage.total * 1000, 1),
+                "stops": stage.stops,
+                "errors": stage.errors,
+            }
+            for stage in self.stages
+        }
+
+    def reset(self):
+        self.messages = 0
+        for stage in self.stages:
+            stage.reset()
\ No newline at end of file
@@ -0,0 +1,609 @@
+# ========== QUERY CATALOG ==========
+# Every statement the bot runs, by name. The SQL strings are module constants,
+# so each one is prepared once per pooled connection and then served from
+# sqlite3's statement cache. Rows come back as small __slots__ records.
+# Statements on per-guild tables say which parameter is the guild id
+# (guild_param), that is what routes them to a shard when sharding is on.
+
+import re
+from utils.shards import SHARDED_TABLES
+
+CATALOG = {}
+
+_SHARDED_TABLE = re.compile(r"\b(" + "|".join(SHARDED_TABLES) + r")\b")
+
+class Query:
+    """Named SQL statement plus the record type its rows are built into"""
+    __slots__ = ("name", "sql", "record", "row_factory", "guild_param")
+
+    def __init__(self, name, sql, record=None, guild_param=None):
+        self.name = name
+        self.sql = sql
+        self.record = record
+        self.row_factory = (lambda _cursor, row: record(*row)) if record else None
+        self.guild_param = guild_param
+
+    def __repr__(self):
+        return f"<Query {self.name}>"
+
+def query(name, sql, record=None, guild_param=None):
+    if name in CATALOG:
+        raise ValueError(f"Duplicate query name: {name}")
+    if guild_param is None and _SHARDED_TABLE.search(sql):
+        raise ValueError(f"Query {name} uses a per-guild table, pass guild_param")
+    q = Query(name, sql, record, guild_param)
+    CATALOG[name] = q
+    return q
+
+# ========== RECORDS ==========
+
+class Record:
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+def scalar(value):
+    """Record type for single-column rows, the row is just its value"""
+    return value
+
+class UserLevel(Record):
+    __slots__ = ("xp", "level", "messages")
+
+    def __init__(self, xp, level, messages):
+        self.xp = xp
+        self.level = level
+        self.messages = messages
+
+class XPAward(Record):
+    """Totals after an XP award"""
+    __slots__ = ("xp", "level")
+
+    def __init__(self, xp, level):
+        self.xp = xp
+        self.level = level
+
+class LeaderboardRow(Record):
+    __slots__ = ("user_id", "xp", "level", "messages")
+
+    def __init__(self, user_id, xp, level, messages):
+        self.user_id = user_id
+        self.xp = xp
+        self.level = level
+        self.messages = messages
+
+class LevelRole(Record):
+    __slots__ = ("level", "role_id")
+
+    def __init__(self, level, role_id):
+        self.level = level
+        self.role_id = role_id
+
+class GuildSetup(Record):
+    """Confession configuration of one guild"""
+    __slots__ = ("confession_channel_id", "log_channel_id", "user_log_channel_id", "current_number")
+
+    def __init__(self, confession_channel_id, log_channel_id, user_log_channel_id, current_number):
+        self.confession_channel_id = confession_channel_id
+        self.log_channel_id = log_channel_id
+        self.user_log_channel_id = user_log_channel_id
+        self.current_number = current_number
+
+class ConfessionRecord(Record):
+    __slots__ = ("user_id", "message", "created_at", "is_reply", "reply_to")
+
+    def __init__(self, user_id, message, created_at, is_reply, reply_to):
+        self.user_id = user_id
+        self.message = message
+        self.created_at = created_at
+        self.is_reply = is_reply
+        self.reply_to = reply_to
+
+class ConfessionLink(Record):
+    """Where a confession was posted"""
+    __slots__ = ("message_id", "thread_id")
+
+    def __init__(self, message_id, thread_id):
+        self.message_id = message_id
+        self.thread_id = thread_id
+
+class CustomCommandRow(Record):
+    __slots__ = ("cmd_name", "response")
+
+    def __init__(self, cmd_name, response):
+        self.cmd_name = cmd_name
+        self.response = response
+
+class ScheduledMessage(Record):
+    __slots__ = ("guild_id", "channel_id", "hour", "minute", "message")
+
+    def __init__(self, guild_id, channel_id, hour, minute, message):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.hour = hour
+        self.minute = minute
+        self.message = message
+
+# ========== LEVELING ==========
+
+USER_LEVEL = query(
+    "user_level",
+    "SELECT xp, level, messages FROM users WHERE user_id = ? AND guild_id = ?",
+    UserLevel,
+    guild_param=1
+)
+
+# xp is a delta, level is the absolute value computed in memory
+FLUSH_XP = query(
+    "flush_xp",
+    """INSERT INTO users (user_id, guild_id, xp, level)
+       VALUES (?, ?, ?, ?)
+       ON CONFLICT (guild_id, user_id) DO UPDATE SET
+           xp = xp + excluded.xp,
+           level = excluded.level""",
+    guild_param=1
+)
+
+# One atomic statement per message: create or bump the row, recompute the
+# level from the guild's xp_levels table (default formula when it has none)
+# and hand back the totals. Params: (guild_id, user_id, xp)
+AWARD_XP = query(
+    "award_xp",
+    """INSERT INTO users (guild_id, user_id, xp, level, messages)
+       VALUES (?1, ?2, ?3, COALESCE(
+           (SELECT l.level FROM xp_levels AS l
+            WHERE l.guild_id = ?1 AND l.xp <= ?3
+            ORDER BY l.xp DESC LIMIT 1),
+           MAX(1, ?3 / 1000 + 1)), 0)
+       ON CONFLICT (guild_id, user_id) DO UPDATE SET
+           xp = users.xp + excluded.xp,
+           level = COALESCE(
+               (SELECT l.level FROM xp_levels AS l
+                WHERE l.guild_id = ?1 AND l.xp <= users.xp + excluded.xp
+                ORDER BY l.xp DESC LIMIT 1),
+               MAX(1, (users.xp + excluded.xp) / 1000 + 1))
+       RETURNING xp, level""",
+    XPAward,
+    guild_param=0
+)
+
+# ========== MESSAGE ACTIVITY ==========
+# Written by utils/activity.py in batches. users.messages counts every
+# message (the XP paths above leave it alone), channel_activity keeps
+# per-minute counts per channel. Params are (guild_id, ...) deltas.
+
+ADD_USER_MESSAGES = query(
+    "add_user_messages",
+    """INSERT INTO users (guild_id, user_id, xp, level, messages)
+       VALUES (?, ?, 0, 1, ?)
+       ON CONFLICT (guild_id, user_id) DO UPDATE SET
+           messages = messages + excluded.messages""",
+    guild_param=0
+)
+
+ADD_CHANNEL_ACTIVITY = query(
+    "add_channel_activity",
+    """INSERT INTO channel_activity (guild_id, channel_id, minute, messages)
+       VALUES (?, ?, ?, ?)
+       ON CONFLICT (guild_id, channel_id, minute) DO UPDATE SET
+           messages = messages + excluded.messages""",
+    guild_param=0
+)
+
+# Params: (guild_id, oldest minute kept)
+PRUNE_CHANNEL_ACTIVITY = query(
+    "prune_channel_activity",
+    "DELETE FROM channel_activity WHERE guild_id = ? AND minute < ?",
+    guild_param=0
+)
+
+# ========== XP CURVES ==========
+
+class CurveRow(Record):
+    __slots__ = ("kind", "params")
+
+    def __init__(self, kind, params):
+        self.kind = kind
+        self.params = params
+
+XP_CURVE = query(
+    "xp_curve",
+    "SELECT kind, params FROM xp_curves WHERE guild_id = ?",
+    CurveRow,
+    guild_param=0
+)
+
+SET_XP_CURVE = query(
+    "set_xp_curve",
+    """INSERT INTO xp_curves (guild_id, kind, params, updated_at)
+       VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+       ON CONFLICT (guild_id) DO UPDATE SET
+           kind = excluded.kind,
+           params = excluded.params,
+           updated_at = excluded.updated_at""",
+    guild_param=0
+)
+
+DELETE_XP_CURVE = query(
+    "delete_xp_curve",
+    "DELETE FROM xp_curves WHERE guild_id = ?",
+    guild_param=0
+)
+
+DELETE_XP_LEVELS = query(
+    "delete_xp_levels",
+    "DELETE FROM xp_levels WHERE guild_id = ?",
+    guild_param=0
+)
+
+# Params: (guild_id, level, xp), executemany with XPCurve.rows()
+INSERT_XP_LEVEL = query(
+    "insert_xp_level",
+    "INSERT INTO xp_levels (guild_id, level, xp) VALUES (?, ?, ?)",
+    guild_param=0
+)
+
+# Every level of a guild in one statement: a seek into xp_levels per user,
+# only rows whose level changes are written. Same fallback as AWARD_XP.
+RECALC_LEVELS = query(
+    "recalc_levels",
+    """UPDATE users SET level = fresh.level
+       FROM (
+           SELECT u.user_id, COALESCE(
+               (SELECT l.level FROM xp_levels AS l
+                WHERE l.guild_id = u.guild_id AND l.xp <= u.xp
+                ORDER BY l.xp DESC LIMIT 1),
+               MAX(1, u.xp / 1000 + 1)) AS level
+           FROM users AS u
+           WHERE u.guild_id = ?1
+       ) AS fresh
+       WHERE users.guild_id = ?1
+         AND users.user_id = fresh.user_id
+         AND users.level IS NOT fresh.level""",
+    guild_param=0
+)
+
+# Every ranked member of a guild, in leaderboard order (utils/ranking.py snapshot)
+GUILD_RANKING = query(
+    "guild_ranking",
+    """SELECT user_id, xp, level, messages
+       FROM users
+       WHERE guild_id = ?
+       ORDER BY xp DESC, user_id""",
+    LeaderboardRow,
+    guild_param=0
+)
+
+# Leaderboard pages, keyset pagination over (xp DESC, user_id): each page
+# starts from the last key shown instead of an OFFSET, so going deep costs
+# the same as page one. "xp <= ?" is the index range, the OR only sorts out
+# ties on that one XP value. Params: (guild_id, xp, user_id, limit)
+LEADERBOARD_FIRST = query(
+    "leaderboard_first",
+    """SELECT user_id, xp, level, messages
+       FROM users
+       WHERE guild_id = ?
+       ORDER BY xp DESC, user_id
+       LIMIT ?""",
+    LeaderboardRow,
+    guild_param=0
+)
+
+LEADERBOARD_AFTER = query(
+    "leaderboard_after",
+    """SELECT user_id, xp, level, messages
+       FROM users
+       WHERE guild_id = ?1 AND xp <= ?2 AND (xp < ?2 OR user_id > ?3)
+       ORDER BY xp DESC, user_id
+       LIMIT ?4""",
+    LeaderboardRow,
+    guild_param=0
+)
+
+# Same as LEADERBOARD_AFTER but the key's own row is included (jump to a member)
+LEADERBOARD_FROM = query(
+    "leaderboard_from",
+    """SELECT user_id, xp, level, messages
+       FROM users
+       WHERE guild_id = ?1 AND xp <= ?2 AND (xp < ?2 OR user_id >= ?3)
+       ORDER BY xp DESC, user_id
+       LIMIT ?4""",
+    LeaderboardRow,
+    guild_param=0
+)
+
+# Rows right above a key, nearest first (walks the index backwards)
+LEADERBOARD_BEFORE = query(
+    "leaderboard_before",
+    """SELECT user_id, xp, level, messages
+       FROM users
+       WHERE guild_id = ?1 AND xp >= ?2 AND (xp > ?2 OR user_id < ?3)
+       ORDER BY xp ASC, user_id DESC
+       LIMIT ?4""",
+    LeaderboardRow,
+    guild_param=0
+)
+
+LEVEL_ROLES = query(
+    "level_roles",
+    "SELECT level, role_id FROM level_roles WHERE guild_id = ? ORDER BY level",
+    LevelRole,
+    guild_param=0
+)
+
+SET_LEVEL_ROLE = query(
+    "set_level_role",
+    """INSERT OR REPLACE INTO level_roles (guild_id, level, role_id)
+       VALUES (?, ?, ?)""",
+    guild_param=0
+)
+
+# ========== BULK XP ==========
+# Bulk grants, removals, resets and CSV imports stage their (user_id, xp,
+# messages) rows in a temp table on the transaction's connection, then
+# change every user with one set-based statement and fix the levels with
+# RECALC_LEVELS. Temp tables are per connection and never shared.
+
+BULK_XP_TABLE = query(
+    "bulk_xp_table",
+    """CREATE TEMP TABLE IF NOT EXISTS bulk_xp (
+           user_id INTEGER PRIMARY KEY,
+           xp INTEGER NOT NULL DEFAULT 0,
+           messages INTEGER
+       )"""
+)
+
+BULK_XP_CLEAR = query(
+    "bulk_xp_clear",
+    "DELETE FROM temp.bulk_xp"
+)
+
+# Params: (user_id, xp, messages), executemany in chunks
+BULK_XP_STAGE = query(
+    "bulk_xp_stage",
+    "INSERT OR REPLACE INTO temp.bulk_xp (user_id, xp, messages) VALUES (?, ?, ?)"
+)
+
+# Staged xp/messages are added (grant, import --add), new users get a row.
+# "WHERE true" keeps the parser from reading ON CONFLICT as a join clause.
+BULK_XP_ADD = query(
+    "bulk_xp_add",
+    """INSERT INTO users (guild_id, user_id, xp, level, messages)
+       SELECT ?1, user_id, MAX(0, xp), 1, COALESCE(messages, 0) FROM temp.bulk_xp WHERE true
+       ON CONFLICT (guild_id, user_id) DO UPDATE SET
+           xp = MAX(0, users.xp + excluded.xp),
+           messages = users.messages + excluded.messages""",
+    guild_param=0
+)
+
+# Staged values replace the stored ones (import). A row staged without
+# messages (NULL) keeps the stored count, excluded.messages is already 0 then
+BULK_XP_SET = query(
+    "bulk_xp_set",
+    """INSERT INTO users (guild_id, user_id, xp, level, messages)
+       SELECT ?1, user_id, MAX(0, xp), 1, COALESCE(messages, 0) FROM temp.bulk_xp WHERE true
+       ON CONFLICT (guild_id, user_id) DO UPDATE SET
+           xp = excluded.xp,
+           messages = COALESCE(
+               (SELECT messages FROM temp.bulk_xp WHERE bulk_xp.user_id = excluded.user_id),
+               users.messages
+           )""",
+    guild_param=0
+)
+
+# Removal never creates rows and never goes below 0 XP
+BULK_XP_SUBTRACT = query(
+    "bulk_xp_subtract",
+    """UPDATE users SET xp = MAX(0, users.xp - bulk_xp.xp)
+       FROM temp.bulk_xp
+       WHERE users.guild_id = ?1 AND users.user_id = bulk_xp.user_id""",
+    guild_param=0
+)
+
+BULK_XP_RESET = query(
+    "bulk_xp_reset",
+    "DELETE FROM users WHERE guild_id = ?1 AND user_id IN (SELECT user_id FROM temp.bulk_xp)",
+    guild_param=0
+)
+
+GUILD_XP_RESET = query(
+    "guild_xp_reset",
+    "DELETE FROM users WHERE guild_id = ?",
+    guild_param=0
+)
+
+# ========== FILTERING ==========
+
+FILTERED_WORDS = query(
+    "filtered_words",
+    "SELECT word FROM filtered_words WHERE guild_id = ?",
+    scalar,
+    guild_param=0
+)
+
+ADD_FILTERED_WORD = query(
+    "add_filtered_word",
+    "INSERT OR IGNORE INTO filtered_words (guild_id, word, added_by) VALUES (?, ?, ?)",
+    guild_param=0
+)
+
+REMOVE_FILTERED_WORD = query(
+    "remove_filtered_word",
+    "DELETE FROM filtered_words WHERE guild_id = ? AND word = ?",
+    guild_param=0
+)
+
+CLEAR_FILTERED_WORDS = query(
+    "clear_filtered_words",
+    "DELETE FROM filtered_words WHERE guild_id = ?",
+    guild_param=0
+)
+
+# ========== WELCOME ==========
+
+WELCOME_CHANNEL = query(
+    "welcome_channel",
+    "SELECT channel_id FROM welcome_config WHERE guild_id = ?",
+    scalar
+)
+
+SET_WELCOME_CHANNEL = query(
+    "set_welcome_channel",
+    """INSERT OR REPLACE INTO welcome_config (guild_id, channel_id)
+       VALUES (?, ?)"""
+)
+
+# ========== CONFESSION ==========
+
+CONFESSION_SETUP = query(
+    "confession_setup",
+    """SELECT confession_channel_id, log_channel_id, user_log_channel_id, current_number
+       FROM confession_setup WHERE guild_id = ?""",
+    GuildSetup,
+    guild_param=0
+)
+
+SAVE_CONFESSION_SETUP = query(
+    "save_confession_setup",
+    """INSERT OR REPLACE INTO confession_setup
+       (guild_id, confession_channel_id, current_number, setup_message_id)
+       VALUES (?, ?, 0, ?)""",
+    guild_param=0
+)
+
+# One statement, so two confessions sent at once can't get the same number
+NEXT_CONFESSION_NUMBER = query(
+    "next_confession_number",
+    """UPDATE confession_setup SET current_number = current_number + 1
+       WHERE guild_id = ?
+       RETURNING current_number""",
+    scalar,
+    guild_param=0
+)
+
+SET_CONFESSION_LOG_CHANNEL = query(
+    "set_confession_log_channel",
+    "UPDATE confession_setup SET log_channel_id = ? WHERE guild_id = ?",
+    guild_param=1
+)
+
+SET_CONFESSION_USER_LOG_CHANNEL = query(
+    "set_confession_user_log_channel",
+    "UPDATE confession_setup SET user_log_channel_id = ? WHERE guild_id = ?",
+    guild_param=1
+)
+
+SAVE_CONFESSION = query(
+    "save_confession",
+    """INSERT INTO confession_messages
+       (guild_id, user_id, message, confession_number, thread_id, message_id, is_reply, reply_to)
+       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+    guild_param=0
+)
+
+CONFESSION_LINK = query(
+    "confession_link",
+    "SELECT message_id, thread_id FROM confession_messages WHERE guild_id = ? AND confession_number = ?",
+    ConfessionLink,
+    guild_param=0
+)
+
+CONFESSION_INFO = query(
+    "confession_info",
+    """SELECT user_id, message, created_at, is_reply, reply_to
+       FROM confession_messages
+       WHERE guild_id = ? AND confession_number = ?""",
+    ConfessionRecord,
+    guild_param=0
+)
+
+SET_CONFESSION_THREAD = query(
+    "set_confession_thread",
+    "UPDATE confession_messages SET thread_id = ? WHERE guild_id = ? AND confession_number = ?",
+    guild_param=1
+)
+
+INCREMENT_CONFESSION_REPLIES = query(
+    "increment_confession_replies",
+    """UPDATE confession_messages
+       SET replies_count = replies_count + 1
+       WHERE guild_id = ? AND confession_number = ?""",
+    guild_param=0
+)
+
+COUNT_CONFESSIONS = query(
+    "count_confessions",
+    "SELECT COUNT(*) FROM confession_messages WHERE guild_id = ?",
+    scalar,
+    guild_param=0
+)
+
+# Range on created_at instead of date(created_at) so the index can be used
+COUNT_CONFESSIONS_BETWEEN = query(
+    "count_confessions_between",
+    """SELECT COUNT(*) FROM confession_messages
+       WHERE guild_id = ? AND created_at >= ? AND created_at < ?""",
+    scalar,
+    guild_param=0
+)
+
+COUNT_CONFESSION_REPLIES = query(
+    "count_confession_replies",
+    "SELECT COUNT(*) FROM confession_messages WHERE guild_id = ? AND is_reply = 1",
+    scalar,
+    guild_param=0
+)
+
+# ========== CUSTOM COMMANDS ==========
+
+CUSTOM_COMMANDS = query(
+    "custom_commands",
+    "SELECT cmd_name, response FROM custom_commands WHERE guild_id = ?",
+    CustomCommandRow,
+    guild_param=0
+)
+
+SAVE_CUSTOM_COMMAND = query(
+    "save_custom_command",
+    """INSERT OR REPLACE INTO custom_commands
+       (guild_id, cmd_name, response, created_by)
+       VALUES (?, ?, ?, ?)""",
+    guild_param=0
+)
+
+DELETE_CUSTOM_COMMAND = query(
+    "delete_custom_command",
+    "DELETE FROM custom_commands WHERE guild_id = ? AND cmd_name = ?",
+    guild_param=0
+)
+
+SAVE_SCHEDULED_MESSAGE = query(
+    "save_scheduled_message",
+    """INSERT OR REPLACE INTO scheduled_messages
+       (schedule_id, guild_id, channel_id, hour, minute, message)
+       VALUES (?, ?, ?, ?, ?, ?)"""
+)
+
+DUE_SCHEDULED_MESSAGES = query(
+    "due_scheduled_messages",
+    """SELECT guild_id, channel_id, hour, minute, message FROM scheduled_messages
+       WHERE enabled = 1 AND hour = ? AND minute = ?""",
+    ScheduledMessage
+)
+
+GUILD_SCHEDULED_MESSAGES = query(
+    "guild_scheduled_messages",
+    "SELECT guild_id, channel_id, hour, minute, message FROM scheduled_messages WHERE guild_id = ?",
+    ScheduledMessage
+)
+
+CLEAR_SCHEDULED_MESSAGES = query(
+    "clear_scheduled_messages",
+    "DELETE FROM scheduled_messages WHERE guild_id = ?"
+)
\ No newline at end of file
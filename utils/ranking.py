@@ -0,0 +1,96 @@
+import asyncio
+import time
+from bisect import bisect_left, insort
+from utils.cache import LRUCache
+from utils.queries import LeaderboardRow
+
+# ========== XP RANKINGS ==========
+# One sorted array per guild, ordered like the leaderboard (XP high to low,
+# ties by user id). Built once from the database, then kept current by the XP
+# write path: rank, top-N and neighbours are bisect lookups instead of
+# COUNT(*) scans. Edits made outside the bot (dashboard, scripts) show up
+# once the snapshot is older than refresh_seconds and gets rebuilt.
+
+class GuildRanking:
+    """Sorted (-xp, user_id) keys plus the row of every ranked member"""
+    def __init__(self, rows):
+        self._rows = {row.user_id: row for row in rows}
+        self._keys = sorted((-row.xp, row.user_id) for row in self._rows.values())
+        self.built = time.monotonic()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def get(self, user_id):
+        return self._rows.get(user_id)
+
+    def set(self, user_id, xp, level, messages):
+        """Insert or move a member, O(log n) search plus one list shift"""
+        row = self._rows.get(user_id)
+        if row is None:
+            self._rows[user_id] = LeaderboardRow(user_id, xp, level, messages)
+            insort(self._keys, (-xp, user_id))
+            return
+        if row.xp != xp:
+            del self._keys[bisect_left(self._keys, (-row.xp, user_id))]
+            insort(self._keys, (-xp, user_id))
+        row.xp = xp
+        row.level = level
+        row.messages = messages
+
+    def remove(self, user_id):
+        row = self._rows.pop(user_id, None)
+        if row is not None:
+            del self._keys[bisect_left(self._keys, (-row.xp, user_id))]
+
+    def rank(self, user_id):
+        """1-based position, None for members without XP"""
+        row = self._rows.get(user_id)
+        if row is None:
+            return None
+        return bisect_left(self._keys, (-row.xp, user_id)) + 1
+
+    def page(self, offset=0, limit=10):
+        return [self._rows[user_id] for _, user_id in self._keys[offset:offset + limit]]
+
+    def around(self, user_id, radius=2):
+        """(first rank, rows) for the members right above and below user_id"""
+        rank = self.rank(user_id)
+        if rank is None:
+            return None, []
+        start = max(0, rank - 1 - radius)
+        return start + 1, self.page(start, radius * 2 + 1)
+
+class Rankings:
+    """Per-guild GuildRanking snapshots, the least used guilds are dropped"""
+    def __init__(self, max_guilds=100, refresh_seconds=600):
+        self.refresh_seconds = refresh_seconds
+        self._guilds = LRUCache("rankings", max_guilds)
+        self._loading = {}  # {guild_id: asyncio.Lock} while a snapshot is built
+
+    def loaded(self, guild_id):
+        """Snapshot if it is in memory, never loads (for the write path)"""
+        return self._guilds.peek(guild_id)
+
+    async def get(self, guild_id, loader):
+        """Snapshot of a guild, built with `await loader(guild_id)` rows if needed"""
+        ranking = self._guilds.get(guild_id)
+        if ranking is not None and time.monotonic() - ranking.built < self.refresh_seconds:
+            return ranking
+
+        lock = self._loading.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            ranking = self._guilds.peek(guild_id)
+            if ranking is None or time.monotonic() - ranking.built >= self.refresh_seconds:
+                ranking = GuildRanking(await loader(guild_id))
+                self._guilds.put(guild_id, ranking)
+        if not lock.locked():
+            self._loading.pop(guild_id, None)
+        return ranking
+
+    def invalidate(self, guild_id=None):
+        """Drop one guild's snapshot (or all of them) after a bulk XP change"""
+        if guild_id is None:
+            self._guilds.clear()
+        else:
+            self._guilds.pop(guild_id)
\ No newline at end of file
@@ -0,0 +1,479 @@
+# ========== LINEAR-TIME PATTERNS ==========
+# A small regex dialect for filter rules, run without backtracking: patterns
+# become one Thompson NFA (every rule of a guild in the same automaton) that
+# is walked as a DFA built lazily, one cached transition per (state, char).
+# Time is linear in the message length whatever the patterns are, so a bad
+# rule can't stall the event loop. On top of that, patterns that would blow
+# up a backtracking engine - (a+)+, (a*)*, (a|b?)+ - are refused when a rule
+# is added, as are patterns that match the empty string (they'd hit every
+# message) and ones that expand to too many states.
+#
+# Supported: literals, . [abc] [a-z] [^...] \w \d \s \W \D \S, escaped
+# punctuation, (...) (?:...) |, * + ? {m} {m,} {m,n}, and the assertions
+# ^ $ \b \B. Not supported: backreferences, lookaround, flags.
+# With ignore_case (the default) a pattern runs against lower-cased text:
+# literals are lower-cased when parsed and a range also takes the upper
+# case form of a character, so FREE and [A-Z] match "free".
+# The forward pass only finds where a match ends; match_span() finds where
+# it begins by running the reversed pattern backwards from that end, then
+# how far it runs, both linear too and only done for hits.
+
+MAX_STATES = 500        # NFA states one pattern may expand to
+MAX_REPEAT = 100        # largest {m,n} bound
+MAX_DFA_STATES = 2000   # cached DFA states before the cache starts over
+
+class PatternError(ValueError):
+    """Pattern outside the supported dialect or unsafe to run"""
+
+def is_word(ch):
+    return ch.isalnum() or ch == "_"
+
+def _kind(ch):
+    """What assertions care about: word char, other char, or None at the edges"""
+    if ch is None:
+        return None
+    return "w" if is_word(ch) else "s"
+
+# ---------- Character sets ----------
+
+class CharSet:
+    __slots__ = ("chars", "ranges", "classes", "negate", "ignore_case")
+
+    def __init__(self, chars=(), ranges=(), classes=(), negate=False, ignore_case=False):
+        self.chars = frozenset(chars)
+        self.ranges = tuple(ranges)  # as written, [A-Z] stays ("A", "Z")
+        self.classes = tuple(classes)  # "w", "d", "s" and upper case negations
+        self.negate = negate
+        self.ignore_case = ignore_case  # ranges also take ch.upper()
+
+    def _in_ranges(self, ch):
+        if any(lo <= ch <= hi for lo, hi in self.ranges):
+            return True
+        if self.ignore_case:
+            upper = ch.upper()
+            return upper != ch and any(lo <= upper <= hi for lo, hi in self.ranges)
+        return False
+
+    def __contains__(self, ch):
+        found = (
+            ch in self.chars
+            or (self.ranges and self._in_ranges(ch))
+            or any(_CLASS_TESTS[cls](ch) for cls in self.classes)
+        )
+        return found != self.negate
+
+_CLASS_TESTS = {
+    "w": is_word, "W": lambda ch: not is_word(ch),
+    "d": str.isdigit, "D": lambda ch: not ch.isdigit(),
+    "s": str.isspace, "S": lambda ch: not ch.isspace(),
+}
+ANY = CharSet(negate=True)
+
+# ---------- Parser ----------
+# Nodes are tuples: ("set", CharSet) ("cat", [nodes]) ("alt", [nodes])
+# ("rep", node, min, max or None) ("assert", kind) ("empty",)
+
+class _Parser:
+    def __init__(self, pattern, ignore_case):
+        self.pattern = pattern
+        self.ignore_case = ignore_case
+        self.pos = 0
+
+    def fold(self, ch):
+        """A literal character as it looks in the matched text"""
+        return ch.lower() if self.ignore_case else ch
+
+    def error(self, message):
+        raise PatternError(f"{message} (at position {self.pos} of {self.pattern!r})")
+
+    def peek(self):
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def take(self):
+        ch = self.peek()
+        self.pos += 1
+        return ch
+
+    def parse(self):
+        node = self.alternation()
+        if self.peek() is not None:
+            self.error("Unbalanced )")
+        return node
+
+    def alternation(self):
+        branches = [self.concat()]
+        while self.peek() == "|":
+            self.take()
+            branches.append(self.concat())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def concat(self):
+        items = []
+        while self.peek() not in (None, "|", ")"):
+            items.append(self.repeat())
+        if not items:
+            return ("empty",)
+        return items[0] if len(items) == 1 else ("cat", items)
+
+    def repeat(self):
+        node = self.atom()
+        ch = self.peek()
+        if ch in ("*", "+", "?"):
+            self.take()
+            low, high = {"*": (0, None), "+": (1, None), "?": (0, 1)}[ch]
+        elif ch == "{" and self._bounds_ahead():
+            low, high = self.bounds()
+        else:
+            return node
+        if self.peek() == "?":
+            self.take()  # lazy makes no difference when only the hit matters
+        if self.peek() in ("*", "+", "?", "{"):
+            self.error("Stacked quantifiers")
+        if node[0] == "assert":
+            self.error("Quantifier on an assertion")
+        if (high is None or high > 1) and (_unbounded(node) or _nullable(node)):
+            self.error("Nested repetition like (a+)+ or (a*)* is not allowed")
+        return ("rep", node, low, high)
+
+    def _bounds_ahead(self):
+        end = self.pattern.find("}", self.pos)
+        inner = self.pattern[self.pos + 1:end] if end != -1 else ""
+        return bool(inner) and all(ch.isdigit() or ch == "," for ch in inner) and inner.count(",") <= 1
+
+    def bounds(self):
+        self.take()
+        inner = self.pattern[self.pos:self.pattern.index("}", self.pos)]
+        self.pos += len(inner) + 1
+        low, _, high = inner.partition(",")
+        if not low:
+            self.error("Repeat needs a lower bound")
+        low = int(low)
+        high = low if "," not in inner else (int(high) if high else None)
+        if high is not None and high < low:
+            self.error("Repeat bounds are reversed")
+        if max(low, high or 0) > MAX_REPEAT:
+            self.error(f"Repeat bounds go up to {MAX_REPEAT}")
+        return low, high
+
+    def atom(self):
+        ch = self.take()
+        if ch == "(":
+            if self.pattern.startswith("?:", self.pos):
+                self.pos += 2
+            elif self.peek() == "?":
+                self.error("Lookaround and flags are not supported")
+            node = self.alternation()
+            if self.take() != ")":
+                self.error("Missing )")
+            return node
+        if ch == "[":
+            return ("set", self.char_class())
+        if ch == ".":
+            return ("set", ANY)
+        if ch == "^":
+            return ("assert", "^")
+        if ch == "$":
+            return ("assert", "$")
+        if ch == "\\":
+            return self.escape()
+        if ch in ("*", "+", "?", "{"):
+            self.error("Nothing to repeat")
+        return self.literal(ch)
+
+    def literal(self, ch):
+        folded = self.fold(ch)
+        if not folded:
+            return ("empty",)
+        if len(folded) == 1:
+            return ("set", CharSet(folded))
+        return ("cat", [("set", CharSet(part)) for part in folded])
+
+    def escape(self):
+        ch = self.take()
+        if ch is None:
+            self.error("Pattern ends with \\")
+        if ch in _CLASS_TESTS:
+            return ("set", CharSet(classes=(ch,)))
+        if ch in ("b", "B"):
+            return ("assert", ch)
+        if ch.isalnum():
+            self.error(f"Unsupported escape \\{ch}")
+        return self.literal(ch)
+
+    def char_class(self):
+        negate = self.peek() == "^"
+        if negate:
+            self.take()
+        chars, ranges, classes = set(), [], []
+        first = True
+        while True:
+            ch = self.take()
+            if ch is None:
+                self.error("Missing ]")
+            if ch == "]" and not first:
+                break
+            first = False
+            if ch == "\\":
+                ch = self.take()
+                if ch is None:
+                    self.error("Pattern ends with \\")
+                if ch in _CLASS_TESTS:
+                    classes.append(ch)
+                    continue
+                if ch.isalnum():
+                    self.error(f"Unsupported escape \\{ch}")
+            if self.peek() == "-" and self.pattern[self.pos + 1:self.pos + 2] not in ("]", ""):
+                self.take()
+                high = self.take()
+                if high == "\\":
+                    high = self.take()
+                if high < ch:
+                    self.error("Character range is reversed")
+                ranges.append((ch, high))
+                continue
+            chars.update(self.fold(ch) or ch)
+        return CharSet(chars, ranges, classes, negate, self.ignore_case)
+
+def _nullable(node):
+    kind = node[0]
+    if kind in ("empty", "assert"):
+        return True
+    if kind == "set":
+        return False
+    if kind == "cat":
+        return all(_nullable(item) for item in node[1])
+    if kind == "alt":
+        return any(_nullable(item) for item in node[1])
+    return node[2] == 0 or _nullable(node[1])
+
+def _unbounded(node):
+    kind = node[0]
+    if kind in ("cat", "alt"):
+        return any(_unbounded(item) for item in node[1])
+    if kind == "rep":
+        return node[3] is None or _unbounded(node[1])
+    return False
+
+def _size(node):
+    kind = node[0]
+    if kind in ("cat", "alt"):
+        return sum(_size(item) for item in node[1]) + len(node[1])
+    if kind == "rep":
+        copies = node[3] if node[3] is not None else node[2] + 1
+        return (_size(node[1]) + 1) * max(1, copies)
+    return 1
+
+def parse(pattern, ignore_case=True):
+    """AST of a pattern, PatternError if it's unsupported or unsafe"""
+    if not pattern:
+        raise PatternError("Empty pattern")
+    node = _Parser(pattern, ignore_case).parse()
+    if _nullable(node):
+        raise PatternError(f"Pattern {pattern!r} can match an empty string, it would hit every message")
+    if _size(node) > MAX_STATES:
+        raise PatternError(f"Pattern {pattern!r} is too big once repeats are expanded")
+    return node
+
+# ---------- NFA ----------
+# states[i] = [kind, arg, out, out2]: "set" (CharSet, next), "split" (-, a, b),
+# "assert" (kind, next), "match" (rule id)
+
+class _NFA:
+    def __init__(self):
+        self.states = []
+
+    def add(self, kind, arg=None):
+        self.states.append([kind, arg, None, None])
+        return len(self.states) - 1
+
+    def patch(self, holes, target):
+        for state, slot in holes:
+            self.states[state][slot] = target
+
+    def build(self, node):
+        """(start, holes): holes are (state, slot) pairs still to be pointed at what follows"""
+        kind = node[0]
+        if kind == "set" or kind == "assert":
+            state = self.add(kind, node[1])
+            return state, [(state, 2)]
+        if kind == "empty":
+            state = self.add("split")
+            self.states[state][3] = -1  # one way out only
+            return state, [(state, 2)]
+        if kind == "cat":
+            start, holes = self.build(node[1][0])
+            for item in node[1][1:]:
+                item_start, item_holes = self.build(item)
+                self.patch(holes, item_start)
+                holes = item_holes
+            return start, holes
+        if kind == "alt":
+            start, holes = self.build(node[1][0])
+            for item in node[1][1:]:
+                item_start, item_holes = self.build(item)
+                split = self.add("split")
+                self.states[split][2] = start
+                self.states[split][3] = item_start
+                start, holes = split, holes + item_holes
+            return start, holes
+        # Repeat: required copies, then optional ones (or a loop)
+        _, item, low, high = node
+        parts = [item] * low
+        if high is None:
+            parts.append(("star", item))
+        else:
+            parts.extend([("opt", item)] * (high - low))
+        start, holes = None, []
+        for part in parts:
+            if part[0] == "star":
+                split = self.add("split")
+                body, body_holes = self.build(part[1])
+                self.states[split][2] = body
+                self.patch(body_holes, split)
+                part_start, part_holes = split, [(split, 3)]
+            elif part[0] == "opt":
+                split = self.add("split")
+                body, body_holes = self.build(part[1])
+                self.states[split][2] = body
+                part_start, part_holes = split, body_holes + [(split, 3)]
+            else:
+                part_start, part_holes = self.build(part)
+            if start is None:
+                start = part_start
+            else:
+                self.patch(holes, part_start)
+            holes = part_holes
+        return start, holes
+
+def _holds(kind, prev, nxt):
+    """Assertion between chars of kind prev and nxt (see _kind)"""
+    if kind == "^":
+        return prev is None
+    if kind == "$":
+        return nxt is None
+    boundary = (prev == "w") != (nxt == "w")
+    return boundary if kind == "b" else not boundary
+
+class PatternMatcher:
+    """
+    Every pattern in one automaton. search(text) returns {rule: end} with
+    the end of the first match of each rule, in one pass over text.
+    """
+    def __init__(self, patterns):
+        """patterns: [(rule, parsed node)]"""
+        nfa = _NFA()
+        self.rules = []
+        starts = []
+        for rule, node in patterns:
+            start, holes = nfa.build(node)
+            nfa.patch(holes, nfa.add("match", len(self.rules)))
+            self.rules.append(rule)
+            starts.append(start)
+        self._states = nfa.states
+        self._starts = frozenset(starts)
+        self._dfa = {}  # {(frozenset of states, kind of prev char): {char: (rule ids, next key)}}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _closure(self, states, prev, nxt):
+        """Set and match states reachable from states without reading a char"""
+        seen, stack = set(), list(states)
+        while stack:
+            state = stack.pop()
+            if state < 0 or state in seen:
+                continue
+            seen.add(state)
+            kind, arg, out, out2 = self._states[state]
+            if kind == "split":
+                stack.append(out)
+                stack.append(out2)
+            elif kind == "assert":
+                if _holds(arg, prev, nxt):
+                    stack.append(out)
+        return seen
+
+    def _step(self, key, ch):
+        """(rule ids matched right before ch, next DFA key)"""
+        states, prev = key
+        reached = self._closure(states, prev, _kind(ch))
+        matched = tuple(sorted(self._states[s][1] for s in reached if self._states[s][0] == "match"))
+        moved = {self._states[s][2] for s in reached
+                 if self._states[s][0] == "set" and ch in self._states[s][1]}
+        # Unanchored search: a match may start at every position
+        return matched, (frozenset(moved) | self._starts, _kind(ch))
+
+    def search(self, text):
+        if not self.rules:
+            return {}
+        if len(self._dfa) > MAX_DFA_STATES:
+            self._dfa.clear()
+        found = {}
+        key = (self._starts, None)
+        for i, ch in enumerate(text):
+            transitions = self._dfa.get(key)
+            if transitions is None:
+                transitions = self._dfa[key] = {}
+            step = transitions.get(ch)
+            if step is None:
+                step = transitions[ch] = self._step(key, ch)
+            matched, key = step
+            for rule_id in matched:
+                found.setdefault(self.rules[rule_id], i)
+        for state in self._closure(key[0], key[1], None):
+            if self._states[state][0] == "match":
+                found.setdefault(self.rules[self._states[state][1]], len(text))
+        return found
+
+# ---------- Match start ----------
+
+def reverse(node):
+    """Pattern that matches the mirror image of what node matches"""
+    kind = node[0]
+    if kind == "cat":
+        return ("cat", [reverse(item) for item in reversed(node[1])])
+    if kind == "alt":
+        return ("alt", [reverse(item) for item in node[1]])
+    if kind == "rep":
+        return ("rep", reverse(node[1]), node[2], node[3])
+    if kind == "assert":
+        return ("assert", {"^": "$", "$": "^"}.get(node[1], node[1]))
+    return node
+
+def _farthest(matcher, text, pos, step):
+    """
+    Farthest position a match anchored at pos reaches, walking one char at a
+    time in direction step (1 or -1). None if nothing matches there.
+    """
+    def kind_at(i):
+        return _kind(text[i]) if 0 <= i < len(text) else None
+
+    behind = pos - 1 if step > 0 else pos  # char already passed, for \b
+    states = matcher._starts
+    prev = kind_at(behind)
+    found = None
+    while states:
+        ahead = pos if step > 0 else pos - 1
+        reached = matcher._closure(states, prev, kind_at(ahead))
+        if any(matcher._states[s][0] == "match" for s in reached):
+            found = pos
+        if not 0 <= ahead < len(text):
+            break
+        ch = text[ahead]
+        states = {matcher._states[s][2] for s in reached
+                  if matcher._states[s][0] == "set" and ch in matcher._states[s][1]}
+        prev = _kind(ch)
+        pos += step
+    return found
+
+def match_span(forward, backward, text, end):
+    """
+    (start, end) of the match the forward search reported ending at end:
+    its leftmost start, then its longest run from there, like re's greedy
+    search would report. forward is a PatternMatcher of the pattern,
+    backward one of reverse(pattern).
+    """
+    start = _farthest(backward, text, end, -1)
+    if start is None:
+        return end, end
+    return start, _farthest(forward, text, start, 1) or end
\ No newline at end of file
@@ -0,0 +1,50 @@
+import json
+import os
+import zlib
+from config import DATABASE_PATH, DB_SHARDS, DB_SHARD_DIR
+
+# ========== SHARD LAYOUT ==========
+# With DB_SHARDS > 0 the per-guild tables live in DB_SHARD_DIR/shard_NN.db,
+# picked by a hash of the guild id. Everything else (welcome, scheduler) and
+# rows without a guild stay in DATABASE_PATH. Every file gets the full schema.
+
+SHARDED_TABLES = (
+    "users", "level_roles", "filtered_words", "custom_commands",
+    "confession_setup", "confession_messages", "xp_curves", "xp_levels",
+    "channel_activity",
+)
+
+LAYOUT_FILE = os.path.join(DB_SHARD_DIR, "layout.json")
+
+def shard_index(guild_id, shards=DB_SHARDS):
+    """Shard number of a guild, None when sharding is off or there is no guild"""
+    if not shards or guild_id is None:
+        return None
+    # crc32 instead of hash(): stable across processes and Python versions
+    return zlib.crc32(str(int(guild_id)).encode()) % shards
+
+def shard_path(index):
+    """Database file of a shard, None is the main database"""
+    if index is None:
+        return DATABASE_PATH
+    return os.path.join(DB_SHARD_DIR, f"shard_{index:02d}.db")
+
+def guild_path(guild_id, shards=DB_SHARDS):
+    return shard_path(shard_index(guild_id, shards))
+
+def all_paths(shards=DB_SHARDS):
+    """Main database first, then every shard file"""
+    return [DATABASE_PATH] + [shard_path(i) for i in range(shards)]
+
+def read_layout():
+    """Shard count the data on disk was written with (0 = not sharded)"""
+    try:
+        with open(LAYOUT_FILE, encoding="utf-8") as f:
+            return int(json.load(f)["shards"])
+    except FileNotFoundError:
+        return 0
+
+def write_layout(shards):
+    os.makedirs(DB_SHARD_DIR, exist_ok=True)
+    with open(LAYOUT_FILE, "w", encoding="utf-8") as f:
+        json.dump({"shards": shards}, f)
\ No newline at end of file
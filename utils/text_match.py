@@ -0,0 +1,113 @@
+from collections import deque
+
+# ========== MULTI-WORD MATCHING ==========
+# Aho-Corasick: every filtered word of a guild goes into one trie with failure
+# links, so a message is scanned once no matter how many words the guild has
+# (O(message length + matches) instead of O(words x message length)).
+# Adding or removing a word only marks the automaton stale; it is rebuilt on
+# the next search, which takes a few ms for thousands of words.
+# Below SMALL_SET words, str.find per word (C speed) beats walking the
+# automaton in Python (measured with bench_filter.py), so short lists use it.
+
+SMALL_SET = 150
+
+class WordMatcher:
+    """Finds every occurrence of a set of words in one pass over the text"""
+    def __init__(self, words=()):
+        self.words = set()
+        self._goto = None  # [{char: state}] per state, state 0 is the root
+        self._fail = None  # [state]
+        self._out = None   # [tuple of words ending here, failure chain included]
+        self.builds = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def add(self, word):
+        if word and word not in self.words:
+            self.words.add(word)
+            self._goto = None
+
+    def remove(self, word):
+        if word in self.words:
+            self.words.discard(word)
+            self._goto = None
+
+    def clear(self):
+        self.words.clear()
+        self._goto = None
+
+    def _build(self):
+        goto, out = [{}], [[]]
+        for word in sorted(self.words):
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(word)
+
+        # Breadth first, so a state's failure target is finished before it
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(words) for words in out]
+        self.builds += 1
+
+    def search(self, text):
+        """[(start, end, word)] for every occurrence, overlapping ones included"""
+        if not self.words:
+            return []
+        if len(self.words) < SMALL_SET:
+            return self._scan(text)
+        if self._goto is None:
+            self._build()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        state = 0
+        for i, ch in enumerate(text):
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if out[state]:
+                for word in out[state]:
+                    found.append((i + 1 - len(word), i + 1, word))
+        return found
+
+    def _scan(self, text):
+        found = []
+        for word in self.words:
+            if word in text:
+                start = text.find(word)
+                while start != -1:
+                    found.append((start, start + len(word), word))
+                    start = text.find(word, start + 1)
+        found.sort()
+        return found
+
+    def terms(self, text):
+        """Distinct words found in text, in order of first appearance"""
+        return list(dict.fromkeys(word for _, _, word in self.search(text)))
\ No newline at end of file
@@ -0,0 +1,144 @@
+import asyncio
+from utils.database import get_pool, group_by_shard, transaction
+from utils.queries import FLUSH_XP
+
+class XPBuffer:
+    """
+    Write-behind buffer for XP awards.
+    Deltas are kept in memory and written every interval_ms or once max_rows
+    distinct users are pending, as one executemany inside one transaction
+    per database file (shards are written in parallel).
+    """
+    def __init__(self, interval_ms=5000, max_rows=500):
+        self.interval = interval_ms / 1000
+        self.max_rows = max_rows
+        self.pending = {}  # {(guild_id, user_id): [xp_delta, level]}, same order as ActivityCounter
+        self.lock = asyncio.Lock()  # held while flushing, readers take it to see a consistent total
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def add(self, guild_id, user_id, xp, level):
+        key = (guild_id, user_id)
+        entry = self.pending.get(key)
+        if entry:
+            entry[0] += xp
+            entry[1] = level
+        else:
+            self.pending[key] = [xp, level]
+
+        if len(self.pending) >= self.max_rows:
+            self._wake.set()
+
+    def get(self, guild_id, user_id):
+        """Pending [xp_delta, level] or None"""
+        return self.pending.get((guild_id, user_id))
+
+    def pending_guild(self, guild_id):
+        """{user_id: [xp_delta, level]} not written yet for one guild"""
+        return {user_id: entry for (pending_guild, user_id), entry in self.pending.items()
+                if pending_guild == guild_id}
+
+    def _take(self, guild_id=None):
+        """Rows to write, removed from pending; only one guild's when guild_id is given"""
+        if guild_id is None:
+            taken, self.pending = self.pending, {}
+        else:
+            taken = {key: entry for key, entry in self.pending.items() if key[0] == guild_id}
+            for key in taken:
+                del self.pending[key]
+        # FLUSH_XP params: (user_id, guild_id, xp, level)
+        return [(user_id, pending_guild, xp, level)
+                for (pending_guild, user_id), (xp, level) in taken.items()]
+
+    def _restore(self, rows):
+        # Put rows back in front of anything added while the flush was running
+        newer = self.pending
+        self.pending = {}
+        for user_id, guild_id, xp, level in rows:
+            self.add(guild_id, user_id, xp, level)
+        for (guild_id, user_id), (xp, level) in newer.items():
+            self.add(guild_id, user_id, xp, level)
+
+    async def flush(self, guild_id=None):
+        """Write pending XP, all of it or only guild_id's; returns the number of rows"""
+        async with self.lock:
+            rows = self._take(guild_id)
+            if not rows:
+                return 0
+            groups = group_by_shard(FLUSH_XP, rows)
+            try:
+                results = await asyncio.gather(
+                    *(self._write(shard, group) for shard, group in groups.items()),
+                    return_exceptions=True
+                )
+            except BaseException:
+                self._restore(rows)
+                raise
+
+            # Only the shards that failed get their rows back
+            failed = [(group, result) for group, result in zip(groups.values(), results)
+                      if isinstance(result, BaseException)]
+            if failed:
+                self._restore([row for group, _ in failed for row in group])
+                raise failed[0][1]
+            return len(rows)
+
+    async def _write(self, shard, rows):
+        async with transaction(shard) as tx:
+            await tx.executemany(FLUSH_XP, rows)
+
+    def flush_sync(self):
+        """Blocking flush for shutdown, works without a running loop"""
+        if not self.pending:
+            return 0
+        rows = self._take()
+
+        def job(rows):
+            def run(conn):
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(FLUSH_XP.sql, rows)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            return run
+
+        failed, error = [], None
+        for shard, group in group_by_shard(FLUSH_XP, rows).items():
+            try:
+                get_pool(shard).run(job(group))
+            except Exception as e:
+                failed.extend(group)
+                error = error or e
+        if failed:
+            self._restore(failed)
+            raise error
+        return len(rows)
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ XP flush failed, will retry: {e}")
+
+    async def close(self):
+        """Stop the background loop, then flush whatever is left synchronously"""
+        self._closing = True
+        self._wake.set()
+        if self._task:
+            await self._task
+            self._task = None
+        self.flush_sync()
\ No newline at end of file
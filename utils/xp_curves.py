@@ -0,0 +1,111 @@
+import json
+from bisect import bisect_right
+from math import isqrt
+
+# ========== XP CURVES ==========
+# A curve is the cumulative XP needed to reach each level, precomputed into a
+# sorted table: thresholds[0] = 0 is level 1, thresholds[n] is where level
+# n + 1 starts. Level lookup is a bisect. Guilds with a custom curve also get
+# the table in xp_levels, so SQL turns XP into levels in one set-based pass.
+# Guilds without one use DEFAULT_CURVE, which SQL spells MAX(1, xp / 1000 + 1)
+# (AWARD_XP, RECALC_LEVELS).
+
+MAX_LEVEL = 1000  # custom curves stop here, it is also the xp_levels size per guild
+MAX_XP = 2 ** 63 - 1  # largest SQLite INTEGER, every threshold has to fit in xp_levels
+KINDS = ("linear", "quadratic", "table")
+
+class XPCurve:
+    """
+    linear: level L starts at step * (L - 1)
+    quadratic: level L starts at base * (L - 1) ** 2
+    table: explicit thresholds, levels after the last one repeat the last step
+    capped=False lets levels go past MAX_LEVEL (the default curve, like before)
+    """
+    def __init__(self, kind, params, capped=True):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown curve {kind!r}, use one of: {', '.join(KINDS)}")
+        self.kind = kind
+        self.params = params
+        self.capped = capped
+
+        if kind == "table":
+            table = params["thresholds"]
+            if len(table) < 2 or table[0] != 0:
+                raise ValueError("A table curve needs at least two levels and starts at 0 XP")
+            if any(b <= a for a, b in zip(table, table[1:])):
+                raise ValueError("Table thresholds must go up with every level")
+            self.step = table[-1] - table[-2]
+        else:
+            self.step = params["step" if kind == "linear" else "base"]
+            if self.step < 1:
+                raise ValueError("The curve step must be at least 1 XP")
+
+        self.thresholds = [self._start(level) for level in range(1, MAX_LEVEL + 1)]
+        if capped and self.thresholds[-1] > MAX_XP:
+            raise ValueError(f"That curve is too steep, level {MAX_LEVEL} would need more XP than can be stored")
+
+    def _start(self, level):
+        """Cumulative XP where `level` starts"""
+        if self.kind == "linear":
+            return self.step * (level - 1)
+        if self.kind == "quadratic":
+            return self.step * (level - 1) ** 2
+        table = self.params["thresholds"]
+        if level <= len(table):
+            return table[level - 1]
+        return table[-1] + self.step * (level - len(table))
+
+    def level_for(self, xp):
+        """Level reached with `xp` cumulative XP"""
+        if xp < self.thresholds[-1] or self.capped:
+            return max(1, bisect_right(self.thresholds, xp))
+        # Uncapped and past the table: the formulas answer directly
+        if self.kind == "linear":
+            return xp // self.step + 1
+        if self.kind == "quadratic":
+            return isqrt(xp // self.step) + 1
+        return MAX_LEVEL + (xp - self.thresholds[-1]) // self.step
+
+    def xp_for_level(self, level):
+        """Cumulative XP where `level` starts"""
+        level = max(1, level)
+        if level <= MAX_LEVEL:
+            return self.thresholds[level - 1]
+        return self._start(MAX_LEVEL if self.capped else level)
+
+    def rows(self):
+        """[(level, xp)] for the xp_levels table"""
+        return list(enumerate(self.thresholds, 1))
+
+    def describe(self):
+        if self.kind == "linear":
+            return f"linear, {self.step:,} XP per level"
+        if self.kind == "quadratic":
+            return f"quadratic, {self.step:,} × (level - 1)² XP"
+        return f"table, {len(self.params['thresholds'])} levels then +{self.step:,} XP per level"
+
+    def to_json(self):
+        return json.dumps(self.params)
+
+    @classmethod
+    def from_row(cls, kind, params_json):
+        return cls(kind, json.loads(params_json))
+
+    @classmethod
+    def parse(cls, kind, text=""):
+        """Curve from command arguments: linear [step], quadratic [base], table 0,100,300,..."""
+        kind = kind.lower()
+        try:
+            numbers = [int(part) for part in text.replace(",", " ").split()]
+        except ValueError:
+            raise ValueError(f"Curve arguments must be whole numbers, got {text!r}")
+        if kind == "linear":
+            return cls(kind, {"step": numbers[0] if numbers else 1000})
+        if kind == "quadratic":
+            return cls(kind, {"base": numbers[0] if numbers else 100})
+        if kind == "table":
+            return cls(kind, {"thresholds": numbers})
+        return cls(kind, {})
+
+# The formula every guild used before curves existed
+DEFAULT_CURVE = XPCurve("linear", {"step": 1000}, capped=False)
\ No newline at end of file
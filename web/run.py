@@ -1,6 +1,20 @@
 from flask import Flask, render_template, redirect, request, session, flash, jsonify
+import ast
+import glob
+import re
 import sqlite3
 import os
+import sys
+from datetime import datetime
+
+# Share config.py and the connection profile with the bot
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+from config import DATABASE_PATH, DB_SHARDS, DB_STATS_FILE
+from utils.connection import connect
+from utils.db_metrics import read_snapshot
+from utils.filter_rules import compile_rule, PatternError
+from utils.shards import all_paths, guild_path
 
 app = Flask(__name__)
 app.secret_key = 'nexus_community_dashboard_secret_2024'
@@ -8,20 +22,111 @@ app.secret_key = 'nexus_community_dashboard_secret_2024'
 # ========== CONFIG ==========
 USERNAME = 'admin'
 PASSWORD = 'nexus123'
-DATABASE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'bot.db')
+
+_builtin_commands = None  # see builtin_commands()
 
 # ========== HELPERS ==========
-def db_connect():
+def db_connect(path=DATABASE_PATH):
     """Connect to database"""
     try:
-        os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = connect(path)
         conn.row_factory = sqlite3.Row
         return conn
     except Exception as e:
         print(f"Database error: {e}")
         return None
 
+def db_connect_all():
+    """Main database plus every shard file (just the main one when not sharded)"""
+    conns = []
+    for path in all_paths():
+        if path != DATABASE_PATH and not os.path.exists(path):
+            continue
+        conn = db_connect(path)
+        if conn:
+            conns.append(conn)
+    return conns
+
+def db_sum(conns, sql, params=()):
+    """Run an aggregate on every database and add the results up"""
+    total = 0
+    for conn in conns:
+        result = conn.execute(sql, params).fetchone()
+        total += result[0] if result and result[0] else 0
+    return total
+
+def db_fetch_all(conns, sql, params=()):
+    rows = []
+    for conn in conns:
+        rows.extend(conn.execute(sql, params).fetchall())
+    return rows
+
+def db_close_all(conns):
+    for conn in conns:
+        conn.close()
+
+def guild_arg(value):
+    """Guild id from a form, JSON or query value, None if missing or not a number"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def builtin_commands():
+    """
+    Names and aliases of the bot's own commands, read from the @commands
+    decorators in cogs/*.py (the dashboard has no bot to ask), parsed once
+    """
+    global _builtin_commands
+    if _builtin_commands is None:
+        names = set()
+        for path in glob.glob(os.path.join(ROOT_DIR, 'cogs', '*.py')):
+            with open(path, encoding='utf-8') as f:
+                tree = ast.parse(f.read())
+            for node in ast.walk(tree):
+                if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                for deco in node.decorator_list:
+                    if not (isinstance(deco, ast.Call) and isinstance(deco.func, ast.Attribute)
+                            and deco.func.attr in ('command', 'hybrid_command', 'group', 'hybrid_group')):
+                        continue
+                    names.add(node.name)
+                    for kw in deco.keywords:
+                        if kw.arg == 'name' and isinstance(kw.value, ast.Constant):
+                            names.discard(node.name)
+                            names.add(kw.value.value)
+                        elif kw.arg == 'aliases' and isinstance(kw.value, (ast.List, ast.Tuple)):
+                            names.update(item.value for item in kw.value.elts if isinstance(item, ast.Constant))
+        _builtin_commands = names
+    return _builtin_commands
+
+def command_error(name, response):
+    """Same checks as !addcommand, the error text or None"""
+    if not re.match(r'^[a-z0-9_]+$', name):
+        return 'Command name can only contain letters, numbers, and underscores'
+    if name in builtin_commands():
+        return 'This command name is reserved for built-in commands'
+    if len(response) > 2000:
+        return 'Response too long! Max 2000 characters'
+    return None
+
+def db_connect_guild(guild_id):
+    """Connect to the file that holds a guild's rows (its shard when sharded)"""
+    return db_connect(guild_path(guild_id))
+
+def known_guilds(conns):
+    """Guild ids with members, filters or commands, for the server pickers"""
+    rows = db_fetch_all(conns, """SELECT guild_id FROM users
+                                  UNION SELECT guild_id FROM filtered_words
+                                  UNION SELECT guild_id FROM custom_commands""")
+    return sorted({row['guild_id'] for row in rows if row['guild_id']})
+
+def guild_filter(guild_id):
+    """WHERE clause and params that limit a listing to one guild (all guilds for None)"""
+    if guild_id is None:
+        return "", ()
+    return " WHERE guild_id = ?", (guild_id,)
+
 def login_needed(f):
     """Decorator untuk require login"""
     def wrapper(*args, **kwargs):
@@ -64,46 +169,51 @@ def logout_route():
 @login_needed
 def dashboard_route():
     """Dashboard utama"""
-    conn = db_connect()
-    stats = {'users': 0, 'messages': 0, 'commands': 0, 'filters': 0}
+    conns = db_connect_all()
+    stats = {'users': 0, 'messages': 0, 'messages_24h': 0, 'commands': 0, 'filters': 0}
     
-    if conn:
+    if conns:
         try:
-            result = conn.execute("SELECT COUNT(*) FROM users").fetchone()
-            stats['users'] = result[0] if result else 0
-            
-            result = conn.execute("SELECT SUM(messages) FROM users").fetchone()
-            stats['messages'] = result[0] if result and result[0] else 0
-            
-            result = conn.execute("SELECT COUNT(*) FROM custom_commands").fetchone()
-            stats['commands'] = result[0] if result else 0
-            
-            result = conn.execute("SELECT COUNT(*) FROM filtered_words").fetchone()
-            stats['filters'] = result[0] if result else 0
-            
-            conn.close()
+            # Per-guild tables may be spread over shard files, totals add up
+            stats['users'] = db_sum(conns, "SELECT COUNT(*) FROM users")
+            stats['messages'] = db_sum(conns, "SELECT SUM(messages) FROM users")
+            # Rollup rows are flushed by the bot every few seconds
+            stats['messages_24h'] = db_sum(
+                conns, "SELECT SUM(messages) FROM channel_activity WHERE minute >= ?",
+                (int(datetime.now().timestamp()) - 86400,)
+            )
+            stats['commands'] = db_sum(conns, "SELECT COUNT(*) FROM custom_commands")
+            stats['filters'] = db_sum(conns, "SELECT COUNT(*) FROM filtered_words")
         except Exception as e:
             print(f"Stats error: {e}")
+        finally:
+            db_close_all(conns)
     
     return render_template('dashboard.html', stats=stats)
 
 @app.route('/commands')
 @login_needed
 def commands_route():
-    """Page custom commands"""
-    conn = db_connect()
+    """Page custom commands (?guild=<id> shows one server)"""
+    guild_id = guild_arg(request.args.get('guild'))
+    conns = db_connect_all()
     command_list = []
+    guilds = []
     
-    if conn:
+    if conns:
         try:
-            command_list = conn.execute(
-                "SELECT cmd_name, response FROM custom_commands ORDER BY cmd_name"
-            ).fetchall()
-            conn.close()
+            where, params = guild_filter(guild_id)
+            command_list = sorted(
+                db_fetch_all(conns, f"SELECT guild_id, cmd_name, response FROM custom_commands{where}", params),
+                key=lambda row: (row['cmd_name'], row['guild_id'] or 0)
+            )
+            guilds = known_guilds(conns)
         except:
             pass
+        finally:
+            db_close_all(conns)
     
-    return render_template('commands.html', commands=command_list)
+    return render_template('commands.html', commands=command_list, guild=guild_id, guilds=guilds)
 
 @app.route('/api/command', methods=['POST'])
 @login_needed
@@ -112,115 +222,178 @@ def add_command_api():
     data = request.json
     name = data.get('name', '').strip().lower()
     response = data.get('response', '').strip()
+    guild_id = guild_arg(data.get('guild_id'))
     
     if not name or not response:
         return jsonify({'error': 'Name and response required'}), 400
+    if guild_id is None:
+        return jsonify({'error': 'Server ID required'}), 400
+    error = command_error(name, response)
+    if error:
+        return jsonify({'error': error}), 400
     
-    conn = db_connect()
+    # The bot reads a guild's commands from its shard; the change-log
+    # triggers tell the running bot to reload that guild
+    conn = db_connect_guild(guild_id)
     if conn:
         try:
             conn.execute(
-                "INSERT OR REPLACE INTO custom_commands (cmd_name, response) VALUES (?, ?)",
-                (name, response)
+                "INSERT OR REPLACE INTO custom_commands (guild_id, cmd_name, response) VALUES (?, ?, ?)",
+                (guild_id, name, response)
             )
             conn.commit()
-            conn.close()
             return jsonify({'success': True})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
+        finally:
+            conn.close()
     
     return jsonify({'error': 'Database error'}), 500
 
 @app.route('/api/command/<name>', methods=['DELETE'])
 @login_needed
 def delete_command_api(name):
-    """API: Delete custom command"""
-    conn = db_connect()
-    if conn:
+    """API: Delete custom command (?guild_id=<id> for one server, else every server)"""
+    guild_id = guild_arg(request.args.get('guild_id'))
+    conns = db_connect_all() if guild_id is None else [db_connect_guild(guild_id)]
+    conns = [conn for conn in conns if conn]
+    if conns:
         try:
-            conn.execute("DELETE FROM custom_commands WHERE cmd_name = ?", (name,))
-            conn.commit()
-            conn.close()
+            for conn in conns:
+                if guild_id is None:
+                    conn.execute("DELETE FROM custom_commands WHERE cmd_name = ?", (name,))
+                else:
+                    conn.execute("DELETE FROM custom_commands WHERE guild_id = ? AND cmd_name = ?",
+                                 (guild_id, name))
+                conn.commit()
             return jsonify({'success': True})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
+        finally:
+            db_close_all(conns)
     
     return jsonify({'error': 'Database error'}), 500
 
 @app.route('/filter')
 @login_needed
 def filter_route():
-    """Page word filter"""
-    conn = db_connect()
+    """Page word filter (?guild=<id> shows one server)"""
+    guild_id = guild_arg(request.args.get('guild'))
+    conns = db_connect_all()
     word_list = []
+    guilds = []
     
-    if conn:
+    if conns:
         try:
-            word_list = conn.execute(
-                "SELECT word FROM filtered_words ORDER BY word"
-            ).fetchall()
-            conn.close()
+            where, params = guild_filter(guild_id)
+            word_list = sorted(
+                db_fetch_all(conns, f"SELECT guild_id, word FROM filtered_words{where}", params),
+                key=lambda row: (row['word'], row['guild_id'] or 0)
+            )
+            guilds = known_guilds(conns)
         except:
             pass
+        finally:
+            db_close_all(conns)
     
-    return render_template('filter.html', words=word_list)
+    return render_template('filter.html', words=word_list, guild=guild_id, guilds=guilds)
 
 @app.route('/api/filter', methods=['POST'])
 @login_needed
 def add_filter_api():
     """API: Add filtered word"""
     data = request.json
-    word = data.get('word', '').strip().lower()
+    word = data.get('word', '').strip()
+    if not word.startswith('re:'):
+        word = word.lower()
+    guild_id = guild_arg(data.get('guild_id'))
     
     if not word:
         return jsonify({'error': 'Word required'}), 400
+    if guild_id is None:
+        return jsonify({'error': 'Server ID required'}), 400
+    try:
+        compile_rule(word)
+    except PatternError as e:
+        return jsonify({'error': f'Invalid filter rule: {e}'}), 400
     
-    conn = db_connect()
+    conn = db_connect_guild(guild_id)
     if conn:
         try:
             conn.execute(
-                "INSERT OR IGNORE INTO filtered_words (word) VALUES (?)",
-                (word,)
+                "INSERT OR IGNORE INTO filtered_words (guild_id, word) VALUES (?, ?)",
+                (guild_id, word)
             )
             conn.commit()
-            conn.close()
             return jsonify({'success': True})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
+        finally:
+            conn.close()
     
     return jsonify({'error': 'Database error'}), 500
 
 @app.route('/api/filter/<word>', methods=['DELETE'])
 @login_needed
 def delete_filter_api(word):
-    """API: Delete filtered word"""
-    conn = db_connect()
-    if conn:
+    """API: Delete filtered word (?guild_id=<id> for one server, else every server)"""
+    guild_id = guild_arg(request.args.get('guild_id'))
+    conns = db_connect_all() if guild_id is None else [db_connect_guild(guild_id)]
+    conns = [conn for conn in conns if conn]
+    if conns:
         try:
-            conn.execute("DELETE FROM filtered_words WHERE word = ?", (word,))
-            conn.commit()
-            conn.close()
+            for conn in conns:
+                if guild_id is None:
+                    conn.execute("DELETE FROM filtered_words WHERE word = ?", (word,))
+                else:
+                    conn.execute("DELETE FROM filtered_words WHERE guild_id = ? AND word = ?",
+                                 (guild_id, word))
+                conn.commit()
             return jsonify({'success': True})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
+        finally:
+            db_close_all(conns)
     
     return jsonify({'error': 'Database error'}), 500
 
 @app.route('/api/filter', methods=['GET'])
 @login_needed
 def get_filters_api():
-    """API: Get all filtered words"""
-    conn = db_connect()
-    if conn:
+    """API: Get all filtered words (?guild_id=<id> for one server)"""
+    conns = db_connect_all()
+    if conns:
         try:
-            words = conn.execute("SELECT word FROM filtered_words").fetchall()
-            conn.close()
+            where, params = guild_filter(guild_arg(request.args.get('guild_id')))
+            words = db_fetch_all(conns, f"SELECT guild_id, word FROM filtered_words{where}", params)
             return jsonify([dict(w) for w in words])
         except Exception as e:
             return jsonify({'error': str(e)}), 500
+        finally:
+            db_close_all(conns)
     
     return jsonify({'error': 'Database error'}), 500
 
+@app.route('/dbstats')
+@login_needed
+def dbstats_route():
+    """Page database query stats (snapshot written by the bot's diagnostics cog)"""
+    snapshot = read_snapshot(DB_STATS_FILE)
+    times = {}
+    if snapshot:
+        for name in ('since', 'taken'):
+            times[name] = datetime.fromtimestamp(snapshot[name]).strftime('%Y-%m-%d %H:%M:%S')
+    return render_template('dbstats.html', snapshot=snapshot, times=times)
+
+@app.route('/api/dbstats', methods=['GET'])
+@login_needed
+def dbstats_api():
+    """API: Raw database stats snapshot"""
+    snapshot = read_snapshot(DB_STATS_FILE)
+    if snapshot is None:
+        return jsonify({'error': 'No stats yet, is the bot running?'}), 404
+    return jsonify(snapshot)
+
 @app.route('/api/status')
 def status_api():
     """API: Check bot status"""
@@ -234,6 +407,8 @@ if __name__ == '__main__':
     print("=" * 50)
     print(f"📁 Database: {DATABASE_PATH}")
     print(f"✅ Database exists: {os.path.exists(DATABASE_PATH)}")
+    if DB_SHARDS:
+        print(f"🧩 Shards: {DB_SHARDS}")
     print(f"🔑 Login: {USERNAME} / {PASSWORD}")
     print(f"🌐 URL: http://localhost:5000")
     print("=" * 50)